@@ -1,36 +1,102 @@
-from fastapi import FastAPI, Response, status
+from fastapi import FastAPI, HTTPException, Response, status
+from contextlib import asynccontextmanager
 from API.models.replace_content_input_payload import ReplaceContentInputPayload
 from API.models.get_answer_input_payload import GetAnswerInputPayload, Message
 from configs.main_config import Main_config
 from pathlib import Path
 from controllers.answer_controller import AnswerController
+import threading
 import logging
+import time
 
-app = FastAPI()
 logger = logging.getLogger(__name__)
 main_config = Main_config(Path("Final_product") / "configs" / "config.json")
 
-answer_handler = AnswerController(
-                                                    database_path = main_config.DATABASE_PATH,
-                                                    embedding_model_name = main_config.EMBEDDING_MODEL_NAME,
+answer_handler = None
+ready = threading.Event()
+warm_up_error = None
+warm_up_thread = None
+# Attempts to build the answer pipeline, waiting 2, 4, 8... s (max. 60 s) between them
+WARM_UP_ATTEMPTS = 5
 
-                                                    classifier_model_type = main_config.CLASSIFIER_MODEL_TYPE,   ##Lo ideal sería usar una clase para encapsular estos datos
-                                                    classifier_model_name =  main_config.CLASSIFIER_MODEL_NAME,  ##Pero no se donde ponerla en la arquitectura
-                                                    classifier_api_key =  main_config.CLASSIFIER_API_KEY,
-                                                    classifier_temperature =  main_config.CLASSIFIER_TEMPERATURE,
-                                                    classifier_top_k =  main_config.CLASSIFIER_TOP_P,
-                                                    classifier_max_tokens =  main_config.CLASSIFIER_MAX_TOKENS,
 
-                                                    answer_model_type =  main_config.ANSWER_MODEL_TYPE,   ##Lo ideal sería usar una clase para encapsular estos datos
-                                                    answer_model_name =  main_config.ANSWER_MODEL_NAME,  ##Pero no se donde ponerla en la arquitectura
-                                                    answer_api_key =  main_config.ANSWER_API_KEY,
-                                                    answer_temperature =  main_config.ANSWER_TEMPERATURE,
-                                                    answer_top_k =  main_config.ANSWER_TOP_P,
-                                                    answer_max_tokens =  main_config.ANSWER_MAX_TOKENS,
+def _warm_up() -> None:
+    """
+    Builds the answer pipeline and warms it up, retrying with exponential backoff. The service
+    is not ready until it finishes; the last error is kept in `warm_up_error` for `/ready`.
+    """
+    global answer_handler, warm_up_error
+    for attempt in range(WARM_UP_ATTEMPTS):
+        try:
+            answer_handler = _build_answer_handler()
+            warm_up_error = None
+            ready.set()
+            return
+        except Exception as e:
+            warm_up_error = str(e)
+            logger.critical(f"Error durante el calentamiento del servicio "
+                            f"(intento {attempt + 1} de {WARM_UP_ATTEMPTS}): {e}", exc_info=True)
+            if attempt < WARM_UP_ATTEMPTS - 1:
+                time.sleep(min(60, 2 ** (attempt + 1)))
 
-                                                    content_path= main_config.CONTENT_PATH
-                                    )
 
+def _build_answer_handler() -> AnswerController:
+    handler = AnswerController(
+        database_path = main_config.DATABASE_PATH,
+        embedding_model_name = main_config.EMBEDDING_MODEL_NAME,
+
+        ##Lo ideal sería usar una clase para encapsular estos datos
+        ##Pero no se donde ponerla en la arquitectura
+        classifier_model_type = main_config.CLASSIFIER_MODEL_TYPE,
+        classifier_model_name = main_config.CLASSIFIER_MODEL_NAME,
+        classifier_api_key = main_config.CLASSIFIER_API_KEY,
+        classifier_temperature = main_config.CLASSIFIER_TEMPERATURE,
+        classifier_top_k = main_config.CLASSIFIER_TOP_P,
+        classifier_max_tokens = main_config.CLASSIFIER_MAX_TOKENS,
+
+        ##Lo ideal sería usar una clase para encapsular estos datos
+        ##Pero no se donde ponerla en la arquitectura
+        answer_model_type = main_config.ANSWER_MODEL_TYPE,
+        answer_model_name = main_config.ANSWER_MODEL_NAME,
+        answer_api_key = main_config.ANSWER_API_KEY,
+        answer_temperature = main_config.ANSWER_TEMPERATURE,
+        answer_top_k = main_config.ANSWER_TOP_P,
+        answer_max_tokens = main_config.ANSWER_MAX_TOKENS,
+        answer_context_max_tokens = main_config.ANSWER_CONTEXT_MAX_TOKENS,
+
+        content_path = main_config.CONTENT_PATH,
+        embedding_backend = main_config.EMBEDDING_BACKEND,
+        embedding_server_url = main_config.EMBEDDING_SERVER_URL,
+        practise_max_chunks = main_config.PRACTISE_MAX_CHUNKS,
+        practise_routing = main_config.PRACTISE_ROUTING,
+        practise_top_n = main_config.PRACTISE_TOP_N,
+        practise_skip_threshold = main_config.PRACTISE_SKIP_THRESHOLD
+    )
+    handler.warm_up()
+    return handler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global warm_up_thread
+    warm_up_thread = threading.Thread(target=_warm_up, daemon=True)
+    warm_up_thread.start()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.get("/tfm/service/ready")
+def Ready(response: Response) -> dict:
+    if ready.is_set():
+        return {"status": "ready"}
+    if warm_up_thread is not None and not warm_up_thread.is_alive():
+        # Every attempt failed: the service will not become ready without a restart
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return {"status": "failed", "error": warm_up_error}
+    response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"status": "warming_up", "error": warm_up_error}
 
 @app.post("/tfm/service/replaceContent")
 def ReplaceContent(payload: ReplaceContentInputPayload) -> Response:
@@ -40,6 +106,10 @@ def ReplaceContent(payload: ReplaceContentInputPayload) -> Response:
 
 @app.post("/tfm/service/getAnswer")
 def GetAnswer(payload: GetAnswerInputPayload) -> Message:
+    if not ready.is_set():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="El servicio no está listo")
+
     logger.info(
         "Solicitando respuesta para el historial con %d mensajes ",
         len(payload.messages)
@@ -49,4 +119,4 @@ def GetAnswer(payload: GetAnswerInputPayload) -> Message:
         return Message(role = "assistant", content = response)
     except Exception as e:
         logger.error(f"Error al lanzar answer_handler: {e}", exc_info=True)
-        return Response(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR) from e
@@ -30,9 +30,38 @@ class Main_config():
                     raise ValueError(f"Document path does not exist: {self.DATABASE_PATH}")
 
                 self.EMBEDDING_MODEL_NAME = conf.get("embedding_model")
+                self.EMBEDDING_BACKEND = conf.get("embedding_backend", "torch")
+                self.EMBEDDING_WORKERS = int(conf.get("embedding_workers", 1))
+                self.EMBEDDING_BATCH_TOKENS = conf.get("embedding_batch_tokens")
+                self.EMBEDDING_SERVER_URL = conf.get("embedding_server_url") or None
+                self.INGESTION_STREAMING = (
+                    conf.get("ingestion_streaming", "false").lower() == "true")
+                self.SPLITTER_TYPE = conf.get("splitter_type", "text")
+                self.SPLITTER_CHUNK_TOKENS = conf.get("splitter_chunk_tokens")
+                self.SPLITTER_OVERLAP_TOKENS = int(conf.get("splitter_overlap_tokens", 32))
+                self.SPLITTER_BREAKPOINT_PERCENTILE = float(
+                    conf.get("splitter_breakpoint_percentile", 95))
+                self.SPLITTER_POOL_EMBEDDINGS = (
+                    conf.get("splitter_pool_embeddings", "true").lower() == "true")
+                self.SPLITTER_TRUNCATION_REPORT = (
+                    conf.get("splitter_truncation_report", "false").lower() == "true")
 
                 self.DL_RECURSIVE_MODE = conf.get("DL_recursive_mode", "true").lower() == "true"
                 self.DL_EXTRACT_IMAGES = conf.get("DL_extract_images", "false").lower() == "true"
+                self.DL_WORKERS = int(conf.get("DL_workers", 1))
+                self.DL_FILE_TIMEOUT = conf.get("DL_file_timeout")
+                self.DL_CACHE_PATH = conf.get("DL_cache_path") or None
+                self.DL_PDF_BACKEND = conf.get("DL_pdf_backend", "pypdf")
+                self.DL_OCR_POLICY = conf.get("DL_ocr_policy", "all")
+                self.DL_OCR_MIN_CHARS = int(conf.get("DL_ocr_min_chars", 100))
+                self.DL_OCR_MIN_IMAGE_PIXELS = int(conf.get("DL_ocr_min_image_pixels", 250000))
+                self.DL_OCR_WORKERS = int(conf.get("DL_ocr_workers", 2))
+                self.DL_OCR_CACHE_PATH = conf.get("DL_ocr_cache_path") or None
+                self.DL_URL_WORKERS = int(conf.get("DL_url_workers", 4))
+                self.DL_URL_TIMEOUT = float(conf.get("DL_url_timeout", 15))
+                self.DL_URL_MAX_PER_HOST = int(conf.get("DL_url_max_per_host", 4))
+                self.DL_URL_CACHE_PATH = conf.get("DL_url_cache_path") or None
+                self.DL_PDF_SHARD_PAGES = conf.get("DL_pdf_shard_pages") or None
 
                 self.SUMMARY_MODEL_NAME = conf.get("summary_model_name")
                 self.SUMMARY_MODEL_TYPE = conf.get("summary_model_type")
@@ -40,6 +69,10 @@ class Main_config():
                 self.SUMMARY_TEMPERATURE = conf.get("summary_temperature")
                 self.SUMMARY_MAX_TOKENS = conf.get("summary_max_tokens")
                 self.SUMMARY_TOP_P = conf.get("summary_top_p")
+                self.SUMMARY_CONCURRENCY = int(conf.get("summary_concurrency", 1))
+                self.SUMMARY_RPM = conf.get("summary_rpm")
+                self.SUMMARY_TPM = conf.get("summary_tpm")
+                self.SUMMARY_CACHE_PATH = conf.get("summary_cache_path") or None
 
                 self.CLASSIFIER_MODEL_NAME = conf.get("classifier_model_name")
                 self.CLASSIFIER_MODEL_TYPE = conf.get("classifier_model_type")
@@ -54,6 +87,11 @@ class Main_config():
                 self.ANSWER_TEMPERATURE = conf.get("answer_temperature")
                 self.ANSWER_MAX_TOKENS = conf.get("answer_max_tokens")
                 self.ANSWER_TOP_P = conf.get("answer_top_p")
+                self.ANSWER_CONTEXT_MAX_TOKENS = conf.get("answer_context_max_tokens")
+                self.PRACTISE_MAX_CHUNKS = int(conf.get("practise_max_chunks", 8))
+                self.PRACTISE_ROUTING = conf.get("practise_routing", "flat")
+                self.PRACTISE_TOP_N = int(conf.get("practise_top_n", 8))
+                self.PRACTISE_SKIP_THRESHOLD = conf.get("practise_skip_threshold")
 
                 self.DATABASE_TYPE = conf.get("database_type")
 
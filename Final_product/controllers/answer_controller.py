@@ -22,7 +22,14 @@ class AnswerController():
                  answer_top_k:float,
 
                  content_path:str,
-                 database_type:str = "faiss"
+                 database_type:str = "faiss",
+                 answer_context_max_tokens:int = None,
+                 embedding_backend:str = "torch",
+                 embedding_server_url:str = None,
+                 practise_max_chunks:int = 8,
+                 practise_routing:str = "flat",
+                 practise_top_n:int = 8,
+                 practise_skip_threshold:float = None
                  ):
 
             #Check database path
@@ -64,7 +71,15 @@ class AnswerController():
                                                 database_type = database_type,
                                                 embeddings_model_name= embedding_model_name,
                                                 database_path = database_path,
-                                                content_path= content_path
+                                                content_path= content_path,
+                                                answer_context_max_tokens =
+                                                    answer_context_max_tokens,
+                                                embedding_backend = embedding_backend,
+                                                embedding_server_url = embedding_server_url,
+                                                practise_max_chunks = practise_max_chunks,
+                                                practise_routing = practise_routing,
+                                                practise_top_n = practise_top_n,
+                                                practise_skip_threshold = practise_skip_threshold
                                                 )
 
             self.logger = logging.getLogger(__name__)
@@ -88,6 +103,12 @@ class AnswerController():
 
         return True
 
+    def warm_up(self):
+        """Runs the warm-up of the answering pipeline (models, tokenizers and indexes)."""
+        self.logger.info("Calentando modelos e índices ...")
+        self.answer_service.warm_up()
+        self.logger.info("Calentamiento completado")
+
     def launch (self, history: str):
         """
         Processes a user input string and generates an appropriate response
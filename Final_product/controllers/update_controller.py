@@ -1,5 +1,4 @@
 from pathlib import Path
-import shutil
 from services.update_services.regular_update_service import RegularUpdateService
 from services.update_services.practise_update_service import PractiseUpdateService
 import logging
@@ -15,9 +14,39 @@ class UpdateController():
                  summary_temperature:float,
                  summary_max_tokens:int,
                  summary_top_k:float,
+                 summary_concurrency:int = 1,
+                 summary_rpm:int = None,
+                 summary_tpm:int = None,
+                 summary_cache_path:str = None,
+                 practise_routing:str = "flat",
                  DL_recursive_mode:bool = False,
                  DL_extract_images:bool = True,
-                 database_type = "FAISS"
+                 DL_workers:int = 1,
+                 DL_file_timeout:float = None,
+                 DL_cache_path:str = None,
+                 DL_pdf_backend:str = "pypdf",
+                 DL_ocr_policy:str = "all",
+                 DL_ocr_min_chars:int = 100,
+                 DL_ocr_min_image_pixels:int = 250000,
+                 DL_ocr_workers:int = 2,
+                 DL_ocr_cache_path:str = None,
+                 DL_url_workers:int = 4,
+                 DL_url_timeout:float = 15,
+                 DL_url_max_per_host:int = 4,
+                 DL_url_cache_path:str = None,
+                 DL_pdf_shard_pages:int = None,
+                 database_type = "FAISS",
+                 embedding_backend:str = "torch",
+                 embedding_workers:int = 1,
+                 embedding_batch_tokens:int = None,
+                 embedding_server_url:str = None,
+                 ingestion_streaming:bool = False,
+                 splitter_type:str = "text",
+                 splitter_chunk_tokens:int = None,
+                 splitter_overlap_tokens:int = 32,
+                 splitter_breakpoint_percentile:float = 95,
+                 splitter_pool_embeddings:bool = True,
+                 splitter_truncation_report:bool = False
                  ):
             """
             Initializes the application by validating the given content path.
@@ -51,34 +80,112 @@ class UpdateController():
 
             teoria_content_path = str(Path(content_path) / "teoria")
 
-            self.update_theory_service = RegularUpdateService(database_path=database_path,
-                                                             context_path = teoria_content_path,
-                                                             embedding_model_name= embedding_model_name,
-                                                             DL_extract_images= DL_extract_images,
-                                                             DL_recursive_mode=DL_recursive_mode,
-                                                             database_type=database_type,
-                                                             database_name = "teoria/")
+            self.update_theory_service = RegularUpdateService(
+                database_path = database_path,
+                context_path = teoria_content_path,
+                embedding_model_name = embedding_model_name,
+                DL_extract_images = DL_extract_images,
+                DL_workers = DL_workers,
+                DL_file_timeout = DL_file_timeout,
+                DL_cache_path = DL_cache_path,
+                DL_pdf_backend = DL_pdf_backend,
+                DL_ocr_policy = DL_ocr_policy,
+                DL_ocr_min_chars = DL_ocr_min_chars,
+                DL_ocr_min_image_pixels = DL_ocr_min_image_pixels,
+                DL_ocr_workers = DL_ocr_workers,
+                DL_ocr_cache_path = DL_ocr_cache_path,
+                DL_url_workers = DL_url_workers,
+                DL_url_timeout = DL_url_timeout,
+                DL_url_max_per_host = DL_url_max_per_host,
+                DL_url_cache_path = DL_url_cache_path,
+                DL_pdf_shard_pages = DL_pdf_shard_pages,
+                DL_recursive_mode = DL_recursive_mode,
+                database_type = database_type,
+                embedding_backend = embedding_backend,
+                embedding_workers = embedding_workers,
+                embedding_batch_tokens = embedding_batch_tokens,
+                embedding_server_url = embedding_server_url,
+                ingestion_streaming = ingestion_streaming,
+                splitter_type = splitter_type,
+                splitter_chunk_tokens = splitter_chunk_tokens,
+                splitter_overlap_tokens = splitter_overlap_tokens,
+                splitter_breakpoint_percentile = splitter_breakpoint_percentile,
+                splitter_pool_embeddings = splitter_pool_embeddings,
+                splitter_truncation_report = splitter_truncation_report,
+                database_name = "teoria/"
+            )
 
             info_content_path = str(Path(content_path) / "info")
-            self.update_info_service = RegularUpdateService(database_path=database_path,
-                                                             context_path = info_content_path,
-                                                             embedding_model_name= embedding_model_name,
-                                                             DL_extract_images= DL_extract_images,
-                                                             DL_recursive_mode=DL_recursive_mode,
-                                                             database_type=database_type,
-                                                             database_name = "info/")
+            self.update_info_service = RegularUpdateService(
+                database_path = database_path,
+                context_path = info_content_path,
+                embedding_model_name = embedding_model_name,
+                DL_extract_images = DL_extract_images,
+                DL_workers = DL_workers,
+                DL_file_timeout = DL_file_timeout,
+                DL_cache_path = DL_cache_path,
+                DL_pdf_backend = DL_pdf_backend,
+                DL_ocr_policy = DL_ocr_policy,
+                DL_ocr_min_chars = DL_ocr_min_chars,
+                DL_ocr_min_image_pixels = DL_ocr_min_image_pixels,
+                DL_ocr_workers = DL_ocr_workers,
+                DL_ocr_cache_path = DL_ocr_cache_path,
+                DL_url_workers = DL_url_workers,
+                DL_url_timeout = DL_url_timeout,
+                DL_url_max_per_host = DL_url_max_per_host,
+                DL_url_cache_path = DL_url_cache_path,
+                DL_pdf_shard_pages = DL_pdf_shard_pages,
+                DL_recursive_mode = DL_recursive_mode,
+                database_type = database_type,
+                embedding_backend = embedding_backend,
+                embedding_workers = embedding_workers,
+                embedding_batch_tokens = embedding_batch_tokens,
+                embedding_server_url = embedding_server_url,
+                ingestion_streaming = ingestion_streaming,
+                splitter_type = splitter_type,
+                splitter_chunk_tokens = splitter_chunk_tokens,
+                splitter_overlap_tokens = splitter_overlap_tokens,
+                splitter_breakpoint_percentile = splitter_breakpoint_percentile,
+                splitter_pool_embeddings = splitter_pool_embeddings,
+                splitter_truncation_report = splitter_truncation_report,
+                database_name = "info/"
+            )
 
             lab_content_path = str(Path(content_path) / "practica")
-            self.update_practise_service = PractiseUpdateService(database_path=database_path,
-                                                             context_path = lab_content_path,
-                                                             summary_model_type =  summary_model_type,
-                                                             summary_model_name =  summary_model_name,
-                                                             summary_api_key = summary_api_key,
-                                                             summary_temperature = summary_temperature,
-                                                             summary_top_k = summary_top_k,
-                                                             summary_max_tokens = summary_max_tokens,
-                                                             DL_extract_images= DL_extract_images,
-                                                             DL_recursive_mode= True,)           ##Always set at true
+            self.update_practise_service = PractiseUpdateService(
+                database_path = database_path,
+                context_path = lab_content_path,
+                summary_model_type = summary_model_type,
+                summary_model_name = summary_model_name,
+                summary_api_key = summary_api_key,
+                summary_temperature = summary_temperature,
+                summary_top_k = summary_top_k,
+                summary_max_tokens = summary_max_tokens,
+                summary_concurrency = summary_concurrency,
+                summary_rpm = summary_rpm,
+                summary_tpm = summary_tpm,
+                summary_cache_path = summary_cache_path,
+                practise_routing = practise_routing,
+                embedding_model_name = embedding_model_name,
+                embedding_backend = embedding_backend,
+                embedding_server_url = embedding_server_url,
+                DL_extract_images = DL_extract_images,
+                DL_workers = DL_workers,
+                DL_file_timeout = DL_file_timeout,
+                DL_cache_path = DL_cache_path,
+                DL_pdf_backend = DL_pdf_backend,
+                DL_ocr_policy = DL_ocr_policy,
+                DL_ocr_min_chars = DL_ocr_min_chars,
+                DL_ocr_min_image_pixels = DL_ocr_min_image_pixels,
+                DL_ocr_workers = DL_ocr_workers,
+                DL_ocr_cache_path = DL_ocr_cache_path,
+                DL_url_workers = DL_url_workers,
+                DL_url_timeout = DL_url_timeout,
+                DL_url_max_per_host = DL_url_max_per_host,
+                DL_url_cache_path = DL_url_cache_path,
+                DL_pdf_shard_pages = DL_pdf_shard_pages,
+                DL_recursive_mode = True,
+            )           ##Always set at true
 
             self.logger = logging.getLogger(__name__)
 
@@ -103,40 +210,20 @@ class UpdateController():
         return True
 
 
-    def _clear_structure_content(self, content_path: str) -> None:
-        """
-        Removes all files and subdirectories inside the required folders,
-        while keeping the main structure intact.
-
-        :param content_path: Base path where the structure exists.
-        """
-        base = Path(content_path)
-        target_dirs = ["teoria", "info", "practica"]
-
-        for rel_path in target_dirs:
-            dir_path = base / rel_path
-            if dir_path.is_dir():
-                for item in dir_path.iterdir():
-                    if item.is_file():
-                        item.unlink()
-                    elif item.is_dir():
-                        shutil.rmtree(item)
-
-
     def launch(self):
         """
-        Executes the update process for all knowledge bases by clearing existing content
-        and triggering updates for theory, information, and practical data sources.
+        Executes the update process for all knowledge bases, triggering updates for theory,
+        information, and practical data sources.
 
         Description:
-            - Clears the content of the current database directory.
             - Launches the update services for:
                 - Theory content
                 - Informational content
                 - Practical exercises or files
+            - Every service only rebuilds (and clears) its database when its content changed,
+              so the databases of unchanged folders are kept.
         """
         try:
-            self._clear_structure_content(self.DATABASE_PATH)
             self.update_theory_service.launch()
             self.update_info_service.launch()
             self.update_practise_service.launch()
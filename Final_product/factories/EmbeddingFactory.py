@@ -0,0 +1,92 @@
+from langchain_huggingface import HuggingFaceEmbeddings
+from infrastructure.embeddings.embedding_server import RemoteEmbeddings
+from pathlib import Path
+from typing import Any, Dict, Optional
+import threading
+import json
+import logging
+
+
+class EmbeddingFactory:
+    """
+    Process-wide registry of embedding models.
+
+    Loading a sentence-transformer is slow and takes hundreds of MB, so every database
+    manager of the process shares the same instance for a given model name and kwargs.
+    The registry is thread-safe: concurrent callers asking for the same model wait for
+    a single load.
+
+    Backends:
+    - "torch": PyTorch `HuggingFaceEmbeddings` (default).
+    - "onnx": ONNX Runtime export of the same model, CPU only.
+    - "onnx-int8": ONNX Runtime export with dynamic int8 quantization.
+
+    If `server_url` is given no model is loaded: the embeddings are requested to the
+    shared EmbeddingServer, which holds the model for every process.
+    """
+
+    ONNX_DIRECTORY = Path("Final_product") / "models" / "onnx"
+    SUPPORTED_BACKENDS = ["torch", "onnx", "onnx-int8"]
+
+    _instances: Dict[str, Any] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_embeddings(
+        model_name: str,
+        model_kwargs: Optional[Dict[str, Any]] = None,
+        encode_kwargs: Optional[Dict[str, Any]] = None,
+        backend: str = "torch",
+        server_url: Optional[str] = None
+    ):
+        """Returns the shared embedding model, loading it on first use."""
+        if backend not in EmbeddingFactory.SUPPORTED_BACKENDS:
+            raise ValueError(
+                f"Unsupported embedding backend: '{backend}'. "
+                f"Supported backends: {EmbeddingFactory.SUPPORTED_BACKENDS}")
+
+        model_kwargs = model_kwargs if model_kwargs is not None else {'trust_remote_code': 'True'}
+        encode_kwargs = encode_kwargs or {}
+        key = EmbeddingFactory._get_key(model_name, model_kwargs, encode_kwargs, backend,
+                                        server_url)
+
+        with EmbeddingFactory._lock:
+            if key not in EmbeddingFactory._instances and server_url:
+                EmbeddingFactory._instances[key] = RemoteEmbeddings(url=server_url)
+            elif key not in EmbeddingFactory._instances:
+                logging.getLogger(__name__).info(
+                    f"Cargando modelo de embeddings {model_name} ({backend})")
+                EmbeddingFactory._instances[key] = EmbeddingFactory._create(
+                    model_name, model_kwargs, encode_kwargs, backend)
+            return EmbeddingFactory._instances[key]
+
+    @staticmethod
+    def _create(model_name: str,
+                model_kwargs: Dict[str, Any],
+                encode_kwargs: Dict[str, Any],
+                backend: str):
+        if backend == "torch":
+            return HuggingFaceEmbeddings(
+                model_name=model_name,
+                model_kwargs=model_kwargs,
+                encode_kwargs=encode_kwargs
+            )
+
+        # Imported here so the torch backend does not need onnxruntime or onnx
+        from infrastructure.embeddings.onnx_embeddings import OnnxEmbeddings
+        return OnnxEmbeddings(
+            model_name=model_name,
+            export_directory=str(EmbeddingFactory.ONNX_DIRECTORY),
+            quantize=(backend == "onnx-int8"),
+            batch_size=encode_kwargs.get("batch_size", 32)
+        )
+
+    @staticmethod
+    def clear() -> None:
+        """Drops every cached model (the memory is released once nobody references them)."""
+        with EmbeddingFactory._lock:
+            EmbeddingFactory._instances.clear()
+
+    @staticmethod
+    def _get_key(model_name: str, *options: Any) -> str:
+        return json.dumps([model_name, *options], sort_keys=True, default=str)
@@ -0,0 +1,50 @@
+from interfaces.splitter import Splitter
+from infrastructure.Splitters.text_splitter import TextSplitter
+from infrastructure.Splitters.token_splitter import TokenSplitter
+from infrastructure.Splitters.semantic_splitter import SemanticSplitter
+from langchain_core.embeddings import Embeddings
+from typing import Optional
+
+
+class SplitterFactory:
+    """
+    Creates the splitter of the regular databases.
+
+    Splitters:
+    - "text": character-based `TextSplitter` (1500 characters, 500 overlap).
+    - "token": `TokenSplitter`, chunks measured in tokens of the embedding model.
+    - "semantic": `SemanticSplitter`, boundaries where adjacent sentences stop being similar.
+    """
+
+    SUPPORTED_SPLITTERS = ["text", "token", "semantic"]
+
+    @staticmethod
+    def create_splitter(
+        splitter_type: str = "text",
+        embedding_model_name: Optional[str] = None,
+        embeddings: Optional[Embeddings] = None,
+        chunk_tokens: Optional[int] = None,
+        chunk_overlap_tokens: int = 32,
+        breakpoint_percentile: float = 95,
+        pool_embeddings: bool = True
+    ) -> Splitter:
+        """Factory method to create splitters based on the configured type."""
+
+        if splitter_type == "text":
+            return TextSplitter()
+
+        elif splitter_type == "token":
+            return TokenSplitter(model_name=embedding_model_name,
+                                 embeddings=embeddings,
+                                 chunk_tokens=chunk_tokens,
+                                 chunk_overlap_tokens=chunk_overlap_tokens)
+
+        elif splitter_type == "semantic":
+            return SemanticSplitter(embeddings=embeddings,
+                                    breakpoint_percentile=breakpoint_percentile,
+                                    pool_embeddings=pool_embeddings)
+
+        else:
+            raise ValueError(
+                f"Unsupported splitter type: '{splitter_type}'. "
+                f"Supported types: {SplitterFactory.SUPPORTED_SPLITTERS}")
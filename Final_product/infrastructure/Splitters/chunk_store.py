@@ -0,0 +1,72 @@
+from langchain.schema import Document
+from collections.abc import Sequence
+from typing import Callable, Iterable, Optional
+from array import array
+
+
+class ChunkStore(Sequence):
+    """
+    Compact representation of the chunks of a document during ingestion.
+
+    The text of every page is stored once and each chunk is a `(page_id, start, end)`
+    offset kept in three `array`s, so overlapping chunks do not copy the text they share
+    and no `Document` exists per chunk until it is needed. Indexing materializes the
+    chunk: a new `Document` with its own copy of the page metadata, passed through
+    `transform(document, index)` when one is set (e.g. the preprocessing of the
+    database manager). `text(i)` returns only the chunk text, for embedding.
+    """
+
+    def __init__(self, transform: Optional[Callable[[Document, int], Document]] = None):
+        self.pages: list[str] = []
+        self.metadata: list[dict] = []
+        self.page_ids = array("I")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.transform = transform
+
+    def add(self, page: Document, chunks: Iterable[str]) -> None:
+        """
+        Adds a page and its chunks, which must be substrings of the page in order (as
+        produced by `RecursiveCharacterTextSplitter`). A chunk that cannot be found in
+        the page is kept as a page of its own.
+        """
+        text = page.page_content
+        page_id = len(self.pages)
+        self.pages.append(text)
+        self.metadata.append(page.metadata)
+
+        search_from = 0
+        for chunk in chunks:
+            start = text.find(chunk, search_from)
+            if start == -1:
+                self.pages.append(chunk)
+                self.metadata.append(page.metadata)
+                self._append(len(self.pages) - 1, 0, len(chunk))
+                continue
+            self._append(page_id, start, start + len(chunk))
+            search_from = start + 1
+
+    def text(self, index: int) -> str:
+        return self.pages[self.page_ids[index]][self.starts[index]:self.ends[index]]
+
+    def __len__(self) -> int:
+        return len(self.page_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ChunkStore index out of range")
+
+        doc = Document(page_content=self.text(index),
+                       metadata=dict(self.metadata[self.page_ids[index]]))
+        if self.transform is not None:
+            doc = self.transform(doc, index)
+        return doc
+
+    def _append(self, page_id: int, start: int, end: int) -> None:
+        self.page_ids.append(page_id)
+        self.starts.append(start)
+        self.ends.append(end)
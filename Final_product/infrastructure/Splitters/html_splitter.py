@@ -1,26 +1,76 @@
-from langchain.text_splitter import HTMLHeaderTextSplitter
+from langchain.text_splitter import HTMLHeaderTextSplitter, RecursiveCharacterTextSplitter
 from langchain.schema import Document
+from bs4 import BeautifulSoup
 from typing import List
 from interfaces.splitter import Splitter
 
 
 class HtmlSplitter(Splitter):
+    """
+    Splits HTML documents by their h1-h3 sections and bounds the size of every chunk.
+
+    - Scripts, styles and other non-visible elements are removed before splitting.
+    - Each header and the text under it form one section; the header hierarchy is kept
+      in the metadata ("Header 1", "Header 2", "Header 3") next to the document metadata.
+    - Sections longer than `chunk_size` characters are split again with `chunk_overlap`,
+      and every continuation chunk starts with its header trail ("H1 > H2 > H3").
+    """
+
+    HEADERS = [("h1", "Header 1"), ("h2", "Header 2"), ("h3", "Header 3")]
+    NON_VISIBLE_TAGS = ["script", "style", "noscript", "template", "svg", "iframe"]
 
     def __init__(self, chunk_size=1000, chunk_overlap=100):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.splitter = HTMLHeaderTextSplitter(
-            headers_to_split_on=[
-                ("h1", "Header 1"),
-                ("h2", "Header 2"),
-                ("h3", "Header 3")
-            ]
+        self.splitter = HTMLHeaderTextSplitter(headers_to_split_on=self.HEADERS)
+        self.size_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+            separators=["\n\n", "\n", ". ", " "]
         )
 
     def split(self, documents: List[Document]) -> List[Document]:
+        """
+        Splits each HTML document in sections of at most `chunk_size` characters.
+        """
         chunked_docs = []
         for doc in documents:
-            chunks = self.splitter.split_text(doc.page_content)
-            for chunk in chunks:
-                chunked_docs.append(chunk)
+            for headers, text in self._get_sections(doc.page_content):
+                metadata = dict(doc.metadata, **headers)
+                for chunk in self._bound_size(headers, text):
+                    chunked_docs.append(Document(page_content=chunk, metadata=dict(metadata)))
         return chunked_docs
+
+    def _get_sections(self, html: str) -> List[tuple]:
+        """
+        (headers, text) of each section. The header splitter yields the header alone, it is
+        joined to its text.
+        """
+        soup = BeautifulSoup(html, "html.parser")
+        for tag in soup(self.NON_VISIBLE_TAGS):
+            tag.decompose()
+
+        sections = []
+        for element in self.splitter.split_text(str(soup)):
+            if sections and sections[-1][0] == element.metadata:
+                sections[-1][1].append(element.page_content)
+            else:
+                sections.append((element.metadata, [element.page_content]))
+        return [(headers, "\n".join(texts)) for headers, texts in sections]
+
+    def _bound_size(self, headers: dict, text: str) -> List[str]:
+        if len(text) <= self.chunk_size:
+            return [text]
+
+        trail = " > ".join(headers[name] for _, name in self.HEADERS if name in headers)
+        if not trail:
+            return self.size_splitter.split_text(text)
+
+        prefix = f"{trail}\n"
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=max(self.chunk_size - len(prefix), self.chunk_size // 2),
+            chunk_overlap=self.chunk_overlap,
+            separators=["\n\n", "\n", ". ", " "]
+        )
+        chunks = splitter.split_text(text)
+        return chunks[:1] + [prefix + chunk for chunk in chunks[1:]]
@@ -0,0 +1,155 @@
+from interfaces.splitter import Splitter
+from infrastructure.Splitters.text_splitter import TextSplitter
+from langchain.schema import Document
+from langchain.text_splitter import Language, RecursiveCharacterTextSplitter
+from typing import List
+from pathlib import Path
+import ast
+import logging
+
+
+class PythonCodeSplitter(Splitter):
+    """
+    Splits Python source files along their syntax tree.
+
+    Every `.py` document produces:
+    - A "module" chunk: module docstring, imports and top-level code, with each class and
+      function reduced to its signature and docstring (an outline of the file).
+    - A "class" chunk per class: header, docstring and attributes, with the methods
+      reduced to their signature and docstring.
+    - A "function" / "method" chunk per function: its full source with decorators and
+      docstring. Methods are prefixed with the header of their class. Nested functions
+      stay inside their parent.
+
+    Chunk metadata adds `chunk_type`, `name` (qualified name), `start_line` and `end_line`
+    to the metadata of the file. Chunks longer than `max_chunk_size` characters are split
+    again on Python boundaries. Other formats, and files that do not parse, go through
+    `fallback` (the character `TextSplitter` by default).
+    """
+
+    DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+    def __init__(self,
+                 max_chunk_size: int = 4000,
+                 chunk_overlap: int = 200,
+                 fallback: Splitter = None):
+        self.max_chunk_size = max_chunk_size
+        self.fallback = fallback or TextSplitter()
+        self.splitter = RecursiveCharacterTextSplitter.from_language(
+            Language.PYTHON,
+            chunk_size=max_chunk_size,
+            chunk_overlap=chunk_overlap
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def split(self, documents: List[Document]) -> List[Document]:
+        """
+        Splits the Python documents by module, class and function; the rest with the fallback
+        splitter.
+        """
+        chunked_docs = []
+        for doc in documents:
+            if Path(doc.metadata.get("source", "")).suffix.lower() != ".py":
+                chunked_docs.extend(self.fallback.split([doc]))
+                continue
+            try:
+                tree = ast.parse(doc.page_content)
+            except (SyntaxError, ValueError) as e:
+                self.logger.warning(f"No se pudo analizar {doc.metadata.get('source')} ({e}), "
+                                    "se divide como texto")
+                chunked_docs.extend(self.fallback.split([doc]))
+                continue
+            chunked_docs.extend(self._split_module(doc, tree))
+        return chunked_docs
+
+    def _split_module(self, doc: Document, tree: ast.Module) -> List[Document]:
+        lines = doc.page_content.splitlines(keepends=True)
+        chunks = []
+
+        outline = self._outline(lines, 1, len(lines), tree.body)
+        if outline.strip():
+            module_name = Path(doc.metadata["source"]).stem
+            chunks.extend(self._make_chunks(doc, outline, "module", module_name, 1, len(lines)))
+
+        self._split_body(doc, lines, tree.body, prefix="", qualname="", chunks=chunks)
+        return chunks
+
+    def _split_body(self, doc: Document, lines: List[str], body: list, prefix: str, qualname: str,
+                    chunks: List[Document], in_class: bool = False) -> None:
+        """
+        Adds the chunks of the classes and functions of `body`; `prefix` holds the enclosing class
+        headers (empty for a class written on one line) and `in_class` tells if `body` is a class
+        body.
+        """
+        for node in body:
+            if not isinstance(node, self.DEFINITIONS):
+                continue
+            name = f"{qualname}.{node.name}" if qualname else node.name
+            start = self._start(node)
+
+            if isinstance(node, ast.ClassDef):
+                text = prefix + self._outline(lines, start, node.end_lineno, node.body)
+                chunks.extend(self._make_chunks(doc, text, "class", name, start, node.end_lineno))
+                header = ""
+                if node.body[0].lineno > node.lineno:
+                    header = "".join(lines[start - 1:node.body[0].lineno - 1])
+                self._split_body(doc, lines, node.body, prefix + header, name, chunks,
+                                 in_class=True)
+            else:
+                text = prefix + "".join(lines[start - 1:node.end_lineno])
+                chunk_type = "method" if in_class else "function"
+                chunks.extend(self._make_chunks(doc, text, chunk_type, name, start,
+                                                node.end_lineno))
+
+    def _outline(self, lines: List[str], first: int, last: int, body: list) -> str:
+        """
+        Lines `first`..`last` (1-based) with the classes and functions of `body` reduced to a stub.
+        """
+        parts = []
+        cursor = first
+        for node in body:
+            if not isinstance(node, self.DEFINITIONS):
+                continue
+            start = self._start(node)
+            parts.extend(lines[cursor - 1:start - 1])
+            parts.append(self._stub(lines, node))
+            cursor = node.end_lineno + 1
+        parts.extend(lines[cursor - 1:last])
+        return "".join(parts)
+
+    def _stub(self, lines: List[str], node: ast.AST) -> str:
+        """
+        Decorators, signature and docstring of a definition, followed by `...` if it has more code.
+        """
+        start = self._start(node)
+        first_statement = node.body[0]
+        if first_statement.lineno == node.lineno:
+            # One-line definition
+            return "".join(lines[start - 1:node.end_lineno])
+
+        if ast.get_docstring(node, clean=False) is not None:
+            end = first_statement.end_lineno
+        else:
+            end = first_statement.lineno - 1
+        stub = "".join(lines[start - 1:end])
+        if end < node.end_lineno:
+            indent = lines[first_statement.lineno - 1][:first_statement.col_offset]
+            stub += f"{indent}...\n"
+        return stub
+
+    def _start(self, node: ast.AST) -> int:
+        return min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+
+    def _make_chunks(self,
+                     doc: Document,
+                     text: str,
+                     chunk_type: str,
+                     name: str,
+                     start: int,
+                     end: int) -> List[Document]:
+        metadata = dict(doc.metadata, chunk_type=chunk_type, name=name, start_line=start,
+                        end_line=end)
+        if len(text) <= self.max_chunk_size:
+            return [Document(page_content=text, metadata=metadata)]
+        return [Document(page_content=part, metadata=dict(metadata))
+                for part in self.splitter.split_text(text)]
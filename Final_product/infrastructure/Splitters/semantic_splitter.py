@@ -0,0 +1,167 @@
+from interfaces.splitter import Splitter
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+from collections import OrderedDict
+from typing import List
+import numpy as np
+import hashlib
+import re
+
+
+class SemanticSplitter(Splitter):
+    """
+    Splits documents where the topic changes, measured with the embedding model.
+
+    The text of every page is split in sentences and each sentence is embedded. A chunk
+    boundary is placed where the cosine distance between adjacent sentences is above the
+    `breakpoint_percentile` of the distances of the file, and chunks are kept between
+    `min_chunk_chars` and `max_chunk_chars` characters. Chunks never cross pages.
+
+    The sentence embeddings are not thrown away:
+    - They are cached by content (LRU), so sentences repeated across pages and files
+      (headers, footers, boilerplate) are embedded once.
+    - With `pool_embeddings`, the embedding of each chunk is the mean of its sentence
+      embeddings (rescaled to their mean norm) and is stored in `chunk_vectors`, keyed by
+      the chunk text. `PrecomputedEmbeddings` serves them at indexing time, so the chunks
+      are not embedded a second time.
+    """
+
+    SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+    def __init__(self,
+                 embeddings: Embeddings,
+                 breakpoint_percentile: float = 95,
+                 min_chunk_chars: int = 200,
+                 max_chunk_chars: int = 1500,
+                 max_sentence_chars: int = 500,
+                 pool_embeddings: bool = True,
+                 max_cached_sentences: int = 20000):
+        """
+        :param embeddings: Embedding model of the sentences (the one of the database).
+        :param breakpoint_percentile: Percentile of the adjacent-sentence distances above which
+                                      a chunk ends.
+        :param min_chunk_chars: Chunks shorter than this are not ended at a breakpoint.
+        :param max_chunk_chars: Chunks are ended before they exceed this size.
+        :param max_sentence_chars: Longer sentences (tables, code) are split by lines and then
+                                   by size.
+        :param pool_embeddings: Keep the pooled embedding of every chunk in `chunk_vectors`.
+        :param max_cached_sentences: Size of the sentence embedding cache.
+        """
+        self.embeddings = embeddings
+        self.breakpoint_percentile = breakpoint_percentile
+        self.min_chunk_chars = min_chunk_chars
+        self.max_chunk_chars = max_chunk_chars
+        self.max_sentence_chars = max_sentence_chars
+        self.pool_embeddings = pool_embeddings
+        self.max_cached_sentences = max_cached_sentences
+        self.sentence_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self.chunk_vectors: dict[str, list[float]] = {}
+
+    def split(self, documents: List[Document]) -> List[Document]:
+        """
+        Splits the pages of a document in semantic chunks, keeping the metadata of each page.
+        """
+        pages = [self._get_sentences(doc.page_content) for doc in documents]
+        vectors = self._embed_sentences([sentence for sentences in pages for sentence in sentences])
+
+        # Distances between adjacent sentences of each page; the threshold is computed for the
+        # whole file
+        page_vectors = []
+        distances = []
+        start = 0
+        for sentences in pages:
+            page = vectors[start:start + len(sentences)]
+            start += len(sentences)
+            page_vectors.append(page)
+            distances.append(self._get_distances(page))
+        all_distances = np.concatenate(distances) if distances else np.empty(0)
+        threshold = np.inf
+        if all_distances.size:
+            threshold = np.percentile(all_distances, self.breakpoint_percentile)
+
+        chunked_docs = []
+        for doc, sentences, page, page_distances in zip(documents, pages, page_vectors, distances):
+            for first, last in self._get_boundaries(sentences, page_distances, threshold):
+                text = " ".join(sentences[first:last])
+                if self.pool_embeddings:
+                    self.chunk_vectors[text] = self._pool(page[first:last])
+                chunked_docs.append(Document(page_content=text, metadata=dict(doc.metadata)))
+        return chunked_docs
+
+    def _get_sentences(self, text: str) -> List[str]:
+        sentences = []
+        for sentence in self.SENTENCE_PATTERN.split(text):
+            sentence = sentence.strip()
+            if len(sentence) <= self.max_sentence_chars:
+                if sentence:
+                    sentences.append(sentence)
+                continue
+            for line in sentence.splitlines():
+                line = line.strip()
+                step = self.max_sentence_chars
+                sentences.extend(line[i:i + step] for i in range(0, len(line), step))
+        return sentences
+
+    def _embed_sentences(self, sentences: List[str]) -> np.ndarray:
+        """
+        Embeds the sentences not in the cache, in a single batch, and returns every vector in order.
+        """
+        keys = [hashlib.sha1(sentence.encode("utf-8")).hexdigest() for sentence in sentences]
+        missing = {}
+        for key, sentence in zip(keys, sentences):
+            if key in self.sentence_cache:
+                self.sentence_cache.move_to_end(key)
+            else:
+                missing.setdefault(key, sentence)
+
+        if missing:
+            new_vectors = self.embeddings.embed_documents(list(missing.values()))
+            for key, vector in zip(missing, new_vectors):
+                self.sentence_cache[key] = np.asarray(vector, dtype=np.float32)
+
+        vectors = np.empty((0, 0), dtype=np.float32)
+        if keys:
+            vectors = np.stack([self.sentence_cache[key] for key in keys])
+        while len(self.sentence_cache) > self.max_cached_sentences:
+            self.sentence_cache.popitem(last=False)
+        return vectors
+
+    def _get_distances(self, vectors: np.ndarray) -> np.ndarray:
+        """Cosine distance between each sentence and the next one."""
+        if len(vectors) < 2:
+            return np.empty(0, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1)
+        norms[norms == 0] = 1
+        unit = vectors / norms[:, None]
+        return 1 - np.einsum("ij,ij->i", unit[:-1], unit[1:])
+
+    def _get_boundaries(self,
+                        sentences: List[str],
+                        distances: np.ndarray,
+                        threshold: float) -> List[tuple]:
+        """(first, last) sentence ranges of the chunks of a page."""
+        boundaries = []
+        first = 0
+        size = 0
+        for i, sentence in enumerate(sentences):
+            if i > first:
+                too_long = size + 1 + len(sentence) > self.max_chunk_chars
+                topic_change = distances[i - 1] > threshold and size >= self.min_chunk_chars
+                if too_long or topic_change:
+                    boundaries.append((first, i))
+                    first = i
+                    size = 0
+            size += len(sentence) + (1 if size else 0)
+        if sentences:
+            boundaries.append((first, len(sentences)))
+        return boundaries
+
+    def _pool(self, vectors: np.ndarray) -> list[float]:
+        """
+        Mean of the sentence vectors, rescaled to their mean norm so distances keep their scale.
+        """
+        mean = vectors.mean(axis=0)
+        norm = np.linalg.norm(mean)
+        if norm > 0:
+            mean = mean * (np.linalg.norm(vectors, axis=1).mean() / norm)
+        return mean.tolist()
@@ -1,4 +1,5 @@
 from interfaces.splitter import Splitter
+from infrastructure.Splitters.chunk_store import ChunkStore
 from langchain.schema import Document
 from typing import List
 
@@ -29,12 +30,16 @@ class TextSplitter(Splitter):
         Description:
             - Iterates through the input documents.
             - Splits each document's content into smaller pieces using a text splitter.
-            - Wraps each chunk into a new Document while maintaining the original metadata.
+            - Wraps each chunk into a new Document with its own copy of the original metadata.
         """
-        chunked_docs = []
-        for doc in documents:
-            chunks = self.splitter.split_text(doc.page_content)
-            for chunk in chunks:
-                chunked_docs.append(Document(page_content=chunk, metadata=doc.metadata))
+        return list(self.split_compact(documents))
 
-        return chunked_docs
+    def split_compact(self, documents: List[Document]) -> ChunkStore:
+        """
+        Splits the documents keeping the text of each page once and the chunks as offsets
+        (`ChunkStore`); the chunk texts are only copied when they are accessed.
+        """
+        store = ChunkStore()
+        for doc in documents:
+            store.add(doc, self.splitter.split_text(doc.page_content))
+        return store
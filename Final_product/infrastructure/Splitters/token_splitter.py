@@ -0,0 +1,96 @@
+from interfaces.splitter import Splitter
+from infrastructure.Splitters.text_splitter import TextSplitter
+from infrastructure.Splitters.chunk_store import ChunkStore
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from transformers import AutoTokenizer
+from huggingface_hub import hf_hub_download
+from typing import List
+import json
+
+
+class TokenSplitter(Splitter):
+    """
+    Splits documents measuring the chunks in tokens of the embedding model.
+
+    Sentence-transformers truncate their input at `max_seq_length` word-pieces (128 for
+    paraphrase-multilingual-mpnet-base-v2), so 1500-character chunks are mostly thrown
+    away at embedding time. This splitter uses the model's own tokenizer and, by
+    default, a chunk length that fits the model limit, so every token of a chunk is
+    embedded. `truncation_report` measures how the character splitter would do.
+    """
+
+    def __init__(self, model_name: str, embeddings: Embeddings = None, chunk_tokens: int = None,
+                 chunk_overlap_tokens: int = 32):
+        """
+        :param model_name: Embedding model whose tokenizer is used.
+        :param embeddings: Loaded embedding model, to reuse its tokenizer and sequence limit.
+        :param chunk_tokens: Target chunk length in tokens (default: the model limit).
+        :param chunk_overlap_tokens: Overlap between consecutive chunks, in tokens.
+        """
+        self.tokenizer, self.max_seq_length = self._get_tokenizer(model_name, embeddings)
+        # The model adds its special tokens ([CLS], [SEP]) to every chunk
+        limit = self.max_seq_length - self.tokenizer.num_special_tokens_to_add()
+        self.chunk_tokens = min(chunk_tokens or limit, limit)
+        self.chunk_overlap_tokens = min(chunk_overlap_tokens, self.chunk_tokens // 2)
+        self.splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+            self.tokenizer,
+            chunk_size=self.chunk_tokens,
+            chunk_overlap=self.chunk_overlap_tokens,
+            separators=["\n\n\n", "\n\n", "\n", ". ", " "]
+        )
+
+    def split(self, documents: List[Document]) -> List[Document]:
+        """
+        Splits the documents in chunks of at most `chunk_tokens` tokens, keeping their metadata.
+        """
+        return list(self.split_compact(documents))
+
+    def split_compact(self, documents: List[Document]) -> ChunkStore:
+        """Same chunks as `split`, as offsets over the page texts (`ChunkStore`)."""
+        store = ChunkStore()
+        for doc in documents:
+            store.add(doc, self.splitter.split_text(doc.page_content))
+        return store
+
+    def truncation_report(self, documents: List[Document], reference: Splitter = None) -> dict:
+        """
+        Measures how many chunks of the character splitter (1500/500 by default) the
+        embedding model would truncate, and how many of their tokens would be discarded.
+
+        :return: dict with "chunks", "truncated_chunks", "tokens" and "discarded_tokens".
+        """
+        reference = reference or TextSplitter()
+        chunks = [chunk.page_content for chunk in reference.split(documents)]
+        lengths = []
+        if chunks:
+            input_ids = self.tokenizer(chunks, add_special_tokens=True)["input_ids"]
+            lengths = [len(ids) for ids in input_ids]
+        return {
+            "chunks": len(lengths),
+            "truncated_chunks": sum(1 for length in lengths if length > self.max_seq_length),
+            "tokens": sum(lengths),
+            "discarded_tokens": sum(max(0, length - self.max_seq_length) for length in lengths),
+        }
+
+    def _get_tokenizer(self, model_name: str, embeddings: Embeddings) -> tuple:
+        """Tokenizer and sequence limit of the loaded model, or loaded from the Hugging Face Hub."""
+        # langchain-huggingface keeps the SentenceTransformer in `_client` (`client` before 0.3)
+        client = getattr(embeddings, "_client", None)
+        if client is None:
+            client = getattr(embeddings, "client", None)
+        if client is not None and hasattr(client, "tokenizer"):
+            return client.tokenizer, client.max_seq_length
+        max_seq_length = getattr(embeddings, "max_seq_length", None)
+        if getattr(embeddings, "tokenizer", None) is not None and max_seq_length:
+            return embeddings.tokenizer, embeddings.max_seq_length
+
+        name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        tokenizer = AutoTokenizer.from_pretrained(name)
+        # The sentence-transformers limit is usually lower than the tokenizer's model_max_length
+        try:
+            with open(hf_hub_download(name, "sentence_bert_config.json"), encoding="utf-8") as f:
+                return tokenizer, json.load(f)["max_seq_length"]
+        except Exception:
+            return tokenizer, tokenizer.model_max_length
@@ -1,12 +1,14 @@
 from interfaces.databaseManager import Database_manager
 from langchain_core.documents import Document
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
+from chromadb.api.client import SharedSystemClient
 from pathlib import Path
+from typing import Iterable
 import time
 import pandas as pd
 import os
 import csv
+import threading
 
 class Chroma_database_manager(Database_manager):
     """
@@ -21,26 +23,41 @@ class Chroma_database_manager(Database_manager):
     - Prevents overwriting existing databases to ensure data integrity.
     - Supports similarity-based retrieval of documents for contextual search.
     - Implements reranking for improved result relevance.
+    - Keeps the opened collections in memory between queries and reopens them when the
+      database is rebuilt.
     """
 
 
-    def __init__(self, model_name: str, work_directory:str):
-        super().__init__(work_directory, model_name)
+    def __init__(self, model_name: str, work_directory:str, embedding_backend:str = "torch",
+                 embedding_workers:int = 1, embedding_batch_tokens:int = None,
+                 embedding_server_url:str = None):
+        super().__init__(work_directory, model_name, embedding_backend, embedding_workers,
+                         embedding_batch_tokens, embedding_server_url)
+        self._stores = {}
+        self._stores_lock = threading.Lock()
 
 
 
-    def create (self, documents: list[list[Document]], database_name:str) -> None:
+    def create (self,
+                documents: list[list[Document]],
+                database_name:str,
+                precomputed_vectors: dict = None) -> None:
         """
         Generate and store document embeddings in a vector database.
 
         This method processes a list of documents, converts them into embeddings, and
         stores them in a Chroma vector database. If a database with the given name already
-        exists, an exception is raised to prevent overwriting.
+        exists, an exception is raised to prevent overwriting. With several embedding
+        workers configured the chunks are embedded in parallel processes. Chunks with a
+        vector in `precomputed_vectors` (keyed by their text) are not embedded again.
 
         :param documents: A nested list where each sublist contains pages of a document.
         :type documents: list[list[Document]]
         :param database_name: Name of the database to be created, defaults to "test1.db".
         :type database_name: str, optional
+        :param precomputed_vectors: Vectors already computed for some chunks, e.g. by
+                                    `SemanticSplitter`.
+        :type precomputed_vectors: dict[str, list[float]], optional
         :raises FileExistsError: If a database with the specified name already exists.
         """
 
@@ -60,10 +77,39 @@ class Chroma_database_manager(Database_manager):
 
             Chroma.from_documents(
                 documents=docs,
-                embedding=self.embedding_model,
+                embedding=self.get_ingestion_embeddings(precomputed_vectors=precomputed_vectors),
                 persist_directory = database_path)
 
 
+    def create_from_embedded_batches(self,
+                                     batches: Iterable[tuple[list[Document], list[list[float]]]],
+                                     database_name: str) -> None:
+        """
+        Build the database incrementally from batches of preprocessed chunks and their vectors.
+
+        Every batch is upserted into the persistent collection with its precomputed
+        embeddings as soon as it arrives.
+
+        :param batches: Iterable of `(chunks, vectors)` as produced by the ingestion pipeline.
+        :param database_name: Name of the database to be created.
+        :raises FileExistsError: If a database with the specified name already exists.
+        """
+        database_path = self.work_directory + database_name
+
+        path = Path(database_path)
+        if path.exists() and any(path.iterdir()):
+            raise FileExistsError(
+                "The database already exists in current workspace (folder is not empty).")
+
+        vector_store = Chroma(persist_directory=database_path,
+                              embedding_function=self.embedding_model)
+        for chunks, vectors in batches:
+            vector_store._collection.upsert(ids=[chunk.id for chunk in chunks],
+                                            embeddings=vectors,
+                                            documents=[chunk.page_content for chunk in chunks],
+                                            metadatas=[chunk.metadata for chunk in chunks])
+
+
 
     def get_context(self, database_name:str, query_text: str, k: int = 5) -> list:
         """
@@ -88,14 +134,36 @@ class Chroma_database_manager(Database_manager):
         path = Path(database_path)
 
         if not path.exists() or not any(path.iterdir()):
-            raise FileExistsError("The database doesn't exist or the directory is empty in the current workspace.")
-
-        vector_store= Chroma(persist_directory=database_path, embedding_function=self.embedding_model)
+            raise FileExistsError(
+                "The database doesn't exist or the directory is empty in the current workspace.")
+
+        version = self._get_version(path)
+        with self._stores_lock:
+            cached = self._stores.get(database_name)
+            if cached is None or cached[0] != version:
+                if cached is not None:
+                    # chromadb keeps one client per path; drop it so the new files are read
+                    SharedSystemClient.clear_system_cache()
+                vector_store = Chroma(persist_directory=database_path,
+                                      embedding_function=self.embedding_model)
+                cached = (version, vector_store)
+                self._stores[database_name] = cached
+            vector_store = cached[1]
         results = vector_store.similarity_search_with_score(query_text,k=k)
         results = self._rerank_documents(results)
         return results
 
 
+    def _get_version(self, path: Path) -> tuple:
+        """
+        Identity of the database files: changes when an update rewrites or rebuilds them.
+        Only the SQLite file is checked, since queries do not modify it.
+        """
+        sqlite_path = path / "chroma.sqlite3"
+        stat = sqlite_path.stat() if sqlite_path.exists() else path.stat()
+        return stat.st_ino, stat.st_mtime_ns
+
+
     def _rerank_documents(self, context:list, distance_threshold:float = 6.5) -> list:
 
         """
@@ -4,11 +4,12 @@ from pathlib import Path
 from langchain_community.vectorstores import FAISS
 from langchain_community.retrievers import BM25Retriever
 from langchain.retrievers import EnsembleRetriever
-from pathlib import Path
+from typing import Iterable
 import pandas as pd
 import os
 import csv
 import re
+import threading
 
 
 class Faiss_database_manager(Database_manager):
@@ -24,26 +25,40 @@ class Faiss_database_manager(Database_manager):
     - Prevents overwriting existing databases to ensure data integrity.
     - Supports similarity-based retrieval of documents for contextual search.
     - Implements reranking for improved result relevance.
+    - Keeps the loaded indexes in memory and reloads them only when the files change.
     """
 
 
-    def __init__(self, model_name: str, work_directory:str):
-        super().__init__(work_directory, model_name)
+    def __init__(self, model_name: str, work_directory:str, embedding_backend:str = "torch",
+                 embedding_workers:int = 1, embedding_batch_tokens:int = None,
+                 embedding_server_url:str = None):
+        super().__init__(work_directory, model_name, embedding_backend, embedding_workers,
+                         embedding_batch_tokens, embedding_server_url)
+        self._stores = {}
+        self._stores_lock = threading.Lock()
 
 
 
-    def create (self, documents: list[list[Document]], database_name:str) -> None:
+    def create (self,
+                documents: list[list[Document]],
+                database_name:str,
+                precomputed_vectors: dict = None) -> None:
         """
         Generate and store document embeddings in a vector database.
 
         This method processes a list of documents, converts them into embeddings, and
         stores them in a Chroma vector database. If a database with the given name already
-        exists, an exception is raised to prevent overwriting.
+        exists, an exception is raised to prevent overwriting. With several embedding
+        workers configured the chunks are embedded in parallel processes. Chunks with a
+        vector in `precomputed_vectors` (keyed by their text) are not embedded again.
 
         :param documents: A nested list where each sublist contains pages of a document.
         :type documents: list[list[Document]]
         :param database_name: Name of the database to be created, defaults to "test1.db".
         :type database_name: str, optional
+        :param precomputed_vectors: Vectors already computed for some chunks, e.g. by
+                                    `SemanticSplitter`.
+        :type precomputed_vectors: dict[str, list[float]], optional
         :raises FileExistsError: If a database with the specified name already exists.
         """
 
@@ -61,12 +76,52 @@ class Faiss_database_manager(Database_manager):
                 for j, page in enumerate(doc):
                     docs.append(self._preprocess_document(page, num_doc=i, num_page=j ))
 
-            vector_store = FAISS.from_documents(
-                    documents=docs,
-                    embedding=self.embedding_model)
+            embeddings = self.get_ingestion_embeddings(precomputed_vectors=precomputed_vectors)
+            vector_store = FAISS.from_documents(documents=docs, embedding=embeddings)
             vector_store.save_local(database_path)
 
 
+    def create_from_embedded_batches(self,
+                                     batches: Iterable[tuple[list[Document], list[list[float]]]],
+                                     database_name: str) -> None:
+        """
+        Build the database incrementally from batches of preprocessed chunks and their vectors.
+
+        The first batch creates the FAISS index and the next ones are appended to it, so the
+        chunks never have to be held in a list before indexing. The index itself lives in
+        memory until it is saved at the end.
+
+        :param batches: Iterable of `(chunks, vectors)` as produced by the ingestion pipeline.
+        :param database_name: Name of the database to be created.
+        :raises FileExistsError: If a database with the specified name already exists.
+        """
+        database_path = self.work_directory + database_name
+
+        path = Path(database_path)
+        if path.exists() and any(path.iterdir()):
+            raise FileExistsError(
+                "The database already exists in current workspace (folder is not empty).")
+
+        vector_store = None
+        for chunks, vectors in batches:
+            text_embeddings = [(chunk.page_content, vector)
+                               for chunk, vector in zip(chunks, vectors)]
+            metadatas = [chunk.metadata for chunk in chunks]
+            ids = [chunk.id for chunk in chunks]
+            if vector_store is None:
+                vector_store = FAISS.from_embeddings(text_embeddings=text_embeddings,
+                                                     embedding=self.embedding_model,
+                                                     metadatas=metadatas,
+                                                     ids=ids)
+            else:
+                vector_store.add_embeddings(text_embeddings=text_embeddings, metadatas=metadatas,
+                                            ids=ids)
+
+        if vector_store is None:
+            raise ValueError(f"No documents to store in database {database_name}")
+        vector_store.save_local(database_path)
+
+
 
     def get_context(self, query_text: str, database_name: str, k: int = 10) -> list:
         """
@@ -87,25 +142,12 @@ class Faiss_database_manager(Database_manager):
         """
 
 
-        database_path = self.work_directory + database_name
-        path = Path(database_path)
-
-        if not path.exists() or not any(path.iterdir()):
-            raise FileExistsError("The database doesn't exist or the directory is empty in the current workspace.")
-
-        # Load FAISS vector store
-        vector_store = FAISS.load_local(
-            folder_path=database_path,
-            embeddings=self.embedding_model,
-            allow_dangerous_deserialization=True
-        )
+        vector_store, bm25_retriever = self._load_store(database_name)
 
         # FAISS retriever
         faiss_retriever = vector_store.as_retriever(search_kwargs={"k": k})
 
         # BM25 retriever from documents
-        documents = list(vector_store.docstore._dict.values())
-        bm25_retriever = BM25Retriever.from_documents(documents)
         bm25_retriever.k = k
 
         # Combine with EnsembleRetriever
@@ -124,6 +166,38 @@ class Faiss_database_manager(Database_manager):
         return results[:k]
 
 
+    def _load_store(self, database_name: str) -> tuple:
+        """
+        Returns the FAISS store and the BM25 retriever of a database, loading them from
+        disk only the first time or when the index file has been rewritten.
+
+        :raises FileExistsError: If the specified database does not exist.
+        """
+        database_path = self.work_directory + database_name
+        path = Path(database_path)
+
+        if not path.exists() or not any(path.iterdir()):
+            raise FileExistsError(
+                "The database doesn't exist or the directory is empty in the current workspace.")
+
+        mtime = max(file.stat().st_mtime for file in path.iterdir())
+        with self._stores_lock:
+            cached = self._stores.get(database_name)
+            if cached is None or cached[0] != mtime:
+                # Load FAISS vector store
+                vector_store = FAISS.load_local(
+                    folder_path=database_path,
+                    embeddings=self.embedding_model,
+                    allow_dangerous_deserialization=True
+                )
+                documents = list(vector_store.docstore._dict.values())
+                bm25_retriever = BM25Retriever.from_documents(documents)
+                cached = (mtime, vector_store, bm25_retriever)
+                self._stores[database_name] = cached
+
+        return cached[1], cached[2]
+
+
     def _rerank_documents(self, context:list, distance_threshold:float = 6.5) -> list:
 
         """
@@ -1,22 +1,77 @@
 from interfaces.databaseManager import Database_manager
 from langchain_core.documents import Document
 from services.update_services.utils_practise import UtilsPractise
+from infrastructure.databaseManagers.summary_cache import SummaryCache
+from infrastructure.databaseManagers.summary_index import SummaryIndex
+from langchain_core.embeddings import Embeddings
 from tools.LLM_tool import LLMTool
+from tools.rate_limiter import RateLimiter
+from tools.token_counter import TokenCounter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable
+import tempfile
+import random
+import os
+import time
 import json
+import logging
 
 class PractiseDatabaseManager(Database_manager):
+    """
+    Builds the practise "database": a JSON tree of the practise folder with an LLM
+    summary of every file.
 
-    def __init__(self, work_directory:str, LLM:LLMTool):
+    The summaries are requested concurrently (`concurrency` requests in flight) within
+    the requests/tokens per minute of the API (`RateLimiter`), and requests rejected by
+    rate limiting are retried with exponential backoff. The summaries are written into
+    the tree in document order once all of them are ready, so the output does not
+    depend on the order in which the requests finish.
+
+    With `cache_path`, summaries are cached by (content hash, summary model, prompt
+    version) and only new or modified files are sent to the LLM.
+
+    With `embeddings`, the summaries are also embedded into a `SummaryIndex` saved next to
+    the tree, used at question time to preselect the candidate files (`preselect`).
+
+    With `folder_summaries`, every folder of the tree also gets an LLM summary built from
+    the summaries of its files and subfolders (deepest folders first), saved next to the
+    tree for the folder-first routing of `practical_answer`.
+    """
+
+    INDEX_NAME = "summary_index.npz"
+    FOLDER_SUMMARIES_NAME = "folder_summaries.json"
+    # Tokens of each child summary given to the summary of its folder
+    FOLDER_CHILD_TOKENS = 300
+
+    def __init__(self, work_directory:str, LLM:LLMTool, concurrency:int = 1,
+                 requests_per_minute:int = None, tokens_per_minute:int = None,
+                 max_retries:int = 6, cache_path:str = None, embeddings:Embeddings = None,
+                 embedding_model_name:str = None, folder_summaries:bool = False):
         self.WORK_DIRECTOY = work_directory
         self.LLM = LLM
         self.utils = UtilsPractise()
+        self.concurrency = max(1, concurrency or 1)
+        self.rate_limiter = RateLimiter(requests_per_minute=requests_per_minute,
+                                        tokens_per_minute=tokens_per_minute)
+        self.max_retries = max_retries
+        self.cache = SummaryCache(cache_path) if cache_path else None
+        self.embeddings = embeddings
+        self.embedding_model_name = embedding_model_name
+        self.folder_summaries = folder_summaries
+        self._counter = None
+        self._indexes = {}
+        self.logger = logging.getLogger(__name__)
 
     def create (self, documents: list[list[Document]], database_name:str, tree ) -> None:
 
-        for doc in documents :
-            prompt = self.utils.get_summary_prompt_from_document(doc)
-            summary = self.LLM.query(prompt=prompt)
+        start_time = time.perf_counter()
+        summaries, requested = self._summarize_all(
+            contents=[doc.page_content for doc in documents],
+            get_prompt=lambda i: self.utils.get_summary_prompt_from_document(documents[i]),
+            prompt_version=self.utils.SUMMARY_PROMPT_VERSION)
+
+        for doc, summary in zip(documents, summaries):
             self.utils.write_response_tree(doc_path = doc.metadata["source"],
                                      tree = tree,
                                      message = summary)
@@ -27,6 +82,210 @@ class PractiseDatabaseManager(Database_manager):
             json.dumps(tree, indent=2, ensure_ascii=False),
             encoding="utf-8"
         )
+        if self.embeddings is not None:
+            self.create_index(tree=tree, tree_path=output_path)
+        elapsed = time.perf_counter() - start_time
+        self.logger.info(f"Resúmenes de práctica: {len(documents)} ficheros, "
+                         f"{requested} pedidos al LLM, "
+                         f"{len(documents) - requested} desde la caché, en {elapsed:.2f} s "
+                         f"({self.concurrency} peticiones simultáneas)")
+        if self.folder_summaries:
+            self.create_folder_summaries(tree=tree, tree_path=output_path)
+
+    def create_folder_summaries(self, tree: dict, tree_path: str) -> None:
+        """
+        Summarizes every folder of `tree` from the summaries of its children and saves them
+        next to the tree file as {"carpeta/subcarpeta": resumen}. The folders of one depth
+        are summarized concurrently, after all of their subfolders.
+        """
+        folders = self.utils.get_folders(tree)
+        folder_summaries = {}
+        for depth in sorted({path.count("/") for path in folders}, reverse=True):
+            children = {path: self._get_children_summaries(path, folders[path], folder_summaries)
+                        for path in folders if path.count("/") == depth}
+            # Folders without any summarized file are left out
+            level = [path for path in children if children[path]]
+            prompts = [self.utils.get_folder_summary_prompt(folder=path, children=children[path])
+                       for path in level]
+            # The prompt holds the child summaries, so it is the cached content
+            summaries, _ = self._summarize_all(
+                contents=prompts,
+                get_prompt=lambda i: prompts[i],
+                prompt_version=self.utils.FOLDER_SUMMARY_PROMPT_VERSION)
+            folder_summaries.update(zip(level, summaries))
+
+        output_path = self._get_folder_summaries_path(tree_path)
+        fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({path: folder_summaries[path]
+                       for path in folders if path in folder_summaries},
+                      f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, output_path)
+        self.logger.info(f"Resúmenes de carpetas de práctica: {len(folder_summaries)} carpetas")
+
+    def get_folder_summaries(self, tree_path: str) -> dict[str, str]:
+        """Folder summaries of the tree, or None if they have not been generated."""
+        path = self._get_folder_summaries_path(tree_path)
+        if not path.exists():
+            return None
+        return self.get_context(path)
+
+    def _get_folder_summaries_path(self, tree_path: str) -> Path:
+        return Path(tree_path).with_name(self.FOLDER_SUMMARIES_NAME)
+
+    def _get_children_summaries(self,
+                                folder: str,
+                                subtree: dict,
+                                folder_summaries: dict[str, str]) -> dict[str, str]:
+        """
+        Summaries of the files and subfolders of a folder, truncated to `FOLDER_CHILD_TOKENS` each.
+        """
+        children = {}
+        for name, value in subtree.items():
+            if isinstance(value, dict):
+                summary, name = folder_summaries.get(f"{folder}/{name}"), f"{name}/"
+            else:
+                summary = value
+            if isinstance(summary, str):
+                children[name] = self._truncate(summary, self.FOLDER_CHILD_TOKENS)
+        return children
+
+    def _summarize_all(self,
+                       contents: list[str],
+                       get_prompt: Callable[[int], str],
+                       prompt_version: int) -> tuple[list[str], int]:
+        """
+        Summaries of `contents` in order: cached ones are reused and the rest are requested
+        concurrently with the prompt `get_prompt(i)`.
+
+        :return: The summaries and the number of requests sent to the LLM.
+        """
+        summaries = [None] * len(contents)
+        keys = [None] * len(contents)
+        if self.cache is not None:
+            for i, content in enumerate(contents):
+                keys[i] = self.cache.get_key(content, self.LLM.model_name, prompt_version)
+                summaries[i] = self.cache.get(keys[i])
+        pending = [i for i, summary in enumerate(summaries) if summary is None]
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {i: executor.submit(self._summarize, get_prompt(i), keys[i]) for i in pending}
+            try:
+                for i, future in futures.items():
+                    summaries[i] = future.result()
+            except BaseException:
+                for future in futures.values():
+                    future.cancel()
+                raise
+        return summaries, len(pending)
+
+    def create_index(self, tree: dict, tree_path: str) -> None:
+        """Embeds the summaries of `tree` and saves the index next to the tree file."""
+        summaries = self.utils.flatten_tree(tree)
+        index = SummaryIndex.build(summaries, embeddings=self.embeddings,
+                                   model_name=self.embedding_model_name)
+        index.save(self._get_index_path(tree_path))
+        self.logger.info(f"Índice de resúmenes de práctica: {len(summaries)} ficheros")
+
+    def index_is_current(self, tree_path: str) -> bool:
+        """
+        True if the index of the tree exists and was built with the configured embedding model.
+        """
+        index_path = self._get_index_path(tree_path)
+        if not index_path.exists():
+            return False
+        try:
+            return SummaryIndex.load(str(index_path)).model_name == self.embedding_model_name
+        except Exception:
+            return False
+
+    def preselect(self, tree_path: str, query: str, k: int) -> list[tuple[str, float]]:
+        """
+        Returns the `k` files whose summaries are most similar to the query, as
+        (file, cosine similarity) best first, or an empty list if there is no usable index.
+        """
+        index = self._get_index(tree_path)
+        if index is None:
+            return []
+        return index.search(self.embeddings.embed_query(query), k=k)
+
+    def _get_index(self, tree_path: str) -> SummaryIndex:
+        """Loaded index of the tree, reloaded when the file changes (a new update)."""
+        index_path = self._get_index_path(tree_path)
+        try:
+            mtime = index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self.logger.warning(f"No existe el índice de resúmenes {index_path}, "
+                                "se usan todos los resúmenes")
+            return None
+
+        cached = self._indexes.get(index_path)
+        if cached is None or cached[0] != mtime:
+            index = SummaryIndex.load(str(index_path))
+            if index.model_name != self.embedding_model_name:
+                self.logger.warning(f"El índice de resúmenes se creó con {index.model_name}, "
+                                    "se usan todos los resúmenes")
+                index = None
+            cached = (mtime, index)
+            self._indexes[index_path] = cached
+        return cached[1]
+
+    def _get_index_path(self, tree_path: str) -> Path:
+        return Path(tree_path).with_name(self.INDEX_NAME)
+
+    def _summarize(self, prompt: str, cache_key: str = None) -> str:
+        """
+        Queries the LLM within the rate limits, retrying with backoff when the API rejects the
+        request for rate limiting. The summary is cached as soon as it arrives.
+        """
+        tokens = self._count_tokens(prompt) + (getattr(self.LLM, "max_tokens", 0) or 0)
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(tokens)
+            try:
+                summary = self.LLM.query(prompt=prompt)
+            except Exception as e:
+                if attempt == self.max_retries or not self._is_rate_limit_error(e):
+                    raise
+                delay = self._get_retry_delay(e, attempt)
+                self.logger.warning(f"Límite de peticiones del LLM alcanzado, "
+                                    f"reintento {attempt + 1} en {delay:.1f} s")
+                time.sleep(delay)
+                continue
+            if self.cache is not None and cache_key is not None:
+                self.cache.put(cache_key, summary)
+            return summary
+
+    def _count_tokens(self, prompt: str) -> int:
+        return self._get_counter().count(prompt)
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        return self._get_counter().truncate(text, max_tokens)
+
+    def _get_counter(self) -> TokenCounter:
+        if self._counter is None:
+            self._counter = TokenCounter(model_name=self.LLM.model_name,
+                                         model_type=self.LLM.model_type)
+        return self._counter
+
+    @staticmethod
+    def _is_rate_limit_error(error: Exception) -> bool:
+        response = getattr(error, "response", None)
+        status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+        return (status == 429
+                or "ratelimit" in type(error).__name__.lower()
+                or "rate limit" in str(error).lower())
+
+    @staticmethod
+    def _get_retry_delay(error: Exception, attempt: int) -> float:
+        """
+        Retry-After of the response if present, otherwise exponential backoff with jitter
+        (max. 60 s).
+        """
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return min(60.0, 2 ** attempt) * (0.5 + random.random())
 
     def get_context(self, path:str):
         """
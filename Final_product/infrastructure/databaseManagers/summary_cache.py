@@ -0,0 +1,49 @@
+from pathlib import Path
+import hashlib
+import sqlite3
+import threading
+
+
+class SummaryCache():
+    """
+    Persistent cache of the LLM summaries of the practise files.
+
+    A summary is keyed by the SHA-256 of the summarized content, the summary model and
+    the version of the summary prompt, so only new or modified files (or a change of
+    model or prompt) reach the LLM. The summaries are stored in a SQLite database, safe
+    to use from the summary threads at once.
+    """
+
+    def __init__(self, cache_path: str):
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.cache_path), timeout=30,
+                                           check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS summaries "
+                "(key TEXT PRIMARY KEY, summary TEXT NOT NULL)")
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(self, content: str, model_name: str, prompt_version: int) -> str:
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{digest}:{model_name}:{prompt_version}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str:
+        """Returns the cached summary, or None."""
+        with self._lock:
+            row = self._connection.execute("SELECT summary FROM summaries WHERE key = ?",
+                                           (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, summary: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary) VALUES (?, ?)", (key, summary))
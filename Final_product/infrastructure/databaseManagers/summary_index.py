@@ -0,0 +1,72 @@
+from langchain_core.embeddings import Embeddings
+from pathlib import Path
+import numpy as np
+import os
+import tempfile
+
+
+class SummaryIndex():
+    """
+    Small vector index of the practise summaries, one vector per file.
+
+    There are at most a few hundred practise files, so the index is a normalized
+    float32 matrix searched by brute force: the scores are exact cosine similarities,
+    which `practical_answer` uses to decide whether the file-selection prompt is needed.
+    The index is saved as `.npz` next to the summary tree, with the name of the
+    embedding model that built it.
+    """
+
+    def __init__(self, files: list[str], vectors: np.ndarray, model_name: str):
+        self.files = files
+        self.vectors = vectors
+        self.model_name = model_name
+
+    @classmethod
+    def build(cls,
+              summaries: dict[str, str],
+              embeddings: Embeddings,
+              model_name: str) -> "SummaryIndex":
+        """
+        :param summaries: Summary of every file, keyed by its path relative to the practise folder.
+        """
+        files = list(summaries)
+        # The path (folder and file names) is part of what describes an exercise
+        texts = [f"{file}\n{summaries[file]}" for file in files]
+        vectors = np.empty((0, 0), np.float32)
+        if texts:
+            vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+        return cls(files, cls._normalize(vectors), model_name)
+
+    @classmethod
+    def load(cls, path: str) -> "SummaryIndex":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["files"].tolist(), data["vectors"], str(data["model_name"]))
+
+    def save(self, path: str) -> None:
+        """Writes the index atomically, so a running answer service never reads half of it."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".npz")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, files=np.array(self.files, dtype=str), vectors=self.vectors,
+                     model_name=np.array(self.model_name))
+        os.replace(tmp_path, path)
+
+    def search(self, query_vector: list[float], k: int) -> list[tuple[str, float]]:
+        """
+        Returns the `k` files most similar to the query as (file, cosine similarity), best first.
+        """
+        if not self.files:
+            return []
+        query = self._normalize(np.asarray([query_vector], dtype=np.float32))[0]
+        scores = self.vectors @ query
+        best = np.argsort(-scores, kind="stable")[:k]
+        return [(self.files[i], float(scores[i])) for i in best]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        if vectors.size == 0:
+            return vectors
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
@@ -0,0 +1,59 @@
+from langchain_core.documents import Document
+from pathlib import Path
+import hashlib
+import json
+import os
+import tempfile
+
+
+class ExtractionCache():
+    """
+    Persistent cache of the text extracted from documents.
+
+    Entries are keyed by the SHA-256 of the file content plus the loader settings that
+    change the extraction (image OCR, backend...). Each entry stores the per-page
+    `Document` text and metadata as JSON, so an unchanged file is loaded in
+    milliseconds instead of re-running PyPDF or OCR.
+    """
+
+    # Bump when the extraction output changes for the same file and settings
+    VERSION = 1
+
+    def __init__(self, cache_directory: str):
+        self.cache_directory = Path(cache_directory)
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+
+    def get_key(self, file: Path, settings: dict) -> str:
+        """Returns the cache key of `file` extracted with `settings`."""
+        digest = hashlib.sha256()
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        options = json.dumps({"version": self.VERSION, **settings}, sort_keys=True)
+        return hashlib.sha256(f"{digest.hexdigest()}:{options}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> list[Document]:
+        """Returns the cached pages, or None if the key is not cached or the entry is unreadable."""
+        entry = self._get_entry_path(key)
+        if not entry.exists():
+            return None
+        try:
+            pages = json.loads(entry.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        return [Document(page_content=page["page_content"], metadata=page["metadata"])
+                for page in pages]
+
+    def put(self, key: str, docs: list[Document]) -> None:
+        """Stores the pages atomically (several loader processes may write at once)."""
+        entry = self._get_entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        pages = [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in docs]
+
+        fd, tmp_path = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(pages, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, entry)
+
+    def _get_entry_path(self, key: str) -> Path:
+        return self.cache_directory / key[:2] / f"{key}.json"
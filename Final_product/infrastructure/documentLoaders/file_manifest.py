@@ -0,0 +1,131 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+import hashlib
+import json
+import os
+import tempfile
+import logging
+
+
+@dataclass
+class ManifestScan:
+    """Result of scanning a content folder against its manifest."""
+    files: list[Path] = field(default_factory=list)
+    changed: list[Path] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    entries: dict = field(default_factory=dict)
+    settings: dict = field(default_factory=dict)
+
+    def has_changes(self) -> bool:
+        return bool(self.changed or self.removed)
+
+
+class FileManifest():
+    """
+    Manifest of the files of a content folder: relative path, size, mtime and SHA-256.
+
+    A scan lists the supported files and compares them with the manifest of the last
+    successful update:
+    - Files with the same size and mtime are unchanged without reading them.
+    - Otherwise the content hash decides (a file that was only touched is unchanged).
+    - Unsupported files are skipped, never deleted.
+    - The content of a `.url` file is a web page: with `remote_fingerprints`, the hash of
+      the downloaded page is also recorded and a different one marks the file as changed.
+      A page that cannot be downloaded keeps its previous hash.
+    If the `settings` of the update (embedding model, database type...) differ from
+    the ones recorded, every file is reported as changed.
+    """
+
+    VERSION = 1
+    REMOTE_FORMATS = [".url"]
+
+    def __init__(self, manifest_path: str):
+        self.manifest_path = Path(manifest_path)
+        self.logger = logging.getLogger(__name__)
+
+    def scan(self, root: Path, recursive: bool, allowed_formats: list[str], settings: dict = None,
+             remote_fingerprints: Callable[[list[Path]], dict[Path, str]] = None) -> ManifestScan:
+        """
+        :param remote_fingerprints: Returns the hash of the remote content of the given `.url`
+                                    files (None for a page that could not be downloaded).
+        """
+        root = Path(root)
+        previous = self._read()
+        settings = settings or {}
+        same_settings = (previous.get("settings") == settings
+                         and previous.get("version") == self.VERSION)
+        previous_entries = previous.get("files", {}) if same_settings else {}
+
+        scan = ManifestScan(settings=settings)
+        for path, stat in self._walk(root, recursive):
+            if path.suffix.lower() not in allowed_formats:
+                self.logger.debug(f"Formato no soportado, se omite: {path}")
+                continue
+
+            key = path.relative_to(root).as_posix()
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+            old = previous_entries.get(key)
+            if old is not None and old["size"] == entry["size"] and old["mtime"] == entry["mtime"]:
+                entry["sha256"] = old["sha256"]
+            else:
+                entry["sha256"] = self._hash(path)
+                if old is None or old["sha256"] != entry["sha256"]:
+                    scan.changed.append(path)
+
+            scan.files.append(path)
+            scan.entries[key] = entry
+
+        if remote_fingerprints is not None:
+            self._scan_remote(root, scan, previous_entries, remote_fingerprints)
+        scan.removed = sorted(set(previous.get("files", {})) - set(scan.entries))
+        return scan
+
+    def _scan_remote(self, root: Path, scan: ManifestScan, previous_entries: dict,
+                     remote_fingerprints: Callable[[list[Path]], dict[Path, str]]) -> None:
+        """Records the hash of the remote content of the `.url` files and marks the changed ones."""
+        remote_files = [path for path in scan.files if path.suffix.lower() in self.REMOTE_FORMATS]
+        if not remote_files:
+            return
+        changed = set(scan.changed)
+        fingerprints = remote_fingerprints(remote_files)
+        for path in remote_files:
+            key = path.relative_to(root).as_posix()
+            old = previous_entries.get(key) or {}
+            fingerprint = fingerprints.get(path) or old.get("remote_sha256")
+            scan.entries[key]["remote_sha256"] = fingerprint
+            if path not in changed and fingerprint != old.get("remote_sha256"):
+                self.logger.info(f"Página modificada: {path}")
+                scan.changed.append(path)
+
+    def save(self, scan: ManifestScan) -> None:
+        """Records the scanned files; call it once the update that used them has succeeded."""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.manifest_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "settings": scan.settings, "files": scan.entries},
+                      f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _walk(self, root: Path, recursive: bool):
+        """Yields (path, stat) of every file with os.scandir, sorted like the previous scans."""
+        with os.scandir(root) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+        for entry in entries:
+            if entry.is_file():
+                yield Path(entry.path), entry.stat()
+            elif recursive and entry.is_dir():
+                yield from self._walk(Path(entry.path), recursive)
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _hash(self, path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
@@ -0,0 +1,42 @@
+from pathlib import Path
+import sqlite3
+import threading
+
+
+class OcrCache():
+    """
+    Persistent cache of OCR results per image, shared across files and runs.
+
+    Course PDFs repeat the same logos, headers and diagrams on many pages, so every
+    image is looked up by the SHA-256 of its encoded bytes before running OCR. Only
+    exact copies are reused: two slides with the same layout but different text must
+    not share their OCR.
+
+    The results are stored in a SQLite database, safe to use from several threads and
+    loading processes at once.
+    """
+
+    def __init__(self, cache_path: str):
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.cache_path), timeout=30,
+                                           check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            # Previous schema, which also matched images by a perceptual hash
+            self._connection.execute("DROP TABLE IF EXISTS ocr")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_text (sha256 TEXT PRIMARY KEY, text TEXT NOT NULL)")
+
+    def get(self, sha256: str) -> str:
+        """Returns the cached OCR text of the image, or None."""
+        with self._lock:
+            row = self._connection.execute("SELECT text FROM ocr_text WHERE sha256 = ?",
+                                           (sha256,)).fetchone()
+        return None if row is None else row[0]
+
+    def put(self, sha256: str, text: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO ocr_text (sha256, text) VALUES (?, ?)", (sha256, text))
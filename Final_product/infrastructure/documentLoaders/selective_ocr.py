@@ -0,0 +1,154 @@
+from langchain_core.documents import Document
+from infrastructure.documentLoaders.ocr_cache import OcrCache
+from concurrent.futures import ThreadPoolExecutor
+from pypdf import PdfReader
+from pathlib import Path
+import threading
+import hashlib
+import logging
+import time
+
+_executors = {}
+_executor_lock = threading.Lock()
+_engines = threading.local()
+
+
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    """
+    OCR pool shared by every loader of the process, so the OCR models are loaded once per
+    thread.
+    """
+    with _executor_lock:
+        if workers not in _executors:
+            _executors[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr")
+        return _executors[workers]
+
+
+def _ocr_image(data: bytes) -> tuple[str, float]:
+    """
+    Runs RapidOCR on an encoded image with the engine of the current thread.
+
+    :return: The text and the seconds spent on the image.
+    """
+    start_time = time.perf_counter()
+    if not hasattr(_engines, "engine"):
+        from rapidocr_onnxruntime import RapidOCR
+        _engines.engine = RapidOCR()
+    result, _ = _engines.engine(data)
+    text = "\n".join(line[1] for line in result) if result else ""
+    return text, time.perf_counter() - start_time
+
+
+class SelectiveOcr():
+    """
+    Page-level OCR policy for PDF files.
+
+    Instead of running OCR on every embedded image, only these pages are processed:
+    - Pages with less than `min_chars` characters of extractable text (scanned pages):
+      all their images are OCR'd.
+    - Pages with images of at least `min_image_pixels` (width * height): only those images.
+    With `select_all` every image of every page is OCR'd instead.
+
+    The OCR runs in a dedicated pool of `workers` threads (onnxruntime releases the GIL,
+    and threads also work inside the loading processes). The OCR text is appended to the
+    page in the same markdown image format as PyPDFLoader, and every processed page
+    records `ocr_images` in its metadata, plus `ocr_seconds` (measured per image) when it
+    needed new OCR. Repeated images are OCR'd once per file and, with an `OcrCache`, once
+    across files and runs.
+    """
+
+    def __init__(self, min_chars: int = 100, min_image_pixels: int = 250000, workers: int = 2,
+                 select_all: bool = False, cache: OcrCache = None):
+        self.min_chars = min_chars
+        self.min_image_pixels = min_image_pixels
+        self.workers = workers or 1
+        self.select_all = select_all
+        self.cache = cache
+        self.logger = logging.getLogger(__name__)
+
+    def process(self, file: Path, pages: list[Document]) -> None:
+        """OCRs the images of the selected pages of `file` and appends the text to `pages`."""
+        reader = PdfReader(str(file))
+        tasks = []
+        for i, page in enumerate(pages):
+            pdf_page = reader.pages[int(page.metadata.get("page", i))]
+            low_text = self.select_all or len(page.page_content.strip()) < self.min_chars
+            if not low_text:
+                sizes = self._get_image_sizes(pdf_page)
+                if not sizes or max(sizes) < self.min_image_pixels:
+                    continue
+
+            for image in pdf_page.images:
+                if not low_text:
+                    width, height = image.image.size
+                    if width * height < self.min_image_pixels:
+                        continue
+                tasks.append((i, image.data))
+
+        if not tasks:
+            return
+
+        start_time = time.perf_counter()
+        executor = _get_executor(self.workers)
+        # One OCR per distinct image: cached results first, then a single future per new image
+        results = {}
+        keys = []
+        cached_images = 0
+        for i, data in tasks:
+            sha256 = hashlib.sha256(data).hexdigest()
+            keys.append((i, sha256))
+            if sha256 in results:
+                continue
+            cached = self.cache.get(sha256) if self.cache is not None else None
+            if cached is not None:
+                cached_images += 1
+            results[sha256] = cached if cached is not None else executor.submit(_ocr_image, data)
+
+        texts = {}
+        for i, sha256 in keys:
+            text = results[sha256]
+            if not isinstance(text, str):
+                text, seconds = text.result()
+                results[sha256] = text
+                # The OCR time of an image is charged to the first page that shows it
+                metadata = pages[i].metadata
+                metadata["ocr_seconds"] = metadata.get("ocr_seconds", 0.0) + seconds
+                if self.cache is not None:
+                    self.cache.put(sha256, text)
+            if text:
+                texts.setdefault(i, []).append(text)
+            pages[i].metadata["ocr_images"] = pages[i].metadata.get("ocr_images", 0) + 1
+        elapsed = time.perf_counter() - start_time
+
+        ocr_pages = {i for i, _ in tasks}
+        for i in ocr_pages:
+            for text in texts.get(i, []):
+                pages[i].page_content += f"\n\n![{text}](#)"
+
+        self.logger.info(f"OCR de {file}: {len(ocr_pages)} páginas, {len(tasks)} imágenes "
+                         f"({len(tasks) - len(results)} repetidas, "
+                         f"{cached_images} desde la caché), {elapsed:.2f} s")
+
+    def _get_image_sizes(self, pdf_object, visited: set = None) -> list[int]:
+        """
+        Pixels of every image XObject of a page, read from the PDF dictionaries without
+        decoding. Form XObjects are searched recursively, as `page.images` does.
+        """
+        visited = set() if visited is None else visited
+        resources = pdf_object.get("/Resources")
+        xobjects = resources.get_object().get("/XObject") if resources else None
+        if not xobjects:
+            return []
+        sizes = []
+        for reference in xobjects.get_object().values():
+            xobject = reference.get_object()
+            subtype = xobject.get("/Subtype")
+            if subtype == "/Image":
+                sizes.append(int(xobject.get("/Width", 0)) * int(xobject.get("/Height", 0)))
+            elif subtype == "/Form":
+                # Forms may be shared or nested in a cycle
+                key = getattr(reference, "idnum", None) or id(xobject)
+                if key not in visited:
+                    visited.add(key)
+                    sizes.extend(self._get_image_sizes(xobject, visited))
+        return sizes
@@ -1,12 +1,65 @@
 from langchain_community.document_loaders import PyPDFLoader
+from langchain_community.document_loaders import PyPDFium2Loader
+from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_community.document_loaders import TextLoader
 from langchain_core.documents import Document
 from interfaces.documentsLoader import DocumentsLoader
+from infrastructure.documentLoaders.extraction_cache import ExtractionCache
+from infrastructure.documentLoaders.selective_ocr import SelectiveOcr
+from infrastructure.documentLoaders.ocr_cache import OcrCache
+from infrastructure.documentLoaders.url_fetcher import UrlFetcher
+from infrastructure.documentLoaders.file_manifest import FileManifest, ManifestScan
+from concurrent.futures import ThreadPoolExecutor
+from pypdf import PdfReader
+from typing import Any, Callable, Iterator
+from collections import deque
+from dataclasses import dataclass
+import itertools
+import multiprocessing
+import queue
+import hashlib
 import re
 import time
 import pandas as pd
 from pathlib import Path
 
+
+_worker_loader = None
+_worker_started = None
+
+
+def _init_loader_worker(settings: dict, started: multiprocessing.Queue) -> None:
+    """
+    Initializer of the loading processes: builds the loader once per process, so its
+    caches, OCR engine and HTTP session are reused by every file of the worker.
+    `started` receives `(task_id, time.time())` when the worker starts a task.
+    """
+    global _worker_loader, _worker_started
+    _worker_loader = Universal_documents_loader(**settings)
+    _worker_started = started
+
+
+def _load_file_worker(task_id: int, file: Path) -> list[Document]:
+    """Entry point of the loading processes: extracts one file."""
+    _worker_started.put((task_id, time.time()))
+    return _worker_loader._extract_document_info(file)
+
+
+def _load_pages_worker(task_id: int, file: Path, start: int, end: int) -> list[Document]:
+    """Entry point of the loading processes for a page range [start, end) of a large PDF."""
+    _worker_started.put((task_id, time.time()))
+    return _worker_loader._extract_page_range(file, start, end)
+
+
+@dataclass
+class _LoadTask:
+    """A file or page range sent to the loading pool."""
+    worker: Callable
+    args: tuple
+    task_id: int = None
+    result: Any = None
+
+
 class Universal_documents_loader(DocumentsLoader):
 
     """
@@ -17,10 +70,36 @@ class Universal_documents_loader(DocumentsLoader):
     - Can process files recursively within the specified path or only in the given directory.
     - Allows extracting text from images if enabled.
     - Returns a list where each position contains a list of LangChain `Document` objects, organized by page.
+    - Can parse the files in a pool of processes, preserving the order of the results,
+      with a timeout per file counted from when a worker starts it. Files that fail or time
+      out are logged and skipped.
+    - Can keep a persistent cache of the extracted pages keyed by file content hash and
+      loader settings, so unchanged files are not parsed again.
+    - Supports several PDF extraction backends (pypdf, pypdfium2, pymupdf) with the same
+      page metadata.
+    - Can restrict the OCR of PDF images to the pages that need it (see SelectiveOcr)
+      and reuse the OCR of repeated images across files and runs (see OcrCache).
+    - Splits very large PDFs into page ranges that are parsed in parallel by the pool
+      and reassembled in page order.
+    - Fetches the web pages of `.url` files concurrently, in threads of the main process,
+      with a pooled HTTP client and conditional requests (see UrlFetcher).
+    - Skips unsupported files without deleting them and, with a manifest, reports which
+      files are new, changed or removed since the last update (see FileManifest).
     """
 
+    PDF_BACKENDS = ["pypdf", "pypdfium2", "pymupdf"]
+    OCR_POLICIES = ["all", "selective"]
+    # How often a parallel load checks whether a worker has started the task it waits for
+    START_POLL_SECONDS = 0.5
+
 
-    def __init__(self, path:str , process_images:bool, recursive_mode:bool):
+    def __init__(self, path:str , process_images:bool, recursive_mode:bool, workers:int = 1,
+                 file_timeout:float = None, cache_directory:str = None, pdf_backend:str = "pypdf",
+                 ocr_policy:str = "all", ocr_min_chars:int = 100,
+                 ocr_min_image_pixels:int = 250000, ocr_workers:int = 2,
+                 ocr_cache_path:str = None, url_workers:int = 4, url_timeout:float = 15,
+                 url_max_per_host:int = 4, url_cache_directory:str = None,
+                 pdf_shard_pages:int = None, manifest_path:str = None):
         """
         Path:
             The folder path where the document loader will search for files. It works recursively,
@@ -31,9 +110,83 @@ class Universal_documents_loader(DocumentsLoader):
             Currently, only the PDF loader is supported, but it's easy to implement support for
             additional formats. For more details on extending the loader, refer to:
             https://python.langchain.com/api_reference/community/document_loaders.html
+
+        Workers:
+            Number of processes used to parse files in parallel (1 = sequential).
+
+        File_timeout:
+            Maximum seconds to wait for the result of a file in parallel mode (None = no limit).
+
+        Cache_directory:
+            Folder of the extraction cache (None = no cache). Web pages (.url) are never cached.
+
+        Pdf_backend:
+            Library used to extract the text of PDF files: "pypdf" (default), "pypdfium2" or
+            "pymupdf". The native backends are several times faster on text PDFs.
+
+        Ocr_policy:
+            With `process_images`, "all" OCRs every image of every PDF page; "selective" only
+            OCRs pages with less than `ocr_min_chars` characters of text or images of at least
+            `ocr_min_image_pixels` pixels, in a pool of `ocr_workers` threads.
+
+        Ocr_cache_path:
+            SQLite file of the OCR cache per image (None = no cache). With a cache, the "all"
+            policy also OCRs through the worker pool so that every image is looked up first.
+
+        Url_workers / Url_timeout / Url_max_per_host:
+            Threads that download the `.url` pages, timeout in seconds of every request and
+            maximum concurrent requests to the same host.
+
+        Url_cache_directory:
+            Folder where the ETag / Last-Modified and content of every page are kept, so
+            unchanged pages (304) are not downloaded again (None = no cache).
+
+        Pdf_shard_pages:
+            With more than one worker, PDFs with more pages than this are split into ranges of
+            this many pages parsed in parallel (None = never split).
+
+        Manifest_path:
+            JSON file with the path, size, mtime and hash of the files of the last update,
+            used by `scan_changes` (None = no change detection).
         """
         super().__init__(path, process_images, recursive_mode)
+        if pdf_backend not in self.PDF_BACKENDS:
+            raise ValueError(f"PDF backend not supported: {pdf_backend}. "
+                             f"Options: {self.PDF_BACKENDS}")
+        if ocr_policy not in self.OCR_POLICIES:
+            raise ValueError(f"OCR policy not supported: {ocr_policy}. "
+                             f"Options: {self.OCR_POLICIES}")
         self.allowed_formats = [".pdf", ".txt", ".url", ".py"]
+        self.workers = workers or 1
+        self.file_timeout = file_timeout
+        self.cache_directory = cache_directory
+        self.cache = ExtractionCache(cache_directory) if cache_directory else None
+        self.pdf_backend = pdf_backend
+        self.ocr_policy = ocr_policy
+        self.ocr_min_chars = ocr_min_chars
+        self.ocr_min_image_pixels = ocr_min_image_pixels
+        self.ocr_workers = ocr_workers
+        self.ocr_cache_path = ocr_cache_path
+        self.ocr = None
+        if process_images and (ocr_policy == "selective" or ocr_cache_path):
+            self.ocr = SelectiveOcr(min_chars=ocr_min_chars,
+                                    min_image_pixels=ocr_min_image_pixels,
+                                    workers=ocr_workers,
+                                    select_all=(ocr_policy == "all"),
+                                    cache=OcrCache(ocr_cache_path) if ocr_cache_path else None)
+        self.url_workers = url_workers or 1
+        self.url_timeout = url_timeout
+        self.url_max_per_host = url_max_per_host
+        self.url_cache_directory = url_cache_directory
+        self.url_fetcher = UrlFetcher(cache_directory=url_cache_directory,
+                                      timeout=url_timeout,
+                                      max_per_host=url_max_per_host,
+                                      max_connections=max(self.url_workers, url_max_per_host))
+        self.pdf_shard_pages = pdf_shard_pages
+        self.manifest = FileManifest(manifest_path) if manifest_path else None
+        self._scan = None
+        # Pages downloaded by `scan_changes`, reused when the `.url` files are loaded
+        self._prefetched = {}
 
 
 
@@ -48,18 +201,267 @@ class Universal_documents_loader(DocumentsLoader):
             list[list[Document]]: A nested list where each sublist represents a document
             containing its extracted pages.
         """
-        docs = []
-        files = self._get_all_files()
-        self._clean_files(files)
+        return list(self.iter_documents())
+
+    def scan_changes(self, settings: dict = None) -> ManifestScan:
+        """
+        Compares the content folder with the manifest of the last update. The files of the
+        scan are the ones later loaded by `iter_documents`, so the folder is walked once.
+
+        The pages of the `.url` files are downloaded (revalidating the cached copies) so that
+        a changed page is detected too; they are kept for the load that follows.
 
+        :param settings: Update settings recorded in the manifest; if they change, every file is
+                         reported as changed.
+        :return: ManifestScan with all the supported files and the new/changed/removed ones.
+        """
+        if self.manifest is None:
+            raise ValueError("No manifest configured for this loader")
+        self._scan = self.manifest.scan(self.path, self.recursive_mode, self.allowed_formats,
+                                        settings,
+                                        remote_fingerprints=self._fetch_remote_fingerprints)
+        self.logger.info(f"{self.path}: {len(self._scan.files)} ficheros, "
+                         f"{len(self._scan.changed)} nuevos o modificados, "
+                         f"{len(self._scan.removed)} eliminados")
+        return self._scan
+
+    def _fetch_remote_fingerprints(self, files: list[Path]) -> dict[Path, str]:
+        """SHA-256 of the page of every `.url` file, downloaded in `url_workers` threads."""
+        def fetch(file: Path) -> str:
+            url = self._read_url(file)
+            html, _ = self.url_fetcher.fetch(url)
+            self._prefetched[url] = html
+            return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+        fingerprints = {}
+        with ThreadPoolExecutor(max_workers=self.url_workers, thread_name_prefix="url") as executor:
+            futures = {file: executor.submit(fetch, file) for file in files}
+            for file, future in futures.items():
+                try:
+                    fingerprints[file] = future.result()
+                except Exception as e:
+                    self.logger.warning(f"No se pudo descargar la página de {file}: {e}")
+        return fingerprints
+
+    def save_manifest(self) -> None:
+        """
+        Records the last scan as the state of the content folder; call it after a successful
+        update.
+        """
+        if self.manifest is not None and self._scan is not None:
+            self.manifest.save(self._scan)
+
+    def iter_documents(self, files: list[Path] = None) -> Iterator[list[Document]]:
+        """
+        Yields the pages of every file, in the order of `_get_all_files`, and then the
+        web pages of the `.url` files, which are downloaded in the background meanwhile.
+
+        With more than one worker the files are parsed in a pool of processes; at most
+        `2 * workers` files are in flight, so results do not pile up in memory.
+        With selective OCR the OCR'd pages, images and seconds are logged at the end.
+
+        :param files: Files to load (e.g. only the changed ones of `scan_changes`). By default,
+                      the files of the last scan or every supported file of the folder.
+        """
+        if files is None:
+            if self._scan is not None:
+                files = self._scan.files
+            else:
+                files = self._clean_files(self._get_all_files())
+        files = [Path(file) for file in files if Path(file).suffix.lower() in self.allowed_formats]
+        url_files = [file for file in files if file.suffix.lower() == ".url"]
+        files = [file for file in files if file.suffix.lower() != ".url"]
+
+        ocr_stats = {"pages": 0, "images": 0, "seconds": 0.0}
+        for doc in self._iter_all(files, url_files):
+            for page in doc:
+                if "ocr_images" in page.metadata:
+                    ocr_stats["pages"] += 1
+                    ocr_stats["images"] += page.metadata["ocr_images"]
+                    ocr_stats["seconds"] += page.metadata.get("ocr_seconds", 0.0)
+            yield doc
+
+        if self.ocr is not None:
+            self.logger.info(f"OCR selectivo: {ocr_stats['pages']} páginas, "
+                             f"{ocr_stats['images']} imágenes, {ocr_stats['seconds']:.2f} s")
+
+    def _iter_all(self, files: list[Path], url_files: list[Path]) -> Iterator[list[Document]]:
+        with ThreadPoolExecutor(max_workers=self.url_workers, thread_name_prefix="url") as executor:
+            pending = [(file, executor.submit(self._extract_document_info, file))
+                       for file in url_files]
+            if self.workers <= 1:
+                yield from self._iter_sequential(files)
+            else:
+                yield from self._iter_parallel(files)
+            for file, future in pending:
+                try:
+                    yield future.result()
+                except Exception as e:
+                    self.logger.warning(f"Error procesando {file}: {e}", exc_info=True)
+
+    def _iter_sequential(self, files: list[Path]) -> Iterator[list[Document]]:
         for file in files:
             try:
-                doc = self._extract_document_info(file)
+                yield self._extract_document_info(file)
             except Exception as e:
                 self.logger.warning(f"Error procesando {file}: {e}", exc_info=True)
 
-            docs.append (doc)
-        return docs
+    def _iter_parallel(self, files: list[Path]) -> Iterator[list[Document]]:
+        """
+        Parses the files in a process pool and yields the results in order.
+
+        Every worker builds its loader once (`_init_loader_worker`). The timeout applies to
+        each task (a file or a page range of a split PDF) and is counted from the moment a
+        worker starts it, so files queued behind a slow one keep their whole time. After a
+        timeout the pool is replaced, since its worker is still stuck on the file, and the
+        unfinished tasks of the next files are sent to the new pool. Files that fail or time
+        out are skipped.
+        """
+        pending = deque()
+        remaining = iter(files)
+        task_ids = itertools.count()
+        starts = {}
+        pool, started = self._start_pool()
+        try:
+            for file in remaining:
+                pending.append(self._submit(pool, file, task_ids))
+                if len(pending) >= 2 * self.workers:
+                    break
+
+            while pending:
+                file, tasks, cache_key = pending.popleft()
+                next_file = next(remaining, None)
+                if next_file is not None:
+                    pending.append(self._submit(pool, next_file, task_ids))
+                try:
+                    doc = []
+                    for task in tasks:
+                        doc.extend(self._wait(task, started, starts))
+                    if cache_key is not None:
+                        self.cache.put(cache_key, doc)
+                    yield doc
+                except multiprocessing.TimeoutError:
+                    self.logger.warning(f"Tiempo agotado ({self.file_timeout} s) procesando {file}")
+                    pool.terminate()
+                    pool, started = self._start_pool()
+                    starts.clear()
+                    for _, next_tasks, _ in pending:
+                        for next_task in next_tasks:
+                            if not next_task.result.ready():
+                                self._apply(pool, next_task, task_ids)
+                except Exception as e:
+                    self.logger.warning(f"Error procesando {file}: {e}", exc_info=True)
+        finally:
+            # Also terminates the workers stuck on a file
+            pool.terminate()
+
+    def _start_pool(self) -> tuple:
+        """New loading pool and the queue where its workers report the tasks they start."""
+        context = multiprocessing.get_context("spawn")
+        started = context.Queue()
+        pool = context.Pool(processes=self.workers,
+                            initializer=_init_loader_worker,
+                            initargs=(self._get_settings(), started))
+        return pool, started
+
+    def _wait(self, task: _LoadTask, started: multiprocessing.Queue, starts: dict) -> list:
+        """
+        Result of a task. Raises `multiprocessing.TimeoutError` once it has been running for
+        more than `file_timeout` seconds; the time it waits in the queue does not count.
+        """
+        if self.file_timeout is None:
+            return task.result.get()
+        while not task.result.ready():
+            while True:
+                try:
+                    task_id, start_time = started.get_nowait()
+                except queue.Empty:
+                    break
+                starts[task_id] = start_time
+
+            wait = self.START_POLL_SECONDS
+            if task.task_id in starts:
+                wait = starts[task.task_id] + self.file_timeout - time.time()
+                if wait <= 0:
+                    raise multiprocessing.TimeoutError()
+            task.result.wait(timeout=min(wait, self.START_POLL_SECONDS))
+        starts.pop(task.task_id, None)
+        return task.result.get()
+
+    def _submit(self, pool, file: Path, task_ids: Iterator[int]) -> tuple:
+        """
+        Sends a file to the pool, as a whole or split in page ranges.
+
+        :return: (file, tasks in page order, cache key to store the reassembled pages or None).
+        """
+        ranges = self._get_page_ranges(file)
+        cache_key = None
+        if ranges and self.cache is not None:
+            cache_key = self.cache.get_key(file, self._get_cache_settings())
+            if self.cache.get(cache_key) is not None:
+                # Cached: the worker reads it as a whole
+                ranges, cache_key = [], None
+
+        if ranges:
+            self.logger.info(f"Dividiendo {file} en {len(ranges)} rangos de páginas")
+            tasks = [_LoadTask(_load_pages_worker, (file, start, end)) for start, end in ranges]
+        else:
+            tasks = [_LoadTask(_load_file_worker, (file,))]
+        for task in tasks:
+            self._apply(pool, task, task_ids)
+        return file, tasks, cache_key
+
+    def _apply(self, pool, task: _LoadTask, task_ids: Iterator[int]) -> None:
+        """Sends a task to the pool under a new id."""
+        task.task_id = next(task_ids)
+        task.result = pool.apply_async(task.worker, (task.task_id,) + task.args)
+
+    def _get_page_ranges(self, file: Path) -> list[tuple[int, int]]:
+        """Page ranges [start, end) of a PDF above the shard threshold, or an empty list."""
+        if (not self.pdf_shard_pages or Path(file).suffix.lower() != ".pdf"
+                or self._extract_all_images()):
+            # PyPDFLoader's inline OCR only works on whole files
+            return []
+        try:
+            num_pages = len(PdfReader(str(file)).pages)
+        except Exception:
+            return []
+        if num_pages <= self.pdf_shard_pages:
+            return []
+        return [(start, min(start + self.pdf_shard_pages, num_pages))
+                for start in range(0, num_pages, self.pdf_shard_pages)]
+
+    def _get_settings(self) -> dict:
+        """Arguments to rebuild an equivalent loader in a worker process (sequential mode)."""
+        return {
+            "path": str(self.path),
+            "process_images": self.process_images,
+            "recursive_mode": self.recursive_mode,
+            "cache_directory": self.cache_directory,
+            "pdf_backend": self.pdf_backend,
+            "ocr_policy": self.ocr_policy,
+            "ocr_min_chars": self.ocr_min_chars,
+            "ocr_min_image_pixels": self.ocr_min_image_pixels,
+            "ocr_workers": self.ocr_workers,
+            "ocr_cache_path": self.ocr_cache_path,
+            "url_workers": self.url_workers,
+            "url_timeout": self.url_timeout,
+            "url_max_per_host": self.url_max_per_host,
+            "url_cache_directory": self.url_cache_directory,
+            "pdf_shard_pages": self.pdf_shard_pages,
+        }
+
+    def _get_cache_settings(self) -> dict:
+        """Loader settings that change the extracted text, part of the cache key."""
+        settings = {
+            "process_images": self.process_images,
+            "pdf_backend": self.pdf_backend,
+        }
+        if self.ocr is not None and not self.ocr.select_all:
+            settings.update(ocr_policy=self.ocr_policy,
+                            ocr_min_chars=self.ocr_min_chars,
+                            ocr_min_image_pixels=self.ocr_min_image_pixels)
+        return settings
 
     def load_document(self, file_name:str) -> list[Document]:
         path = self.path / Path(file_name)
@@ -77,8 +479,7 @@ class Universal_documents_loader(DocumentsLoader):
         docs = []
         times = []
         i = -1
-        files = self._get_all_files()
-        self._clean_files(files)
+        files = self._clean_files(self._get_all_files())
 
         for _ in range(50):
             i += 1
@@ -122,17 +523,22 @@ class Universal_documents_loader(DocumentsLoader):
 
     def _clean_files(self, files:list[str]) -> list[str]:
         """
-        Removes files from the provided list that do not match the allowed formats.
+        Filters out the files that do not match the allowed formats. The skipped files
+        are logged and left untouched in the content folder.
 
         Args:
             files (list[str]): A list of file paths as strings.
 
         Returns:
-            None: The function modifies the files in place by deleting non-matching ones.
+            list[str]: The files with an allowed format.
         """
-        non_allowed_files = filter(lambda file: file.suffix.lower() not in self.allowed_formats, files)
-        for file in non_allowed_files:
-            file.unlink()
+        allowed_files = []
+        for file in files:
+            if file.suffix.lower() in self.allowed_formats:
+                allowed_files.append(file)
+            else:
+                self.logger.debug(f"Formato no soportado, se omite: {file}")
+        return allowed_files
 
 
 
@@ -142,7 +548,8 @@ class Universal_documents_loader(DocumentsLoader):
 
         This method uses a loader to retrieve the document content, then applies
         necessary formatting changes (e.g., replacing OCR-related formatting)
-        for each page in the document.
+        for each page in the document. When the extraction cache is enabled, files whose
+        content and settings did not change are served from it.
 
         Args:
             file (str): The path to the document file to be processed.
@@ -151,6 +558,17 @@ class Universal_documents_loader(DocumentsLoader):
             list[Document]: A list of Document objects containing the processed content
             of each page in the input file.
         """
+        file = Path(file)
+        cache_key = None
+        if self.cache is not None and file.suffix.lower() != ".url":
+            cache_key = self.cache.get_key(file, self._get_cache_settings())
+            doc = self.cache.get(cache_key)
+            if doc is not None:
+                for page in doc:
+                    # The same content may have been cached from another path
+                    page.metadata["source"] = str(file)
+                return doc
+
         doc = []
         loader  = self._get_loader(file)
         # Get document
@@ -171,9 +589,55 @@ class Universal_documents_loader(DocumentsLoader):
             else:
                 raise RuntimeError(f"Loader failed: {file}")
 
+        self._postprocess_pages(file, doc)
+
+        if cache_key is not None:
+            self.cache.put(cache_key, doc)
+        return  doc
+
+
+    def _extract_page_range(self, file: Path, start: int, end: int) -> list[Document]:
+        """
+        Extracts the pages [start, end) of a PDF with the configured backend, with the same
+        metadata and post-processing as a whole file. Used to parse large PDFs in parallel.
+        """
+        file = Path(file)
+        match self.pdf_backend:
+            case "pypdfium2":
+                import pypdfium2
+                pdf = pypdfium2.PdfDocument(str(file))
+                try:
+                    texts = [pdf[i].get_textpage().get_text_range() for i in range(start, end)]
+                finally:
+                    pdf.close()
+                labels = [str(i + 1) for i in range(start, end)]
+            case "pymupdf":
+                import pymupdf
+                with pymupdf.open(str(file)) as pdf:
+                    texts = [pdf[i].get_text() for i in range(start, end)]
+                labels = [str(i + 1) for i in range(start, end)]
+            case _:
+                reader = PdfReader(str(file))
+                texts = [reader.pages[i].extract_text() for i in range(start, end)]
+                labels = [reader.page_labels[i] for i in range(start, end)]
+
+        doc = [Document(page_content=text,
+                        metadata={"source": str(file), "page": i, "page_label": label})
+               for i, text, label in zip(range(start, end), texts, labels)]
+        self._postprocess_pages(file, doc)
+        return doc
+
+
+    def _postprocess_pages(self, file: Path, doc: list[Document]) -> None:
+        """Normalizes the PDF metadata, runs the selective OCR and formats the OCR text."""
+        if file.suffix.lower() == ".pdf":
+            for i in range(len(doc)):
+                self._normalize_pdf_metadata(doc[i], file=file, num_page=i)
+            if self.ocr is not None:
+                self.ocr.process(file, doc)
+
         for i in range(len(doc)):
             doc[i].page_content = self._replace_ocr_format(doc[i].page_content)
-        return  doc
 
 
 
@@ -192,6 +656,58 @@ class Universal_documents_loader(DocumentsLoader):
         return re.sub(r'(!\[[^\]]*\])', r'texto Figure = \1', text)
 
 
+    def _normalize_pdf_metadata(self, page: Document, file: Path, num_page: int) -> None:
+        """
+        Gives every PDF backend the metadata of PyPDFLoader that the rest of the code uses:
+        `source`, 0-based `page` and `page_label` (1-based when the PDF has no labels).
+        """
+        page.metadata["source"] = str(file)
+        page.metadata["page"] = int(page.metadata.get("page", num_page))
+        page.metadata.setdefault("page_label", str(page.metadata["page"] + 1))
+
+
+    def _extract_all_images(self) -> bool:
+        """
+        PDF loaders OCR every image only without SelectiveOcr, which otherwise OCRs after
+        loading.
+        """
+        return self.process_images and self.ocr is None
+
+
+    def _get_pdf_loader(self, file: Path):
+        """Returns the loader of the configured PDF backend."""
+        match self.pdf_backend:
+            case "pypdfium2":
+                return PyPDFium2Loader(file_path=str(file),
+                                       extract_images=self._extract_all_images())
+            case "pymupdf":
+                return PyMuPDFLoader(file_path=str(file), extract_images=self._extract_all_images())
+            case _:
+                return PyPDFLoader(
+                    file_path = file,
+                    extract_images= self._extract_all_images(),
+                    images_inner_format="markdown-img"
+                    )
+
+
+    def _read_url(self, file_path: Path) -> str:
+        """Returns the URL stored in a `.url` file."""
+        try:
+
+            with open(file_path, "r", encoding="utf-8") as f:
+                return f.read().strip()
+
+
+        except FileNotFoundError:
+            raise FileNotFoundError(f"El archivo '{file_path}' no fue encontrado.")
+        except PermissionError:
+            raise PermissionError(f"No tienes permiso para leer el archivo '{file_path}'.")
+        except UnicodeDecodeError:
+            raise UnicodeDecodeError("utf-8", b"", 0, 1,
+                                     f"No se pudo decodificar el archivo '{file_path}'.")
+        except Exception as e:
+            raise Exception(f"Error inesperado al leer el archivo '{file_path}': {e}")
+
     def _get_loader(self, file:str) :
         """
         Determines and returns the appropriate document loader based on file type.
@@ -212,12 +728,7 @@ class Universal_documents_loader(DocumentsLoader):
 
         match (file.suffix.lower()):
             case ".pdf":
-                loader = PyPDFLoader(
-                    file_path = file,
-                    extract_images= self.process_images,
-                    images_inner_format="markdown-img"
-                    )
-                return loader
+                return self._get_pdf_loader(file)
 
             case ".txt":
                 loader = TextLoader(
@@ -227,24 +738,9 @@ class Universal_documents_loader(DocumentsLoader):
                 return loader
 
             case ".url":
-
-                file_path = file
-                try:
-
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        url = f.read().strip()
-
-
-                except FileNotFoundError:
-                    raise FileNotFoundError(f"El archivo '{file_path}' no fue encontrado.")
-                except PermissionError:
-                    raise PermissionError(f"No tienes permiso para leer el archivo '{file_path}'.")
-                except UnicodeDecodeError:
-                    raise UnicodeDecodeError("utf-8", b"", 0, 1, f"No se pudo decodificar el archivo '{file_path}'.")
-                except Exception as e:
-                    raise Exception(f"Error inesperado al leer el archivo '{file_path}': {e}")
-
-                loader = WebPageLoader(url)
+                url = self._read_url(file)
+                loader = WebPageLoader(url, fetcher=self.url_fetcher,
+                                       html=self._prefetched.pop(url, None))
                 return loader
 
             case ".py":
@@ -265,20 +761,33 @@ from typing import List
 from langchain.document_loaders.base import BaseLoader
 from langchain.schema import Document
 import requests
-from bs4 import BeautifulSoup
+from infrastructure.Splitters.html_splitter import HtmlSplitter
 class WebPageLoader(BaseLoader):
-    def __init__(self, url: str):
+    """
+    Downloads a web page and returns one Document per h1-h3 section, split with
+    `HtmlSplitter` on the HTML itself so every chunk keeps its headers and a bounded size.
+    `html` is the page when it has already been downloaded (e.g. by the change scan).
+    """
+    def __init__(self, url: str, fetcher: UrlFetcher = None, timeout: float = 15,
+                 splitter: HtmlSplitter = None, html: str = None):
         self.url = url
+        self.fetcher = fetcher
+        self.timeout = timeout
+        self.splitter = splitter or HtmlSplitter()
+        self.html = html
 
     def load(self) -> List[Document]:
         # Descargar el contenido de la web
-        response = requests.get(self.url)
-        response.raise_for_status()
-        html = response.text
-
-        # Extraer texto visible usando BeautifulSoup
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text(separator=' ', strip=True)
-        # Crear un Document con metadata
-        docs = [Document(page_content=text, metadata={"source": self.url})]
+        if self.html is not None:
+            html = self.html
+        elif self.fetcher is not None:
+            html, _ = self.fetcher.fetch(self.url)
+        else:
+            response = requests.get(self.url, timeout=self.timeout)
+            response.raise_for_status()
+            html = response.text
+
+        # Dividir el HTML por secciones, con metadata de la página
+        page = Document(page_content=html, metadata={"source": self.url})
+        docs = self.splitter.split([page])
         return docs
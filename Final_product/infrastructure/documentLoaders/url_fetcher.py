@@ -0,0 +1,105 @@
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse
+from pathlib import Path
+import requests
+import threading
+import hashlib
+import logging
+import json
+import os
+import tempfile
+
+
+class UrlFetcher():
+    """
+    HTTP client of the web pages referenced by `.url` files.
+
+    - Keeps a pooled session (keep-alive connections, retries on 5xx) shared by every thread.
+    - Limits the concurrent requests to the same host with a semaphore per host.
+    - Applies a timeout to every request.
+    - With `cache_directory`, stores the ETag / Last-Modified and the content of every page
+      and sends conditional requests, so an unchanged page (304) is served from the cache.
+    """
+
+    def __init__(self,
+                 cache_directory: str = None,
+                 timeout: float = 15,
+                 max_per_host: int = 4,
+                 max_connections: int = 16):
+        self.cache_directory = Path(cache_directory) if cache_directory else None
+        if self.cache_directory is not None:
+            self.cache_directory.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self.max_per_host = max_per_host
+        self.logger = logging.getLogger(__name__)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections,
+                              pool_maxsize=max_connections,
+                              max_retries=Retry(total=2, backoff_factor=0.5,
+                                                status_forcelist=[502, 503, 504]))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    def fetch(self, url: str) -> tuple[str, bool]:
+        """
+        Downloads a page, revalidating the cached copy when there is one.
+
+        :return: (html, not_modified) where `not_modified` is True if the server answered 304.
+        :raises requests.HTTPError: If the server answers with an error status.
+        """
+        entry = self._read_entry(url)
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with self._get_host_semaphore(url):
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+
+        if response.status_code == 304 and entry is not None:
+            self.logger.debug(f"Página sin cambios (304): {url}")
+            return entry["html"], True
+
+        response.raise_for_status()
+        html = response.text
+        validators = response.headers.get("ETag") or response.headers.get("Last-Modified")
+        if self.cache_directory is not None and validators:
+            self._write_entry(url, {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "html": html,
+            })
+        return html, False
+
+    def _get_host_semaphore(self, url: str) -> threading.Semaphore:
+        host = urlparse(url).netloc
+        with self._hosts_lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.Semaphore(self.max_per_host)
+            return self._hosts[host]
+
+    def _get_entry_path(self, url: str) -> Path:
+        return self.cache_directory / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def _read_entry(self, url: str) -> dict:
+        if self.cache_directory is None:
+            return None
+        try:
+            return json.loads(self._get_entry_path(url).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _write_entry(self, url: str, entry: dict) -> None:
+        path = self._get_entry_path(url)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
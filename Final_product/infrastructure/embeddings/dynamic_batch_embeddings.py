@@ -0,0 +1,101 @@
+from langchain_core.embeddings import Embeddings
+import logging
+import time
+
+
+class DynamicBatchEmbeddings(Embeddings):
+    """
+    Embeds documents in length-bucketed batches bounded by a token budget.
+
+    A transformer batch is padded to its longest member, so mixing 10-token and
+    512-token chunks wastes most of the compute on padding. This wrapper:
+    - Measures every text in tokens with the model's tokenizer.
+    - Sorts the texts by length and groups them so that
+      `batch size * longest length <= max_batch_tokens`.
+    - Encodes every batch and restores the original order of the vectors.
+
+    Works on top of `HuggingFaceEmbeddings` (sentence-transformers client) and
+    `OnnxEmbeddings`; any other model falls back to its own `embed_documents`.
+    """
+
+    def __init__(self, model: Embeddings, max_batch_tokens: int = 8192, max_batch_size: int = 256):
+        self.model = model
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.logger = logging.getLogger(__name__)
+
+        # langchain-huggingface keeps the SentenceTransformer in `_client` (`client` before 0.3)
+        client = getattr(model, "_client", None)
+        if client is None:
+            client = getattr(model, "client", None)
+        self._st_client = client if client is not None and hasattr(client, "encode") else None
+        self.tokenizer = (self._st_client.tokenizer if self._st_client is not None
+                          else getattr(model, "tokenizer", None))
+        self.max_seq_length = (self._st_client.max_seq_length if self._st_client is not None
+                               else getattr(model, "max_seq_length", None))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        if self.tokenizer is None:
+            return self.model.embed_documents(texts)
+
+        if self._st_client is not None:
+            # Same preprocessing as HuggingFaceEmbeddings.embed_documents
+            texts = [text.replace("\n", " ") for text in texts]
+
+        start_time = time.perf_counter()
+        lengths = self._token_lengths(texts)
+        batches = self._build_batches(lengths)
+
+        vectors = [None] * len(texts)
+        padded_tokens = 0
+        for batch in batches:
+            batch_vectors = self._encode([texts[i] for i in batch])
+            padded_tokens += len(batch) * max(lengths[i] for i in batch)
+            for i, vector in zip(batch, batch_vectors):
+                vectors[i] = vector.tolist() if hasattr(vector, "tolist") else list(vector)
+
+        elapsed = time.perf_counter() - start_time
+        real_tokens = sum(lengths)
+        self.logger.info(
+            f"Embeddings: {len(texts)} textos en {len(batches)} lotes, {elapsed:.2f} s "
+            f"({len(texts) / elapsed if elapsed else 0:.1f} textos/s), "
+            f"relleno {100 * (1 - real_tokens / padded_tokens) if padded_tokens else 0:.1f}%")
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.model.embed_query(text)
+
+    def _token_lengths(self, texts: list[str]) -> list[int]:
+        encoded = self.tokenizer(texts,
+                                 add_special_tokens=True,
+                                 truncation=self.max_seq_length is not None,
+                                 max_length=self.max_seq_length)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def _build_batches(self, lengths: list[int]) -> list[list[int]]:
+        """Groups the indexes sorted by length so that every padded batch fits the token budget."""
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        batches = []
+        current = []
+        for i in order:
+            # Sorted ascending: the current text is the longest of the batch
+            if current and ((len(current) + 1) * lengths[i] > self.max_batch_tokens
+                            or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current = []
+            current.append(i)
+        if current:
+            batches.append(current)
+        return batches
+
+    def _encode(self, texts: list[str]):
+        if self._st_client is not None:
+            encode_kwargs = {k: v for k, v in getattr(self.model, "encode_kwargs", {}).items()
+                             if k != "batch_size"}
+            return self._st_client.encode(texts, batch_size=len(texts), show_progress_bar=False,
+                                          **encode_kwargs)
+        if hasattr(self.model, "encode_batch"):
+            return self.model.encode_batch(texts)
+        return self.model.embed_documents(texts)
@@ -0,0 +1,191 @@
+from langchain_core.embeddings import Embeddings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import threading
+import queue
+import time
+import json
+import logging
+import requests
+
+
+class _PendingRequest():
+    """Texts of one HTTP request waiting to be embedded in a micro-batch."""
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.vectors = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class EmbeddingServer():
+    """
+    Local embedding service that holds a single model for several processes.
+
+    Concurrent `embed_query` / `embed_documents` requests are queued and coalesced
+    into micro-batches: the batcher thread waits at most `batch_window_ms` after the
+    first pending request (or until `max_batch_size` texts are gathered), embeds all
+    the texts in one call and returns to every caller its own vectors.
+
+    Endpoints (JSON over HTTP on localhost):
+    - POST /embed_documents  {"texts": [...]}  ->  {"vectors": [[...], ...]}
+    - POST /embed_query      {"text": "..."}   ->  {"vector": [...]}
+    - GET  /health                              ->  {"status": "ok"}
+    """
+
+    def __init__(self,
+                 model: Embeddings,
+                 host: str = "127.0.0.1",
+                 port: int = 8001,
+                 max_batch_size: int = 64,
+                 batch_window_ms: float = 5):
+        self.model = model
+        self.host = host
+        self.port = port
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window_ms / 1000
+        self.logger = logging.getLogger(__name__)
+
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._batcher = threading.Thread(target=self._batch_loop, daemon=True)
+        self._httpd = ThreadingHTTPServer((host, port), self._get_handler())
+
+    def serve_forever(self) -> None:
+        self._batcher.start()
+        self.logger.info(f"Servidor de embeddings escuchando en http://{self.host}:{self.port}")
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._stop.set()
+
+    def start(self) -> None:
+        """Starts the server in a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def shutdown(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._stop.set()
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Queues `texts` and waits until its micro-batch has been embedded."""
+        pending = _PendingRequest(texts)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.vectors
+
+    def _batch_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            size = len(first.texts)
+            deadline = time.monotonic() + self.batch_window
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(pending)
+                size += len(pending.texts)
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: list[_PendingRequest]) -> None:
+        texts = [text for pending in batch for text in pending.texts]
+        try:
+            vectors = self.model.embed_documents(texts)
+            position = 0
+            for pending in batch:
+                pending.vectors = vectors[position:position + len(pending.texts)]
+                position += len(pending.texts)
+        except Exception as e:
+            self.logger.error(f"Error calculando embeddings de un micro-lote: {e}", exc_info=True)
+            for pending in batch:
+                pending.error = e
+        finally:
+            for pending in batch:
+                pending.done.set()
+
+    def _get_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self._send(200, {"status": "ok"})
+                else:
+                    self._send(404, {"error": "Not found"})
+
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+
+                    if self.path == "/embed_documents":
+                        self._send(200, {"vectors": server.embed(list(payload["texts"]))})
+                    elif self.path == "/embed_query":
+                        self._send(200, {"vector": server.embed([payload["text"]])[0]})
+                    else:
+                        self._send(404, {"error": "Not found"})
+                except (KeyError, ValueError) as e:
+                    self._send(400, {"error": f"Petición inválida: {e}"})
+                except Exception as e:
+                    self._send(500, {"error": str(e)})
+
+            def _send(self, status: int, body: dict):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                server.logger.debug(format % args)
+
+        return Handler
+
+
+class RemoteEmbeddings(Embeddings):
+    """
+    Embedding function that delegates to a running EmbeddingServer.
+
+    Used by the database managers instead of loading a model in every process.
+    """
+
+    def __init__(self, url: str, timeout: float = 120):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        response = self.session.post(f"{self.url}/embed_documents", json={"texts": texts},
+                                     timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["vectors"]
+
+    def embed_query(self, text: str) -> list[float]:
+        response = self.session.post(f"{self.url}/embed_query", json={"text": text},
+                                     timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["vector"]
+
+    @staticmethod
+    def get_address(url: str) -> tuple[str, int]:
+        """Returns (host, port) of a server URL such as http://127.0.0.1:8001."""
+        parsed = urlparse(url)
+        return parsed.hostname or "127.0.0.1", parsed.port or 8001
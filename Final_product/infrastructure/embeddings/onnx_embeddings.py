@@ -0,0 +1,187 @@
+from langchain_core.embeddings import Embeddings
+from sentence_transformers import SentenceTransformer
+from transformers import AutoTokenizer
+from pathlib import Path
+import onnxruntime as ort
+import numpy as np
+import torch
+import json
+import logging
+
+
+class _TransformerWrapper(torch.nn.Module):
+    """Exposes only the last hidden state so the ONNX graph has a single output."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    CPU embedding backend that runs the configured sentence-transformer with ONNX Runtime.
+
+    The first time a model is used it is exported to ONNX (and optionally quantized to
+    dynamic int8) inside `export_directory`. The tokenizer, pooling mode and a parity
+    check against the PyTorch model are stored next to the exported graph, so later
+    processes load it without touching PyTorch.
+
+    Key Features:
+    - Same pooling (mean / cls) and normalization as the original sentence-transformer.
+    - Optional dynamic int8 quantization of the weights.
+    - Parity check (cosine agreement with the PyTorch model) recorded at export time.
+    """
+
+    PARITY_SAMPLES = [
+        "¿Qué es un bucle for en Python?",
+        "El examen de programación será el 5 de junio a las 9 de la mañana.",
+        "Una función recursiva se llama a sí misma hasta alcanzar el caso base.",
+        "Las listas son estructuras de datos mutables y ordenadas.",
+    ]
+    PARITY_THRESHOLD = 0.99
+
+    def __init__(self,
+                 model_name: str,
+                 export_directory: str,
+                 quantize: bool = False,
+                 batch_size: int = 32,
+                 num_threads: int = None):
+        self.model_name = model_name
+        self.quantize = quantize
+        self.batch_size = batch_size
+        self.logger = logging.getLogger(__name__)
+
+        model_directory = Path(export_directory) / model_name.replace("/", "__")
+        onnx_path = model_directory / "model.onnx"
+        int8_path = model_directory / "model.int8.onnx"
+        info_path = model_directory / "export_info.json"
+
+        if not onnx_path.exists() or not info_path.exists():
+            self._export(model_directory, onnx_path, info_path)
+
+        if quantize and not int8_path.exists():
+            # Needs the `onnx` package, only imported when quantizing
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            quantize_dynamic(str(onnx_path), str(int8_path), weight_type=QuantType.QInt8)
+
+        info = json.loads(info_path.read_text(encoding="utf-8"))
+        self.max_seq_length = info["max_seq_length"]
+        self.pooling_mode = info["pooling_mode"]
+        self.normalize = info["normalize"]
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_directory))
+
+        session_options = ort.SessionOptions()
+        if num_threads:
+            session_options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            str(int8_path if quantize else onnx_path),
+            sess_options=session_options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+        if quantize:
+            self._check_parity(info, label="int8")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self.encode_batch(texts[start:start + self.batch_size]).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.encode_batch([text])[0].tolist()
+
+    def encode_batch(self, texts: list[str]) -> np.ndarray:
+        """Encodes a batch of texts padded to its longest member."""
+        encoded = self.tokenizer(texts,
+                                 padding=True,
+                                 truncation=True,
+                                 max_length=self.max_seq_length,
+                                 return_tensors="np")
+        feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+        hidden = self.session.run(None, feeds)[0]
+
+        if self.pooling_mode == "cls":
+            embeddings = hidden[:, 0]
+        else:
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            embeddings = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self.normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings
+
+    def _export(self, model_directory: Path, onnx_path: Path, info_path: Path) -> None:
+        """Exports the PyTorch transformer to ONNX and stores tokenizer and pooling settings."""
+        self.logger.info(f"Exportando {self.model_name} a ONNX en {model_directory}")
+        model_directory.mkdir(parents=True, exist_ok=True)
+
+        st_model = SentenceTransformer(self.model_name, device="cpu")
+        transformer = st_model[0]
+        pooling_mode = "mean"
+        if len(st_model) > 1 and hasattr(st_model[1], "get_pooling_mode_str"):
+            pooling_mode = st_model[1].get_pooling_mode_str()
+        normalize = any(type(module).__name__ == "Normalize" for module in st_model)
+
+        sample = st_model.tokenizer(self.PARITY_SAMPLES[:2], padding=True, truncation=True,
+                                    return_tensors="pt")
+        wrapper = _TransformerWrapper(transformer.auto_model.eval())
+        with torch.no_grad():
+            torch.onnx.export(
+                wrapper,
+                args=(sample["input_ids"], sample["attention_mask"]),
+                f=str(onnx_path),
+                input_names=["input_ids", "attention_mask"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "last_hidden_state": {0: "batch", 1: "sequence"},
+                },
+                opset_version=14
+            )
+        st_model.tokenizer.save_pretrained(str(model_directory))
+
+        reference = st_model.encode(self.PARITY_SAMPLES, convert_to_numpy=True)
+        info = {
+            "model_name": self.model_name,
+            "max_seq_length": st_model.max_seq_length,
+            "pooling_mode": pooling_mode,
+            "normalize": normalize,
+            "reference_embeddings": reference.tolist(),
+        }
+        info_path.write_text(json.dumps(info), encoding="utf-8")
+
+        # Parity of the fp32 graph, checked with a temporary session
+        self.max_seq_length = st_model.max_seq_length
+        self.pooling_mode = pooling_mode
+        self.normalize = normalize
+        self.tokenizer = st_model.tokenizer
+        self.session = ort.InferenceSession(str(onnx_path), providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self._check_parity(info, label="fp32")
+
+    def _check_parity(self, info: dict, label: str) -> float:
+        """
+        Compares the ONNX embeddings with the PyTorch ones stored at export time.
+
+        Returns the minimum cosine similarity and logs a warning under the threshold.
+        """
+        reference = np.asarray(info["reference_embeddings"], dtype=np.float32)
+        candidate = self.encode_batch(self.PARITY_SAMPLES)
+        cosine = (reference * candidate).sum(axis=1) / (
+            np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1))
+        min_cosine = float(cosine.min())
+
+        if min_cosine < self.PARITY_THRESHOLD:
+            self.logger.warning(f"Paridad ONNX ({label}) baja para {self.model_name}: "
+                                f"coseno mínimo {min_cosine:.4f}")
+        else:
+            self.logger.info(f"Paridad ONNX ({label}) para {self.model_name}: "
+                             f"coseno mínimo {min_cosine:.4f}")
+        return min_cosine
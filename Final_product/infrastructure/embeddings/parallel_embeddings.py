@@ -0,0 +1,122 @@
+from langchain_core.embeddings import Embeddings
+from concurrent.futures import ProcessPoolExecutor
+from factories.EmbeddingFactory import EmbeddingFactory
+from infrastructure.embeddings.dynamic_batch_embeddings import DynamicBatchEmbeddings
+import multiprocessing
+import os
+import torch
+
+_worker_model = None
+
+
+def _init_worker(model_name: str, backend: str, num_threads: int, max_batch_tokens: int) -> None:
+    """
+    Loads one model per worker process, limited to `num_threads` threads.
+
+    torch is already imported when the initializer runs, so OMP_NUM_THREADS and
+    MKL_NUM_THREADS would have no effect: the limit is set through torch itself (and
+    through the session options of the ONNX backend).
+    """
+    global _worker_model
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(num_threads)
+
+    if backend == "torch":
+        _worker_model = EmbeddingFactory.get_embeddings(model_name=model_name, backend=backend)
+    else:
+        from infrastructure.embeddings.onnx_embeddings import OnnxEmbeddings
+        _worker_model = OnnxEmbeddings(model_name=model_name,
+                                       export_directory=str(EmbeddingFactory.ONNX_DIRECTORY),
+                                       quantize=(backend == "onnx-int8"),
+                                       num_threads=num_threads)
+
+    if max_batch_tokens:
+        _worker_model = DynamicBatchEmbeddings(_worker_model, max_batch_tokens=max_batch_tokens)
+
+
+def _embed_batch(texts: list[str]) -> list[list[float]]:
+    return _worker_model.embed_documents(texts)
+
+
+class ParallelEmbeddings(Embeddings):
+    """
+    Embeds documents with a pool of worker processes.
+
+    The texts are sharded in batches that are distributed across the workers and the
+    vectors are gathered back in the original order. Each worker is limited to
+    `cpu_count // workers` threads to avoid oversubscription. Queries are embedded in
+    the current process with the shared model. With `max_batch_tokens` every worker
+    batches its shard by token budget (see DynamicBatchEmbeddings).
+
+    Used as a context manager, the pool is kept alive between calls, so streaming
+    ingestion embeds many small batches without starting the workers every time.
+    """
+
+    def __init__(self,
+                 model_name: str,
+                 query_model: Embeddings,
+                 backend: str = "torch",
+                 workers: int = None,
+                 threads_per_worker: int = None,
+                 batch_size: int = 64,
+                 max_batch_tokens: int = None):
+        self.model_name = model_name
+        self.query_model = query_model
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+        self.threads_per_worker = (threads_per_worker
+                                   or max(1, (os.cpu_count() or 1) // self.workers))
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self._executor = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._executor = self._create_executor(self.workers)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.workers <= 1 or (self._executor is None and len(texts) <= self.batch_size):
+            return self.query_model.embed_documents(texts)
+
+        order = list(range(len(texts)))
+        if self.max_batch_tokens:
+            # Shards of similar length, so the token-budget batching of each worker pads less
+            order.sort(key=lambda i: len(texts[i]))
+        shard_size = self.batch_size
+        if self._executor is not None:
+            # Small streaming batches: split them so that every worker of the open pool gets a share
+            shard_size = max(1, min(self.batch_size, -(-len(order) // self.workers)))
+        batches = [[texts[i] for i in order[start:start + shard_size]]
+                   for start in range(0, len(order), shard_size)]
+
+        sorted_vectors = []
+        if self._executor is not None:
+            for batch_vectors in self._executor.map(_embed_batch, batches):
+                sorted_vectors.extend(batch_vectors)
+        else:
+            with self._create_executor(min(self.workers, len(batches))) as executor:
+                for batch_vectors in executor.map(_embed_batch, batches):
+                    sorted_vectors.extend(batch_vectors)
+
+        vectors = [None] * len(texts)
+        for position, vector in zip(order, sorted_vectors):
+            vectors[position] = vector
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.query_model.embed_query(text)
+
+    def _create_executor(self, max_workers: int) -> ProcessPoolExecutor:
+        # "spawn": forking a process that already holds PyTorch threads is not safe
+        return ProcessPoolExecutor(max_workers=max_workers,
+                                   mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker,
+                                   initargs=(self.model_name, self.backend, self.threads_per_worker,
+                                             self.max_batch_tokens))
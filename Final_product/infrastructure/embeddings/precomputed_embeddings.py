@@ -0,0 +1,43 @@
+from langchain_core.embeddings import Embeddings
+import logging
+
+
+class PrecomputedEmbeddings(Embeddings):
+    """
+    Serves vectors computed in advance and embeds only the rest.
+
+    Used with `SemanticSplitter`: the chunks already have a pooled embedding, keyed by
+    their text, so the database managers index them without running the model again.
+    Each vector is served once and then released; texts without a vector (or repeated
+    ones) go to the wrapped model, as does every query.
+    """
+
+    def __init__(self, model: Embeddings, vectors: dict[str, list[float]]):
+        self.model = model
+        self.vectors = vectors
+        self.hits = 0
+        self.misses = 0
+        self.logger = logging.getLogger(__name__)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = [self.vectors.pop(text, None) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            for i, vector in zip(missing, self.model.embed_documents([texts[i] for i in missing])):
+                vectors[i] = vector
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.model.embed_query(text)
+
+    def __enter__(self):
+        if hasattr(self.model, "__enter__"):
+            self.model.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        if hasattr(self.model, "__exit__"):
+            return self.model.__exit__(*exc_info)
+        return False
@@ -1,7 +1,14 @@
 from abc import ABC, abstractmethod
 from langchain_core.documents import Document
-from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
+from factories.EmbeddingFactory import EmbeddingFactory
+from infrastructure.embeddings.parallel_embeddings import ParallelEmbeddings
+from infrastructure.embeddings.dynamic_batch_embeddings import DynamicBatchEmbeddings
+from infrastructure.embeddings.precomputed_embeddings import PrecomputedEmbeddings
+from infrastructure.Splitters.chunk_store import ChunkStore
 from pathlib import Path
+from typing import Iterable, Sequence
+import logging
 
 class Database_manager():
     """
@@ -12,21 +19,98 @@ class Database_manager():
     while allowing flexibility in the choice of vector database and embedding model.
 
     Key Features:
-    - Initializes an embedding model for document processing.
+    - Obtains the embedding model from the process-wide registry, so every manager shares it,
+      or from the shared embedding server when one is configured.
+    - Optionally embeds documents at creation time with a pool of worker processes
+      and in length-bucketed batches bounded by a token budget.
+    - Can build a database from already embedded batches (streaming ingestion).
     - Defines abstract methods for storing and retrieving embeddings.
     - Requires concrete implementations to specify how embeddings are created and queried.
     """
 
 
-    def __init__(self, work_directory:str, model_name:str):
+    def __init__(self, work_directory:str, model_name:str, embedding_backend:str = "torch",
+                 embedding_workers:int = 1, embedding_batch_tokens:int = None,
+                 embedding_server_url:str = None):
         self.work_directory = work_directory
+        self.model_name = model_name
+        self.embedding_backend = embedding_backend
+        self.embedding_workers = embedding_workers
+        self.embedding_batch_tokens = embedding_batch_tokens
+        self.embedding_server_url = embedding_server_url
         model_kwargs = {'trust_remote_code': 'True'}
-        self.embedding_model = HuggingFaceEmbeddings(model_name=model_name, model_kwargs= model_kwargs)
+        self.embedding_model = EmbeddingFactory.get_embeddings(model_name=model_name,
+                                                             model_kwargs= model_kwargs,
+                                                             backend= embedding_backend,
+                                                             server_url= embedding_server_url)
+
+    def get_ingestion_embeddings(self, precomputed_vectors: dict = None) -> Embeddings:
+        """
+        Returns the embedding function used at ingestion time: the shared model, or a
+        process pool sharing out the documents when more than one worker is configured.
+        With `embedding_batch_tokens` the batches are built by token budget. With an
+        embedding server the batching is already done by the server.
+        With `precomputed_vectors` (text -> vector) those texts are served without
+        running the model.
+        """
+        embeddings = self._get_ingestion_model()
+        if precomputed_vectors is not None:
+            return PrecomputedEmbeddings(embeddings, vectors=precomputed_vectors)
+        return embeddings
+
+    def _get_ingestion_model(self) -> Embeddings:
+        if self.embedding_server_url:
+            return self.embedding_model
+        if self.embedding_workers and self.embedding_workers > 1:
+            return ParallelEmbeddings(model_name=self.model_name,
+                                      query_model=self.embedding_model,
+                                      backend=self.embedding_backend,
+                                      workers=self.embedding_workers,
+                                      max_batch_tokens=self.embedding_batch_tokens)
+        if self.embedding_batch_tokens:
+            return DynamicBatchEmbeddings(self.embedding_model,
+                                          max_batch_tokens=self.embedding_batch_tokens)
+        return self.embedding_model
+
+    def preprocess_chunks(self, chunks: Sequence[Document], num_doc: int) -> Sequence[Document]:
+        """
+        Applies to the chunks of document `num_doc` the same preprocessing as `create()`
+        (clean metadata and unique ID), for callers that embed the chunks themselves.
+        A `ChunkStore` stays compact: the preprocessing runs when each chunk is materialized.
+        """
+        if isinstance(chunks, ChunkStore):
+            chunks.transform = lambda chunk, j: self._preprocess_document(chunk, num_doc=num_doc,
+                                                                          num_page=j)
+            return chunks
+        return [self._preprocess_document(chunk, num_doc=num_doc, num_page=j)
+                for j, chunk in enumerate(chunks)]
+
+    def warm_up(self,
+                database_names: list[str],
+                sample_query: str = "¿Qué es un bucle for?") -> None:
+        """
+        Pays the first-request costs in advance: model weights, tokenizer, first
+        inference and loading of the indexes, running a sample search on each database.
+        Databases that do not exist yet are skipped.
+        """
+        logger = logging.getLogger(__name__)
+        self.embedding_model.embed_query(sample_query)
+        for database_name in database_names:
+            try:
+                self.get_context(database_name=database_name, query_text=sample_query)
+            except FileExistsError as e:
+                logger.warning(f"No se puede precargar la base de datos {database_name}: {e}")
 
     @abstractmethod
     def create (self, text:str) -> None:
         pass
 
+    @abstractmethod
+    def create_from_embedded_batches(self,
+                                     batches: Iterable[tuple[list[Document], list[list[float]]]],
+                                     database_name: str) -> None:
+        pass
+
     @abstractmethod
     def get_context(self, database_name: str, query_text: str, k: int = 5) -> list:
         pass
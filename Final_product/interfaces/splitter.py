@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Sequence
 from langchain.schema import Document
 
 class Splitter(ABC):
@@ -12,3 +12,14 @@ class Splitter(ABC):
         :return: Lista de documentos chunked.
         """
         pass
+
+    def split_compact(self, documents: List[Document]) -> Sequence[Document]:
+        """
+        Igual que `split`, pero devuelve los chunks en la forma más compacta que soporte el
+        splitter (un `ChunkStore` de offsets sobre el texto de las páginas). Por defecto, la
+        lista de `split`.
+
+        :param documents: Lista de documentos originales.
+        :return: Secuencia de documentos chunked, materializados al acceder a ellos.
+        """
+        return self.split(documents)
@@ -5,6 +5,13 @@ from controllers.update_controller import UpdateController
 from controllers.answer_controller import AnswerController
 # from Final_product.API.api import API
 from configs.main_config import Main_config
+from factories.EmbeddingFactory import EmbeddingFactory
+from infrastructure.documentLoaders.universal_documents_loader import Universal_documents_loader
+from infrastructure.Splitters.text_splitter import TextSplitter
+from tools.embedding_benchmark import EmbeddingBenchmark
+from tools.pdf_backend_benchmark import PdfBackendBenchmark
+from infrastructure.embeddings.dynamic_batch_embeddings import DynamicBatchEmbeddings
+from infrastructure.embeddings.embedding_server import EmbeddingServer, RemoteEmbeddings
 import json
 from pathlib import Path
 import uvicorn
@@ -28,6 +35,9 @@ class AppConfig:
     """Configura las opciones disponibles para la aplicación."""
     update: bool = False
     answer: bool = False
+    benchmark_embeddings: bool = False
+    benchmark_pdf: bool = False
+    embedding_server: bool = False
 
 
 class Application:
@@ -40,41 +50,86 @@ class Application:
             #Lectura del archivo de configuracion
             self.main_config = Main_config(Path("Final_product") / "configs" / "config.json")
 
-            self.update_handler = UpdateController(content_path = self.main_config.CONTENT_PATH,
-                                                database_path = self.main_config.DATABASE_PATH,
-                                                embedding_model_name = self.main_config.EMBEDDING_MODEL_NAME,
-                                                DL_recursive_mode = self.main_config.DL_RECURSIVE_MODE,
-                                                DL_extract_images = self.main_config.DL_EXTRACT_IMAGES,
-
-                                                summary_model_type = self.main_config.SUMMARY_MODEL_TYPE,   ##Lo ideal sería usar una clase para encapsular estos datos
-                                                summary_model_name = self.main_config.SUMMARY_MODEL_NAME,  ##Pero no se donde ponerla en la arquitectura
-                                                summary_api_key = self.main_config.SUMMARY_API_KEY,
-                                                summary_temperature = self.main_config.SUMMARY_TEMPERATURE,
-                                                summary_top_k = self.main_config.SUMMARY_TOP_P,
-                                                summary_max_tokens = self.main_config.SUMMARY_MAX_TOKENS,
-
-                                                database_type = self.main_config.DATABASE_TYPE
-                                                )
+            self.update_handler = UpdateController(
+                content_path = self.main_config.CONTENT_PATH,
+                database_path = self.main_config.DATABASE_PATH,
+                embedding_model_name = self.main_config.EMBEDDING_MODEL_NAME,
+                DL_recursive_mode = self.main_config.DL_RECURSIVE_MODE,
+                DL_extract_images = self.main_config.DL_EXTRACT_IMAGES,
+                DL_workers = self.main_config.DL_WORKERS,
+                DL_file_timeout = self.main_config.DL_FILE_TIMEOUT,
+                DL_cache_path = self.main_config.DL_CACHE_PATH,
+                DL_pdf_backend = self.main_config.DL_PDF_BACKEND,
+                DL_ocr_policy = self.main_config.DL_OCR_POLICY,
+                DL_ocr_min_chars = self.main_config.DL_OCR_MIN_CHARS,
+                DL_ocr_min_image_pixels = self.main_config.DL_OCR_MIN_IMAGE_PIXELS,
+                DL_ocr_workers = self.main_config.DL_OCR_WORKERS,
+                DL_ocr_cache_path = self.main_config.DL_OCR_CACHE_PATH,
+                DL_url_workers = self.main_config.DL_URL_WORKERS,
+                DL_url_timeout = self.main_config.DL_URL_TIMEOUT,
+                DL_url_max_per_host = self.main_config.DL_URL_MAX_PER_HOST,
+                DL_url_cache_path = self.main_config.DL_URL_CACHE_PATH,
+                DL_pdf_shard_pages = self.main_config.DL_PDF_SHARD_PAGES,
+
+                ##Lo ideal sería usar una clase para encapsular estos datos
+                ##Pero no se donde ponerla en la arquitectura
+                summary_model_type = self.main_config.SUMMARY_MODEL_TYPE,
+                summary_model_name = self.main_config.SUMMARY_MODEL_NAME,
+                summary_api_key = self.main_config.SUMMARY_API_KEY,
+                summary_temperature = self.main_config.SUMMARY_TEMPERATURE,
+                summary_top_k = self.main_config.SUMMARY_TOP_P,
+                summary_max_tokens = self.main_config.SUMMARY_MAX_TOKENS,
+                summary_concurrency = self.main_config.SUMMARY_CONCURRENCY,
+                summary_rpm = self.main_config.SUMMARY_RPM,
+                summary_tpm = self.main_config.SUMMARY_TPM,
+                summary_cache_path = self.main_config.SUMMARY_CACHE_PATH,
+                practise_routing = self.main_config.PRACTISE_ROUTING,
+
+                database_type = self.main_config.DATABASE_TYPE,
+                embedding_backend = self.main_config.EMBEDDING_BACKEND,
+                embedding_workers = self.main_config.EMBEDDING_WORKERS,
+                embedding_batch_tokens = self.main_config.EMBEDDING_BATCH_TOKENS,
+                embedding_server_url = self.main_config.EMBEDDING_SERVER_URL,
+                ingestion_streaming = self.main_config.INGESTION_STREAMING,
+                splitter_type = self.main_config.SPLITTER_TYPE,
+                splitter_chunk_tokens = self.main_config.SPLITTER_CHUNK_TOKENS,
+                splitter_overlap_tokens = self.main_config.SPLITTER_OVERLAP_TOKENS,
+                splitter_breakpoint_percentile = self.main_config.SPLITTER_BREAKPOINT_PERCENTILE,
+                splitter_pool_embeddings = self.main_config.SPLITTER_POOL_EMBEDDINGS,
+                splitter_truncation_report = self.main_config.SPLITTER_TRUNCATION_REPORT
+            )
             logger.info("UpdateController instanciado")
             self.answer_handler = AnswerController(
-                                                    database_path = self.main_config.DATABASE_PATH,
-                                                    embedding_model_name = self.main_config.EMBEDDING_MODEL_NAME,
-
-                                                    classifier_model_type = self.main_config.CLASSIFIER_MODEL_TYPE,   ##Lo ideal sería usar una clase para encapsular estos datos
-                                                    classifier_model_name = self.main_config.CLASSIFIER_MODEL_NAME,  ##Pero no se donde ponerla en la arquitectura
-                                                    classifier_api_key = self.main_config.CLASSIFIER_API_KEY,
-                                                    classifier_temperature = self.main_config.CLASSIFIER_TEMPERATURE,
-                                                    classifier_top_k = self.main_config.CLASSIFIER_TOP_P,
-                                                    classifier_max_tokens = self.main_config.CLASSIFIER_MAX_TOKENS,
-
-                                                    answer_model_type = self.main_config.ANSWER_MODEL_TYPE,   ##Lo ideal sería usar una clase para encapsular estos datos
-                                                    answer_model_name = self.main_config.ANSWER_MODEL_NAME,  ##Pero no se donde ponerla en la arquitectura
-                                                    answer_api_key = self.main_config.ANSWER_API_KEY,
-                                                    answer_temperature = self.main_config.ANSWER_TEMPERATURE,
-                                                    answer_top_k = self.main_config.ANSWER_TOP_P,
-                                                    answer_max_tokens = self.main_config.ANSWER_MAX_TOKENS,
-
-                                                    content_path=self.main_config.CONTENT_PATH)
+                database_path = self.main_config.DATABASE_PATH,
+                embedding_model_name = self.main_config.EMBEDDING_MODEL_NAME,
+
+                ##Lo ideal sería usar una clase para encapsular estos datos
+                ##Pero no se donde ponerla en la arquitectura
+                classifier_model_type = self.main_config.CLASSIFIER_MODEL_TYPE,
+                classifier_model_name = self.main_config.CLASSIFIER_MODEL_NAME,
+                classifier_api_key = self.main_config.CLASSIFIER_API_KEY,
+                classifier_temperature = self.main_config.CLASSIFIER_TEMPERATURE,
+                classifier_top_k = self.main_config.CLASSIFIER_TOP_P,
+                classifier_max_tokens = self.main_config.CLASSIFIER_MAX_TOKENS,
+
+                ##Lo ideal sería usar una clase para encapsular estos datos
+                ##Pero no se donde ponerla en la arquitectura
+                answer_model_type = self.main_config.ANSWER_MODEL_TYPE,
+                answer_model_name = self.main_config.ANSWER_MODEL_NAME,
+                answer_api_key = self.main_config.ANSWER_API_KEY,
+                answer_temperature = self.main_config.ANSWER_TEMPERATURE,
+                answer_top_k = self.main_config.ANSWER_TOP_P,
+                answer_max_tokens = self.main_config.ANSWER_MAX_TOKENS,
+                answer_context_max_tokens = self.main_config.ANSWER_CONTEXT_MAX_TOKENS,
+
+                content_path = self.main_config.CONTENT_PATH,
+                embedding_backend = self.main_config.EMBEDDING_BACKEND,
+                embedding_server_url = self.main_config.EMBEDDING_SERVER_URL,
+                practise_max_chunks = self.main_config.PRACTISE_MAX_CHUNKS,
+                practise_routing = self.main_config.PRACTISE_ROUTING,
+                practise_top_n = self.main_config.PRACTISE_TOP_N,
+                practise_skip_threshold = self.main_config.PRACTISE_SKIP_THRESHOLD
+            )
             logger.info("AnswerController instanciado")
 
 
@@ -95,6 +150,12 @@ class Application:
             self._update_content()
         elif self.argsconfig.answer:
             self._simulate_answer()
+        elif self.argsconfig.benchmark_embeddings:
+            self._benchmark_embeddings()
+        elif self.argsconfig.benchmark_pdf:
+            self._benchmark_pdf_backends()
+        elif self.argsconfig.embedding_server:
+            self._launch_embedding_server()
         else:
             self._launch_server()
 
@@ -119,6 +180,16 @@ class Application:
         uvicorn.run("API.api:app", host="127.0.0.1", port=8000, reload=True)
 
 
+    def _launch_embedding_server(self) -> None:
+        """Serves the configured embedding model to the API workers and the ingestion jobs."""
+        url = self.main_config.EMBEDDING_SERVER_URL or "http://127.0.0.1:8001"
+        host, port = RemoteEmbeddings.get_address(url)
+        model = EmbeddingFactory.get_embeddings(model_name=self.main_config.EMBEDDING_MODEL_NAME,
+                                                backend=self.main_config.EMBEDDING_BACKEND)
+        logger.info("Lanzando servidor de embeddings ... ")
+        EmbeddingServer(model=model, host=host, port=port).serve_forever()
+
+
     def _simulate_answer(self):
         #Simulation of entry json
         history = {"messages": [
@@ -130,6 +201,58 @@ class Application:
         print (answer)
 
 
+    def _benchmark_embeddings(self, max_texts: int = 256) -> None:
+        """
+        Compares the PyTorch embedding backend with the ONNX ones (parity and throughput)
+        and fixed-size batching with token-budget batching, using chunks of the theory
+        content as sample corpus.
+        """
+        theory_path = Path(self.main_config.CONTENT_PATH) / "teoria"
+        loader = Universal_documents_loader(path=str(theory_path),
+                                            process_images=False,
+                                            recursive_mode=False)
+        pages = [page for doc in loader.load_documents() for page in doc]
+        texts = [chunk.page_content for chunk in TextSplitter().split(pages)][:max_texts]
+        if not texts:
+            print("No hay contenido en teoria para el benchmark")
+            return
+
+        model_name = self.main_config.EMBEDDING_MODEL_NAME
+        reference = EmbeddingFactory.get_embeddings(model_name=model_name, backend="torch")
+        for backend in ["onnx", "onnx-int8"]:
+            candidate = EmbeddingFactory.get_embeddings(model_name=model_name, backend=backend)
+            results = EmbeddingBenchmark(reference=reference, candidate=candidate).run(texts)
+            print(f"[{backend}] textos={len(texts)} "
+                  f"coseno medio={results['mean_cosine']:.4f} "
+                  f"coseno mínimo={results['min_cosine']:.4f} "
+                  f"torch={results['reference_texts_s']:.1f} textos/s "
+                  f"{backend}={results['candidate_texts_s']:.1f} textos/s "
+                  f"speedup=x{results['speedup']:.2f}")
+
+        configured = EmbeddingFactory.get_embeddings(model_name=model_name,
+                                                     backend=self.main_config.EMBEDDING_BACKEND)
+        max_batch_tokens = self.main_config.EMBEDDING_BATCH_TOKENS or 8192
+        dynamic = DynamicBatchEmbeddings(configured, max_batch_tokens=max_batch_tokens)
+        results = EmbeddingBenchmark(reference=configured, candidate=dynamic).run(texts)
+        print(f"[lotes por tokens] textos={len(texts)} coseno mínimo={results['min_cosine']:.4f} "
+              f"lotes fijos={results['reference_texts_s']:.1f} textos/s "
+              f"lotes por tokens={results['candidate_texts_s']:.1f} textos/s "
+              f"speedup=x{results['speedup']:.2f}")
+
+    def _benchmark_pdf_backends(self) -> None:
+        """
+        Compares the PDF extraction backends (pages/s and text equality against pypdf)
+        using the PDFs of the theory content as sample corpus.
+        """
+        path = str(Path(self.main_config.CONTENT_PATH) / "teoria")
+        results = PdfBackendBenchmark(path=path).run()
+        for backend, result in results.items():
+            print(f"[{backend}] páginas={result['pages']} {result['pages_s']:.1f} páginas/s "
+                  f"speedup=x{result['speedup']:.2f} "
+                  f"similitud media={result['mean_similarity']:.4f} "
+                  f"páginas iguales={100 * result['equal_pages']:.1f}%")
+
+
 # Funciones auxiliares ------------------------------------------------------
 
 def _parse_arguments() -> AppConfig:
@@ -153,8 +276,31 @@ def _parse_arguments() -> AppConfig:
         help="Simula una pregunta"
     )
 
+    parser.add_argument(
+        "-b",
+        "--benchmark-embeddings",
+        action="store_true",
+        help="Compara los backends de embeddings (torch / onnx / onnx-int8)"
+    )
+
+    parser.add_argument(
+        "-p",
+        "--benchmark-pdf",
+        action="store_true",
+        help="Compara los backends de extracción de PDF (pypdf / pypdfium2 / pymupdf)"
+    )
+
+    parser.add_argument(
+        "-e",
+        "--embedding-server",
+        action="store_true",
+        help="Lanza el servidor local de embeddings compartido"
+    )
+
     args = parser.parse_args()
-    return AppConfig(update=args.update, answer = args.answer)
+    return AppConfig(update=args.update, answer = args.answer,
+                     benchmark_embeddings = args.benchmark_embeddings,
+                     benchmark_pdf = args.benchmark_pdf, embedding_server = args.embedding_server)
 
 
 def main() -> None:
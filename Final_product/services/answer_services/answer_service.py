@@ -1,16 +1,29 @@
 from tools.LLM_tool import LLMTool
 from services.answer_services.utils_prompts import UtilsPrompts
+from services.answer_services.context_packer import ContextPacker
 from infrastructure.databaseManagers.chroma_database_manager import Chroma_database_manager
 from infrastructure.databaseManagers.faiss_database_manager import Faiss_database_manager
 from infrastructure.documentLoaders.universal_documents_loader import Universal_documents_loader
 from infrastructure.databaseManagers.practise_database_manager import PractiseDatabaseManager
+from infrastructure.Splitters.python_code_splitter import PythonCodeSplitter
+from langchain.schema import Document
+from collections import OrderedDict
 from pathlib import Path
+import threading
+import hashlib
 import json
 import ast
+import math
 import logging
 
 class AnswerService ():
 
+    PRACTISE_ROUTINGS = ["flat", "embedding", "hierarchical"]
+    # Minimum gap between the best and the second candidate to skip the file-selection prompt
+    PRACTISE_SKIP_MARGIN = 0.1
+    # Practise files whose chunk vectors are kept in memory (least recently used are dropped)
+    CHUNK_VECTOR_CACHE_FILES = 256
+
     def __init__(self,
                  answer_model_name:str,
                  answer_model_type:str,
@@ -21,7 +34,14 @@ class AnswerService ():
                  embeddings_model_name:str,
                  database_path:str,
                  content_path:str,
-                 database_type:str = "faiss"
+                 database_type:str = "faiss",
+                 answer_context_max_tokens:int = None,
+                 embedding_backend:str = "torch",
+                 embedding_server_url:str = None,
+                 practise_max_chunks:int = 8,
+                 practise_routing:str = "flat",
+                 practise_top_n:int = 8,
+                 practise_skip_threshold:float = None
                  ):
 
         self.LLM = LLMTool(
@@ -32,23 +52,70 @@ class AnswerService ():
                     top_p=answer_top_k,
                     max_tokens=answer_max_tokens)
 
+        self.context_packer = ContextPacker(
+                    model_name=answer_model_name,
+                    model_type=answer_model_type,
+                    answer_max_tokens=answer_max_tokens,
+                    max_context_tokens=answer_context_max_tokens)
+
         self.DATABASE_PATH = database_path
         self.CONTET_PATH = content_path
 
         if (database_type == "faiss"):
-            self.database_manager = Faiss_database_manager(model_name=embeddings_model_name, work_directory = database_path)
+            self.database_manager = Faiss_database_manager(
+                model_name = embeddings_model_name,
+                work_directory = database_path,
+                embedding_backend = embedding_backend,
+                embedding_server_url = embedding_server_url
+            )
         elif(database_type == "chroma"):
-            self.database_manager = Chroma_database_manager(model_name=embeddings_model_name, work_directory = database_path)
+            self.database_manager = Chroma_database_manager(
+                model_name = embeddings_model_name,
+                work_directory = database_path,
+                embedding_backend = embedding_backend,
+                embedding_server_url = embedding_server_url
+            )
         else:
             raise ValueError ("Database selected is not implemented")
 
-        self.practise_database_manager = PractiseDatabaseManager(work_directory=database_path, LLM=LLMTool)
+        if practise_routing not in self.PRACTISE_ROUTINGS:
+            raise ValueError(f"Unsupported practise routing: '{practise_routing}'. "
+                             f"Supported routings: {self.PRACTISE_ROUTINGS}")
+        self.PRACTISE_ROUTING = practise_routing
+        self.PRACTISE_TOP_N = practise_top_n
+        self.PRACTISE_SKIP_THRESHOLD = practise_skip_threshold
+        self.practise_database_manager = PractiseDatabaseManager(
+            work_directory=database_path,
+            LLM=self.LLM,
+            embeddings=self.database_manager.embedding_model,
+            embedding_model_name=embeddings_model_name)
         self.dl = Universal_documents_loader(path=self.CONTET_PATH, process_images= False, recursive_mode=False)
+        self.code_splitter = PythonCodeSplitter()
+        self.PRACTISE_MAX_CHUNKS = practise_max_chunks
+        self._chunk_vectors = OrderedDict()
+        self._chunk_vectors_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
 
 
 
 
+    def warm_up(self):
+        """
+        Loads the embedding model and the indexes and runs sample encodes and searches,
+        so the first real question sees steady-state latency.
+        """
+        self.database_manager.warm_up(database_names=["teoria", "info"])
+        summary_path = Path(self.DATABASE_PATH) / "practica" / "summary_tree.json"
+        if summary_path.exists():
+            self.practise_database_manager.get_context(path=summary_path)
+            if self.PRACTISE_ROUTING == "embedding":
+                self.practise_database_manager.preselect(tree_path=summary_path, query="warm-up",
+                                                         k=1)
+            if self.PRACTISE_ROUTING == "hierarchical":
+                self.practise_database_manager.get_folder_summaries(tree_path=summary_path)
+        self.context_packer.counter.count("warm-up")
+
+
     def regular_answer(self, database_name:str , question:str):
         """
         Generates an answer to a given question using context retrieved from the specified database.
@@ -62,12 +129,16 @@ class AnswerService ():
 
         Description:
             - Retrieves relevant context from the database based on the question.
-            - Constructs a prompt combining the question and the context.
+            - Constructs a prompt combining the question and the context, packed deterministically
+              within the token budget of the answering model.
             - Sends the prompt to the language model to generate an answer.
         """
         try:
             context = self.database_manager.get_context(query_text=question, database_name=database_name)
-            prompt = UtilsPrompts.get_answering_prompt_from_question_and_context(question=question, context=context)
+            prompt = UtilsPrompts.get_answering_prompt_from_question_and_context(
+                question=question,
+                context=context,
+                packer=self.context_packer)
             response = self.LLM.query(prompt=prompt)
             return response
         except Exception as e:
@@ -112,9 +183,19 @@ class AnswerService ():
 
         Description:
             - Loads summaries from the specified database to identify relevant documents.
-            - Constructs a prompt to query the language model for the most relevant files.
+            - With `practise_routing="embedding"`, preselects the `practise_top_n` files whose
+              summaries are most similar to the question; if the best one is clearly ahead
+              (similarity of at least `practise_skip_threshold`) it is used directly, without
+              the file-selection prompt.
+            - With `practise_routing="hierarchical"`, chooses the relevant folders level by level
+              from the folder summaries and keeps only the files inside them as candidates.
+            - Constructs a prompt to query the language model for the most relevant files, with the
+              summaries of the candidates only.
             - Parses the model's response to extract file paths.
             - Loads the content of each relevant document.
+            - If the files hold more than `practise_max_chunks` modules, classes and functions (or
+              do not fit in the context), keeps only the ones most similar to the question
+              (embedding similarity), in file order.
             - Constructs a final prompt combining the question and document content.
             - Queries the LLM to generate a practical answer based on the context.
         """
@@ -123,13 +204,9 @@ class AnswerService ():
         try:
             # Obtain path of relevant documents
             database_path = self.DATABASE_PATH / database_name
-            summaries = self.practise_database_manager.get_context(path=database_path)
-            prompt = UtilsPrompts.get_relevant_files_prompt_from_query_and_summaries(query=question, summaries=summaries)
-            response = self.LLM.query(prompt=prompt)
+            files = self._select_files(question=question, summary_path=database_path)
 
-            # response = "['carpeta2/bucle_for_solucion_ejercicio_06.py', 'carpeta2/bucle_for_solucion_ejercicio_07.py', 'carpeta2/bucle_for_solucion_ejercicio_08a.py', 'carpeta2/bucle_for_solucion_ejercicio_08b.py']"
             # Load relevant documents
-            files = ast.literal_eval(response)
             practise_path = Path(folder_name)
             paths = [practise_path / Path(f) for f in files]
             docs = []
@@ -138,6 +215,8 @@ class AnswerService ():
                 doc = self.dl.load_document(p)
                 docs.append(doc)
 
+            docs = self._select_relevant_chunks(question=question, docs=docs)
+
             # Create answer
             prompt = UtilsPrompts.get_answering_prompt_pratise(query=question, context=docs)
             response = self.LLM.query(prompt=prompt)
@@ -147,3 +226,142 @@ class AnswerService ():
             msg = f"Error procesando la respuesta con documentos relevantes: {e}"
             self.logger.error(msg, exc_info=True)
             raise Exception(msg) from e
+
+
+    def _select_files(self, question: str, summary_path: Path) -> list[str]:
+        """Paths (relative to the practise folder) of the files relevant to the question."""
+        summaries = self.practise_database_manager.get_context(path=summary_path)
+        manager = self.practise_database_manager
+
+        if self.PRACTISE_ROUTING == "embedding":
+            candidates = manager.preselect(tree_path=summary_path, query=question,
+                                           k=self.PRACTISE_TOP_N)
+            if candidates:
+                best_score = candidates[0][1]
+                margin = best_score - candidates[1][1] if len(candidates) > 1 else best_score
+                if (self.PRACTISE_SKIP_THRESHOLD is not None
+                        and best_score >= self.PRACTISE_SKIP_THRESHOLD
+                        and margin >= self.PRACTISE_SKIP_MARGIN):
+                    self.logger.info(f"Fichero de práctica elegido por similitud "
+                                     f"({best_score:.2f}): {candidates[0][0]}")
+                    return [candidates[0][0]]
+                flat_summaries = manager.utils.flatten_tree(summaries)
+                summaries = {file: flat_summaries[file] for file, _ in candidates
+                             if file in flat_summaries}
+
+        elif self.PRACTISE_ROUTING == "hierarchical":
+            folder_summaries = manager.get_folder_summaries(tree_path=summary_path)
+            if folder_summaries is None:
+                self.logger.warning("No existen los resúmenes de carpetas de práctica, "
+                                    "se usan todos los resúmenes")
+            else:
+                summaries = self._route_folders(question=question, tree=summaries,
+                                                folder_summaries=folder_summaries)
+                if not summaries:
+                    return []
+
+        prompt = UtilsPrompts.get_relevant_files_prompt_from_query_and_summaries(
+            query=question, summaries=summaries)
+        response = self.LLM.query(prompt=prompt)
+        return ast.literal_eval(response)
+
+
+    def _route_folders(self, question: str, tree: dict, folder_summaries: dict[str, str],
+                       path: str = "") -> dict[str, str]:
+        """
+        Summaries {ruta: resumen} of the candidate files under `path`: its own files plus the files
+        of the subfolders the LLM chooses from their folder summaries, descending level by level.
+        Only the subfolders of one folder are in each prompt, so the prompt tokens grow with the
+        depth of the tree instead of its number of files.
+        """
+        files = {}
+        subfolders = {}
+        for name, value in tree.items():
+            child = f"{path}/{name}" if path else name
+            if isinstance(value, dict):
+                subfolders[child] = value
+            elif isinstance(value, str):
+                files[child] = value
+
+        # Without a summary a folder cannot be judged, so it is always explored
+        chosen = [folder for folder in subfolders if folder not in folder_summaries]
+        candidates = {folder: folder_summaries[folder] for folder in subfolders
+                      if folder in folder_summaries}
+        if len(candidates) == 1:
+            chosen += list(candidates)
+        elif candidates:
+            prompt = UtilsPrompts.get_relevant_folders_prompt_from_query_and_summaries(
+                query=question, summaries=candidates)
+            response = ast.literal_eval(self.LLM.query(prompt=prompt))
+            chosen += [folder for folder in response if folder in candidates]
+            self.logger.info(f"Carpetas de práctica elegidas en '{path or '.'}': {chosen}")
+
+        for folder in chosen:
+            files.update(self._route_folders(question=question, tree=subfolders[folder],
+                                             folder_summaries=folder_summaries, path=folder))
+        return files
+
+
+    def _select_relevant_chunks(self, question: str,
+                                docs: list[list[Document]]) -> list[list[Document]]:
+        """
+        Splits the selected files by module, class and function (`PythonCodeSplitter`) and keeps
+        the `practise_max_chunks` chunks most similar to the question that fit in the context
+        budget. The chunks are returned in file and line order. Files with few chunks that fit in
+        the budget are sent whole. The chunk vectors are cached by file content.
+        """
+        counter = self.context_packer.counter
+        base_prompt = UtilsPrompts.get_answering_prompt_pratise(query=question, context=[])
+        budget = self.context_packer.get_budget(reserved_tokens=counter.count(base_prompt))
+
+        file_chunks = [self.code_splitter.split(file_docs) for file_docs in docs]
+        chunks = [chunk for chunks_of_file in file_chunks for chunk in chunks_of_file]
+        if len(chunks) <= self.PRACTISE_MAX_CHUNKS:
+            total = sum(counter.count(doc.page_content) for file_docs in docs for doc in file_docs)
+            if total <= budget:
+                return docs
+
+        question_vector = self.database_manager.embedding_model.embed_query(question)
+        chunk_vectors = [vector for file_docs, chunks_of_file in zip(docs, file_chunks)
+                         for vector in self._get_chunk_vectors(file_docs, chunks_of_file)]
+        ranking = sorted(range(len(chunks)),
+                         key=lambda i: (-self._cosine(question_vector, chunk_vectors[i]), i))
+
+        selected = []
+        used = 0
+        for i in ranking:
+            tokens = counter.count(chunks[i].page_content)
+            if used + tokens > budget:
+                continue
+            selected.append(i)
+            used += tokens
+            if len(selected) == self.PRACTISE_MAX_CHUNKS:
+                break
+
+        self.logger.info(f"Contexto de práctica: {len(selected)} de {len(chunks)} fragmentos "
+                         f"de código ({used} tokens)")
+        return [[chunks[i] for i in sorted(selected)]]
+
+    def _get_chunk_vectors(self, file_docs: list[Document],
+                           chunks: list[Document]) -> list[list[float]]:
+        """Vectors of the chunks of one file, embedded only the first time its content is seen."""
+        content = "".join(doc.page_content for doc in file_docs)
+        key = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        with self._chunk_vectors_lock:
+            vectors = self._chunk_vectors.get(key)
+            if vectors is not None:
+                self._chunk_vectors.move_to_end(key)
+                return vectors
+
+        embeddings = self.database_manager.embedding_model
+        vectors = embeddings.embed_documents([chunk.page_content for chunk in chunks])
+        with self._chunk_vectors_lock:
+            self._chunk_vectors[key] = vectors
+            if len(self._chunk_vectors) > self.CHUNK_VECTOR_CACHE_FILES:
+                self._chunk_vectors.popitem(last=False)
+        return vectors
+
+    @staticmethod
+    def _cosine(a: list[float], b: list[float]) -> float:
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return sum(x * y for x, y in zip(a, b)) / norm if norm else 0.0
@@ -0,0 +1,147 @@
+from langchain.docstore.document import Document
+from tools.token_counter import TokenCounter
+from typing import List, Tuple
+
+
+class ContextPacker():
+    """
+    Builds the context block of the answering prompt from the retrieved chunks.
+
+    The output is deterministic for identical retrievals, so the prompt prefix is
+    byte-stable and can be reused by provider-side prompt caching.
+
+    Steps:
+    - Orders the chunks by score (lower distance first), ties keep retrieval order.
+    - Removes duplicated chunks and merges overlapping neighbor chunks of the same source.
+    - Adds blocks until the token budget of the target model is reached.
+    """
+
+    # Context window (tokens) by model name prefix. The longest matching prefix wins.
+    CONTEXT_WINDOWS = {
+        "gpt-4o-mini": 128000,
+        "gpt-4o": 128000,
+        "gpt-4.1": 1047576,
+        "gpt-4-turbo": 128000,
+        "gpt-4": 8192,
+        "gpt-3.5-turbo": 16385,
+        "deepseek-ai/DeepSeek-V3": 128000,
+        "meta-llama/Llama-3.3-70B": 131072,
+        "mistralai/Mistral-Small-24B": 32768,
+        "google/gemma-2-9b": 8192,
+    }
+    DEFAULT_CONTEXT_WINDOW = 8192
+    SEPARATOR = "\n\n"
+
+    def __init__(self,
+                 model_name: str,
+                 model_type: str = "openai",
+                 answer_max_tokens: int = 1024,
+                 max_context_tokens: int = None,
+                 min_overlap: int = 50):
+        """
+        :param model_name: Name of the answering model, used to select tokenizer and context window.
+        :param model_type: Provider of the model ('openai', 'huggingface', 'together').
+        :param answer_max_tokens: Tokens reserved for the generated answer.
+        :param max_context_tokens: Optional hard cap for the context block.
+        :param min_overlap: Minimum shared characters to merge two neighbor chunks.
+        """
+        self.counter = TokenCounter(model_name=model_name, model_type=model_type)
+        self.context_window = self._get_context_window(model_name)
+        self.answer_max_tokens = answer_max_tokens or 0
+        self.max_context_tokens = max_context_tokens
+        self.min_overlap = min_overlap
+
+    def get_budget(self, reserved_tokens: int = 0) -> int:
+        """
+        Returns the tokens available for the context once the answer and the rest of
+        the prompt (`reserved_tokens`) are discounted.
+        """
+        budget = self.context_window - self.answer_max_tokens - reserved_tokens
+        if self.max_context_tokens:
+            budget = min(budget, self.max_context_tokens)
+        return max(budget, 0)
+
+    def pack(self, context: List[Tuple[Document, float]], reserved_tokens: int = 0) -> str:
+        """
+        Packs the retrieved chunks into a single text that never exceeds the budget.
+
+        :param context: List of tuples (Document, score) as returned by the database managers.
+        :param reserved_tokens: Tokens already used by the prompt without context.
+        :return: Context text, empty if there is nothing to pack.
+        """
+        budget = self.get_budget(reserved_tokens)
+        blocks = self._merge_blocks(self._order(context))
+
+        packed = []
+        used = 0
+        separator_tokens = self.counter.count(self.SEPARATOR)
+        for text in blocks:
+            tokens = self.counter.count(text) + (separator_tokens if packed else 0)
+            if used + tokens > budget:
+                if not packed and budget > 0:
+                    # The best block alone does not fit: keep its beginning
+                    packed.append(self.counter.truncate(text, budget))
+                break
+            packed.append(text)
+            used += tokens
+
+        return self.SEPARATOR.join(packed)
+
+    def _get_context_window(self, model_name: str) -> int:
+        model_name = model_name or ""
+        matches = [prefix for prefix in self.CONTEXT_WINDOWS if model_name.startswith(prefix)]
+        if not matches:
+            return self.DEFAULT_CONTEXT_WINDOW
+        return self.CONTEXT_WINDOWS[max(matches, key=len)]
+
+    def _order(self, context: List[Tuple[Document, float]]) -> List[Tuple[str, str]]:
+        """Returns (source, text) sorted by score. `sorted` is stable, ties keep retrieval order."""
+        ranked = sorted(enumerate(context), key=lambda item: (item[1][1], item[0]))
+        ordered = []
+        for _, (doc, _) in ranked:
+            text = doc.page_content.strip() if doc.page_content else ""
+            if text:
+                source = doc.metadata.get("title", doc.metadata.get("source", ""))
+                ordered.append((source, text))
+        return ordered
+
+    def _merge_blocks(self, ordered: List[Tuple[str, str]]) -> List[str]:
+        """
+        Removes duplicates and merges chunks of the same source whose texts overlap
+        (the splitter produces chunks with overlap). The merged block keeps the
+        position of its best ranked chunk.
+        """
+        blocks = []
+        for source, text in ordered:
+            merged = False
+            for block in blocks:
+                if block[0] != source:
+                    continue
+                if text in block[1]:
+                    merged = True
+                elif block[1] in text:
+                    block[1] = text
+                    merged = True
+                else:
+                    joined = (self._join_overlapping(block[1], text)
+                              or self._join_overlapping(text, block[1]))
+                    if joined:
+                        block[1] = joined
+                        merged = True
+                if merged:
+                    break
+            if not merged:
+                blocks.append([source, text])
+        return [text for _, text in blocks]
+
+    def _join_overlapping(self, first: str, second: str) -> str:
+        """Joins `first` + `second` if a suffix of `first` is a prefix of `second`."""
+        if len(first) < self.min_overlap or len(second) < self.min_overlap:
+            return None
+        head = second[:self.min_overlap]
+        pos = first.find(head)
+        while pos != -1:
+            if second.startswith(first[pos:]):
+                return first[:pos] + second
+            pos = first.find(head, pos + 1)
+        return None
@@ -1,6 +1,7 @@
 from langchain.prompts import PromptTemplate
 from typing import Union, List, Tuple
 from langchain.docstore.document import Document
+from services.answer_services.context_packer import ContextPacker
 import json
 
 
@@ -85,24 +86,22 @@ class UtilsPrompts():
     @staticmethod
     def get_answering_prompt_from_question_and_context(
         question: str,
-        context: List[Tuple[Document, float]]
+        context: List[Tuple[Document, float]],
+        packer: ContextPacker = None
     ) -> str:
         """
         Crea un prompt para responder a una pregunta académica usando un contexto proporcionado.
 
         :param question: Pregunta del usuario (str).
         :param context: Lista de tuplas (Document, score), donde Document tiene .page_content.
+        :param packer: ContextPacker opcional. Si se indica, el contexto se ordena por score, se
+                       fusionan los fragmentos solapados y se recorta al presupuesto de tokens
+                       del modelo.
         :return: Prompt en formato string para enviar al modelo.
         """
         if not question.strip():
             raise ValueError("La pregunta no puede estar vacía.")
 
-        if not context:
-            context_text = "No se proporcionó contexto documental."
-        else:
-            # Extraer el contenido de cada documento, eliminar duplicados y juntar el texto
-            context_text = "\n\n".join(set(doc.page_content.strip() for doc, _ in context if doc.page_content))
-
         prompt_template = """
             Eres un asistente académico experto. Se te hará una pregunta, y tienes a tu disposición un conjunto de fragmentos de documentos como contexto.
 
@@ -128,6 +127,19 @@ class UtilsPrompts():
             Respuesta:
             """.strip()
 
+        context_text = ""
+        if context and packer is not None:
+            base_prompt = prompt_template.format(question=question.strip(), context="")
+            context_text = packer.pack(context, reserved_tokens=packer.counter.count(base_prompt))
+        elif context:
+            # Extraer el contenido de cada documento, eliminar duplicados conservando el orden
+            # y juntar el texto
+            contents = (doc.page_content.strip() for doc, _ in context if doc.page_content)
+            context_text = "\n\n".join(dict.fromkeys(contents))
+
+        if not context_text:
+            context_text = "No se proporcionó contexto documental."
+
         return prompt_template.format(question=question.strip(), context=context_text.strip())
 
 
@@ -198,6 +210,55 @@ class UtilsPrompts():
 
         return template.strip()
 
+    @staticmethod
+    def get_relevant_folders_prompt_from_query_and_summaries(query: str, summaries: dict) -> str:
+        """
+        Crea un prompt para seleccionar las carpetas de la práctica en las que buscar los archivos
+        relevantes para una consulta del usuario.
+
+        :param query: Pregunta o consulta del usuario.
+        :param summaries: Diccionario {ruta de la carpeta: resumen} con las carpetas entre las
+                          que elegir.
+        :return: Cadena con el prompt completo listo para enviar al modelo.
+        """
+        from textwrap import indent
+
+        summaries_text = ""
+        for full_path, resumen in summaries.items():
+            summaries_text += f"\nCarpeta: {full_path}\n{indent(resumen.strip(), '    ')}\n"
+
+        template = f"""
+        Eres un asistente académico encargado de identificar en qué carpetas de una práctica se
+        encuentra la información necesaria para responder a una consulta realizada por un
+        estudiante.
+
+        Tienes a tu disposición un conjunto de carpetas con el resumen de su contenido. Cada carpeta
+        tiene una **ruta completa** con el formato "carpeta/subcarpeta/...".
+
+        Tu tarea consiste en devolver una lista que contenga únicamente las rutas completas de las
+        carpetas que puedan contener archivos útiles y pertinentes para la consulta.
+
+        Reglas:
+        - No asumas ni inventes contenido que no esté explícitamente en los resúmenes.
+        - Si consideras que ninguna carpeta es útil para la consulta, devuelve una lista vacía.
+        - No justifiques tu respuesta, solo devuelve la lista.
+
+        Formato de salida esperado:
+
+        ["carpeta1", "carpeta2/subcarpeta", ...]
+
+
+        Consulta del usuario:
+        \"\"\"
+        {query.strip()}
+        \"\"\"
+
+        Resúmenes disponibles:
+        {summaries_text.strip()}
+        """
+
+        return template.strip()
+
     @staticmethod
     def get_answering_prompt_pratise(query: str, context: List[List[Document]]) -> str:
         """
@@ -218,6 +279,10 @@ class UtilsPrompts():
         for idx, doc in enumerate(flattened_docs, 1):
             content = doc.page_content.strip()
             metadata = doc.metadata.get("source", f"Documento_{idx}")
+            if "name" in doc.metadata:
+                # Fragmento de código (PythonCodeSplitter)
+                metadata += (f" ({doc.metadata['chunk_type']} {doc.metadata['name']}, "
+                             f"líneas {doc.metadata['start_line']}-{doc.metadata['end_line']})")
             context_text += f"\nFuente: {metadata}\n{indent(content, '    ')}\n"
 
         # Plantilla del prompt
@@ -0,0 +1,181 @@
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from infrastructure.Splitters.chunk_store import ChunkStore
+from typing import Callable, Iterable, Iterator, Sequence
+import contextlib
+import threading
+import logging
+import queue
+import time
+
+_END = object()
+
+
+class IngestionPipeline():
+    """
+    Streaming load -> split -> embed pipeline with bounded memory.
+
+    Every stage runs in its own thread and hands its output to the next one through a
+    bounded queue, so loading the next file, splitting and embedding overlap, and at
+    most `queue_size` items wait between two stages. `run()` yields the embedded batches
+    `(chunks, vectors)` to the caller, which inserts them in the index (last stage).
+
+    Peak memory therefore depends on `batch_size` and `queue_size`, not on the size of
+    the corpus. Between the split and embed stages a batch is a list of index ranges over
+    the split documents; when `split` returns a `ChunkStore`, chunk texts are copied only
+    to be embedded, and their `Document`s only once they are embedded, for insertion.
+    If any stage fails, the others are stopped and the error is raised from `run()`.
+    """
+
+    def __init__(self,
+                 documents: Iterable[list[Document]],
+                 split: Callable[[list[Document], int], Sequence[Document]],
+                 embeddings: Embeddings,
+                 batch_size: int = 256,
+                 queue_size: int = 4):
+        """
+        :param documents: Iterable of documents, each one the list of its pages
+                          (e.g. `iter_documents()`).
+        :param split: Function `(pages, num_doc) -> chunks` that splits and preprocesses a document
+                      (a list of chunks or a `ChunkStore`).
+        :param embeddings: Embedding function of the chunks.
+        :param batch_size: Number of chunks embedded and inserted together.
+        :param queue_size: Maximum number of items waiting between two stages.
+        """
+        self.documents = documents
+        self.split = split
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.logger = logging.getLogger(__name__)
+
+        self._stop = threading.Event()
+        self._errors = []
+        self._busy = {"load": 0.0, "split": 0.0, "embed": 0.0}
+
+    def run(self) -> Iterator[tuple[list[Document], list[list[float]]]]:
+        """Starts the stages and yields the embedded batches in document order."""
+        documents_queue = queue.Queue(maxsize=self.queue_size)
+        chunks_queue = queue.Queue(maxsize=self.queue_size)
+        vectors_queue = queue.Queue(maxsize=self.queue_size)
+
+        start_time = time.perf_counter()
+        total_chunks = 0
+        # Keeps a process pool alive for the whole run when the embeddings support it
+        opener = (self.embeddings if hasattr(self.embeddings, "__enter__")
+                  else contextlib.nullcontext())
+        with opener:
+            stage_args = [
+                ("load", self._load, None, documents_queue),
+                ("split", self._split, documents_queue, chunks_queue),
+                ("embed", self._embed, chunks_queue, vectors_queue),
+            ]
+            stages = [threading.Thread(target=self._stage, args=args, daemon=True)
+                      for args in stage_args]
+            for stage in stages:
+                stage.start()
+
+            try:
+                while True:
+                    item = vectors_queue.get()
+                    if item is _END:
+                        break
+                    total_chunks += len(item[0])
+                    yield item
+            finally:
+                self._stop.set()
+                for stage in stages:
+                    stage.join()
+
+        if self._errors:
+            raise self._errors[0]
+
+        elapsed = time.perf_counter() - start_time
+        self.logger.info(
+            f"Ingesta en streaming: {total_chunks} fragmentos en {elapsed:.2f} s "
+            f"(carga {self._busy['load']:.2f} s, división {self._busy['split']:.2f} s, "
+            f"embeddings {self._busy['embed']:.2f} s)")
+
+    def _stage(self,
+               name: str,
+               work: Callable,
+               input_queue: queue.Queue,
+               output_queue: queue.Queue) -> None:
+        """Runs a stage and always closes its output, so the next stage ends too."""
+        try:
+            work(name, input_queue, lambda item: self._put(output_queue, item))
+        except Exception as e:
+            self.logger.error(f"Error en la etapa '{name}' de la ingesta: {e}", exc_info=True)
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            self._put(output_queue, _END, force=True)
+
+    def _load(self, name: str, input_queue: queue.Queue, emit: Callable) -> None:
+        iterator = iter(self.documents)
+        num_doc = 0
+        while not self._stop.is_set():
+            start_time = time.perf_counter()
+            pages = next(iterator, _END)
+            self._busy[name] += time.perf_counter() - start_time
+            if pages is _END:
+                return
+            emit((num_doc, pages))
+            num_doc += 1
+
+    def _split(self, name: str, input_queue: queue.Queue, emit: Callable) -> None:
+        # A batch is a list of (chunks, start, stop) ranges adding up to `batch_size` chunks
+        batch = []
+        size = 0
+        while True:
+            item = input_queue.get()
+            if item is _END:
+                break
+            if self._stop.is_set():
+                continue
+            num_doc, pages = item
+            start_time = time.perf_counter()
+            chunks = self.split(pages, num_doc)
+            self._busy[name] += time.perf_counter() - start_time
+
+            start = 0
+            while start < len(chunks):
+                stop = min(len(chunks), start + self.batch_size - size)
+                batch.append((chunks, start, stop))
+                size += stop - start
+                start = stop
+                if size == self.batch_size:
+                    emit(batch)
+                    batch = []
+                    size = 0
+        if batch and not self._stop.is_set():
+            emit(batch)
+
+    def _embed(self, name: str, input_queue: queue.Queue, emit: Callable) -> None:
+        while True:
+            batch = input_queue.get()
+            if batch is _END:
+                return
+            start_time = time.perf_counter()
+            indexes = [(chunks, i) for chunks, start, stop in batch for i in range(start, stop)]
+            texts = [self._get_text(chunks, i) for chunks, i in indexes]
+            vectors = self.embeddings.embed_documents(texts)
+            self._busy[name] += time.perf_counter() - start_time
+            emit(([chunks[i] for chunks, i in indexes], vectors))
+
+    def _get_text(self, chunks: Sequence[Document], index: int) -> str:
+        if isinstance(chunks, ChunkStore):
+            return chunks.text(index)
+        return chunks[index].page_content
+
+    def _put(self, output_queue: queue.Queue, item, force: bool = False) -> None:
+        """Blocks while the queue is full, giving up if the pipeline is stopped (unless forced)."""
+        while force or not self._stop.is_set():
+            try:
+                output_queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if force and self._stop.is_set():
+                    # Nobody is reading anymore: drop one item to make room for the end mark
+                    with contextlib.suppress(queue.Empty):
+                        output_queue.get_nowait()
@@ -3,6 +3,7 @@ from infrastructure.documentLoaders.universal_documents_loader import Universal_
 from infrastructure.databaseManagers.practise_database_manager import PractiseDatabaseManager
 from services.update_services.utils_practise import UtilsPractise
 from tools.LLM_tool import LLMTool
+from factories.EmbeddingFactory import EmbeddingFactory
 import logging
 
 
@@ -17,8 +18,31 @@ class PractiseUpdateService():
                  summary_temperature:float,
                  summary_max_tokens:int,
                  summary_top_k:float,
+                 summary_concurrency:int = 1,
+                 summary_rpm:int = None,
+                 summary_tpm:int = None,
+                 summary_cache_path:str = None,
+                 practise_routing:str = "flat",
+                 embedding_model_name:str = None,
+                 embedding_backend:str = "torch",
+                 embedding_server_url:str = None,
                  DL_recursive_mode:bool = True,
-                 DL_extract_images:bool = True):
+                 DL_extract_images:bool = True,
+                 DL_workers:int = 1,
+                 DL_file_timeout:float = None,
+                 DL_cache_path:str = None,
+                 DL_pdf_backend:str = "pypdf",
+                 DL_ocr_policy:str = "all",
+                 DL_ocr_min_chars:int = 100,
+                 DL_ocr_min_image_pixels:int = 250000,
+                 DL_ocr_workers:int = 2,
+                 DL_ocr_cache_path:str = None,
+                 DL_url_workers:int = 4,
+                 DL_url_timeout:float = 15,
+                 DL_url_max_per_host:int = 4,
+                 DL_url_cache_path:str = None,
+                 DL_pdf_shard_pages:int = None,
+                 ):
 
         ##La base de datos ahora va a ser un json
 
@@ -35,6 +59,20 @@ class PractiseUpdateService():
         self.CONTEXT_PATH = context_path
         self.DL_RECURSIVE_MODE = DL_recursive_mode
         self.DL_EXTRACT_IMAGES = DL_extract_images
+        self.DL_WORKERS = DL_workers
+        self.DL_FILE_TIMEOUT = DL_file_timeout
+        self.DL_CACHE_PATH = DL_cache_path
+        self.DL_PDF_BACKEND = DL_pdf_backend
+        self.DL_OCR_POLICY = DL_ocr_policy
+        self.DL_OCR_MIN_CHARS = DL_ocr_min_chars
+        self.DL_OCR_MIN_IMAGE_PIXELS = DL_ocr_min_image_pixels
+        self.DL_OCR_WORKERS = DL_ocr_workers
+        self.DL_OCR_CACHE_PATH = DL_ocr_cache_path
+        self.DL_URL_WORKERS = DL_url_workers
+        self.DL_URL_TIMEOUT = DL_url_timeout
+        self.DL_URL_MAX_PER_HOST = DL_url_max_per_host
+        self.DL_URL_CACHE_PATH = DL_url_cache_path
+        self.DL_PDF_SHARD_PAGES = DL_pdf_shard_pages
         self.utils = UtilsPractise()
         self.LLM = LLMTool(
                     model_type=summary_model_type,
@@ -43,7 +81,18 @@ class PractiseUpdateService():
                     temperature=summary_temperature,
                     top_p=summary_top_k,
                     max_tokens=summary_max_tokens)
-        self.db_manager = PractiseDatabaseManager(work_directory=database_path, LLM=self.LLM)
+        self.db_manager = PractiseDatabaseManager(
+            work_directory=database_path,
+            LLM=self.LLM,
+            concurrency=summary_concurrency,
+            requests_per_minute=summary_rpm,
+            tokens_per_minute=summary_tpm,
+            cache_path=summary_cache_path,
+            embeddings=self._get_embeddings(embedding_model_name,
+                                            embedding_backend,
+                                            embedding_server_url),
+            embedding_model_name=embedding_model_name,
+            folder_summaries=practise_routing == "hierarchical")
 
         self.logger = logging.getLogger(__name__)
 
@@ -59,22 +108,76 @@ class PractiseUpdateService():
             - Merges document pages into a format suitable for LLM consumption.
             - Builds a JSON representation of the folder tree structure.
             - Creates a practical database using the processed documents and the folder tree,
-            saving it under 'practica/summary_tree.json'.
+            saving it under 'practica/summary_tree.json'. The summaries are requested
+            concurrently (`summary_concurrency`) within `summary_rpm` / `summary_tpm`; with
+            `summary_cache_path` only new or modified files are summarized again.
+            - Embeds the summaries into 'practica/summary_index.npz' for the file preselection of
+            `practical_answer` (also built alone if only the index is missing or outdated).
+            - With `practise_routing="hierarchical"`, summarizes every folder from the summaries of
+            its content into 'practica/folder_summaries.json' (also built alone if it is missing).
+            - Nothing is regenerated if no file is new, changed or removed since the last update.
         """
         try:
             documentLoader = Universal_documents_loader(
                 path=self.CONTEXT_PATH,
                 recursive_mode=True,
-                process_images=self.DL_EXTRACT_IMAGES
+                process_images=self.DL_EXTRACT_IMAGES,
+                workers=self.DL_WORKERS,
+                file_timeout=self.DL_FILE_TIMEOUT,
+                cache_directory=self.DL_CACHE_PATH,
+                pdf_backend=self.DL_PDF_BACKEND,
+                ocr_policy=self.DL_OCR_POLICY,
+                ocr_min_chars=self.DL_OCR_MIN_CHARS,
+                ocr_min_image_pixels=self.DL_OCR_MIN_IMAGE_PIXELS,
+                ocr_workers=self.DL_OCR_WORKERS,
+                ocr_cache_path=self.DL_OCR_CACHE_PATH,
+                url_workers=self.DL_URL_WORKERS,
+                url_timeout=self.DL_URL_TIMEOUT,
+                url_max_per_host=self.DL_URL_MAX_PER_HOST,
+                url_cache_directory=self.DL_URL_CACHE_PATH,
+                pdf_shard_pages=self.DL_PDF_SHARD_PAGES,
+                manifest_path=str(Path(self.DATABASE_PATH) / "manifests" / "practica.json"),
             )
 
+            name = Path("practica") / Path("summary_tree.json")
+            changes = documentLoader.scan_changes(settings={
+                "summary_model": self.LLM.model_name,
+                "summary_prompt_version": self.utils.SUMMARY_PROMPT_VERSION,
+                "extract_images": self.DL_EXTRACT_IMAGES,
+                "pdf_backend": self.DL_PDF_BACKEND})
+            tree_path = Path(self.DATABASE_PATH) / name
+            if not changes.has_changes() and tree_path.exists():
+                self.logger.info(f"Sin cambios en {self.CONTEXT_PATH}: "
+                                 "se conservan los resúmenes de práctica")
+                manager = self.db_manager
+                if manager.embeddings is not None and not manager.index_is_current(tree_path):
+                    manager.create_index(tree=manager.get_context(tree_path), tree_path=tree_path)
+                if manager.folder_summaries and manager.get_folder_summaries(tree_path) is None:
+                    manager.create_folder_summaries(tree=manager.get_context(tree_path),
+                                                    tree_path=tree_path)
+                return
+
             docs = documentLoader.load_documents()
             docs4LLM = self.utils.merged_pages(docs)
-            tree = self.utils.build_tree_json(self.CONTEXT_PATH)
-            name = Path("practica") / Path("summary_tree.json")
+            tree = self.utils.build_tree_json(self.CONTEXT_PATH,
+                                              allowed_formats=documentLoader.allowed_formats)
 
             self.db_manager.create(docs4LLM, database_name=name, tree=tree)
+            documentLoader.save_manifest()
 
         except Exception as e:
             self.logger.error(f"Error al construir y almacenar la base de datos de práctica: {e}", exc_info=True)
             raise
+
+
+    def _get_embeddings(self,
+                        embedding_model_name: str,
+                        embedding_backend: str,
+                        embedding_server_url: str):
+        """Shared embedding model of the summary index, None if no model is configured."""
+        if not embedding_model_name:
+            return None
+        return EmbeddingFactory.get_embeddings(model_name=embedding_model_name,
+                                               model_kwargs={'trust_remote_code': 'True'},
+                                               backend=embedding_backend,
+                                               server_url=embedding_server_url)
@@ -1,8 +1,14 @@
 from pathlib import Path
 from infrastructure.documentLoaders.universal_documents_loader import Universal_documents_loader
-from infrastructure.Splitters.text_splitter import TextSplitter
+from interfaces.splitter import Splitter
+from infrastructure.Splitters.token_splitter import TokenSplitter
+from infrastructure.Splitters.semantic_splitter import SemanticSplitter
+from factories.SplitterFactory import SplitterFactory
 from infrastructure.databaseManagers.chroma_database_manager import Chroma_database_manager
 from infrastructure.databaseManagers.faiss_database_manager import Faiss_database_manager
+from services.update_services.ingestion_pipeline import IngestionPipeline
+from collections import Counter
+import shutil
 import logging
 
 class RegularUpdateService():
@@ -14,7 +20,32 @@ class RegularUpdateService():
                  embedding_model_name: str,
                  DL_recursive_mode:bool = False,
                  DL_extract_images:bool = True,
-                 database_type:str = "faiss"
+                 DL_workers:int = 1,
+                 DL_file_timeout:float = None,
+                 DL_cache_path:str = None,
+                 DL_pdf_backend:str = "pypdf",
+                 DL_ocr_policy:str = "all",
+                 DL_ocr_min_chars:int = 100,
+                 DL_ocr_min_image_pixels:int = 250000,
+                 DL_ocr_workers:int = 2,
+                 DL_ocr_cache_path:str = None,
+                 DL_url_workers:int = 4,
+                 DL_url_timeout:float = 15,
+                 DL_url_max_per_host:int = 4,
+                 DL_url_cache_path:str = None,
+                 DL_pdf_shard_pages:int = None,
+                 database_type:str = "faiss",
+                 embedding_backend:str = "torch",
+                 embedding_workers:int = 1,
+                 embedding_batch_tokens:int = None,
+                 embedding_server_url:str = None,
+                 ingestion_streaming:bool = False,
+                 splitter_type:str = "text",
+                 splitter_chunk_tokens:int = None,
+                 splitter_overlap_tokens:int = 32,
+                 splitter_breakpoint_percentile:float = 95,
+                 splitter_pool_embeddings:bool = True,
+                 splitter_truncation_report:bool = False
                  ):
 
 
@@ -32,14 +63,49 @@ class RegularUpdateService():
         self.EMBEDDING_MODEL = embedding_model_name
         self.DL_RECURSIVE_MODE = DL_recursive_mode
         self.DL_EXTRACT_IMAGES = DL_extract_images
+        self.DL_WORKERS = DL_workers
+        self.DL_FILE_TIMEOUT = DL_file_timeout
+        self.DL_CACHE_PATH = DL_cache_path
+        self.DL_PDF_BACKEND = DL_pdf_backend
+        self.DL_OCR_POLICY = DL_ocr_policy
+        self.DL_OCR_MIN_CHARS = DL_ocr_min_chars
+        self.DL_OCR_MIN_IMAGE_PIXELS = DL_ocr_min_image_pixels
+        self.DL_OCR_WORKERS = DL_ocr_workers
+        self.DL_OCR_CACHE_PATH = DL_ocr_cache_path
+        self.DL_URL_WORKERS = DL_url_workers
+        self.DL_URL_TIMEOUT = DL_url_timeout
+        self.DL_URL_MAX_PER_HOST = DL_url_max_per_host
+        self.DL_URL_CACHE_PATH = DL_url_cache_path
+        self.DL_PDF_SHARD_PAGES = DL_pdf_shard_pages
         self.DATABASE_NAME = database_name
+        self.INGESTION_STREAMING = ingestion_streaming
+        self.DATABASE_TYPE = database_type
+        self.EMBEDDING_BACKEND = embedding_backend
+        self.SPLITTER_TYPE = splitter_type
+        self.SPLITTER_CHUNK_TOKENS = splitter_chunk_tokens
+        self.SPLITTER_OVERLAP_TOKENS = splitter_overlap_tokens
+        self.SPLITTER_BREAKPOINT_PERCENTILE = splitter_breakpoint_percentile
+        self.SPLITTER_POOL_EMBEDDINGS = splitter_pool_embeddings
+        self.SPLITTER_TRUNCATION_REPORT = splitter_truncation_report
 
         if (database_type == "faiss"):
-            self.database_manager = Faiss_database_manager(model_name=self.EMBEDDING_MODEL,
-                                                            work_directory=self.DATABASE_PATH)
+            self.database_manager = Faiss_database_manager(
+                model_name=self.EMBEDDING_MODEL,
+                work_directory=self.DATABASE_PATH,
+                embedding_backend=embedding_backend,
+                embedding_workers=embedding_workers,
+                embedding_batch_tokens=embedding_batch_tokens,
+                embedding_server_url=embedding_server_url
+            )
         elif (database_type == "chroma"):
-            self.database_manager = Chroma_database_manager(model_name=self.EMBEDDING_MODEL,
-                                                            work_directory=self.DATABASE_PATH)
+            self.database_manager = Chroma_database_manager(
+                model_name=self.EMBEDDING_MODEL,
+                work_directory=self.DATABASE_PATH,
+                embedding_backend=embedding_backend,
+                embedding_workers=embedding_workers,
+                embedding_batch_tokens=embedding_batch_tokens,
+                embedding_server_url=embedding_server_url
+            )
         else:
             raise ValueError ("Database selected is not implemented")
 
@@ -54,30 +120,159 @@ class RegularUpdateService():
         Description:
             - Initializes a document loader with configured settings such as recursive loading and image processing.
             - Loads all documents from the context path.
-            - Splits each document into smaller text chunks using a text splitter.
+            - Splits each document into smaller text chunks using the configured splitter
+              ("text": 1500 characters; "token": tokens of the embedding model, sized to its
+              sequence limit so no chunk is truncated when embedded; "semantic": boundaries where
+              the topic changes, reusing the sentence embeddings as chunk embeddings).
             - Stores the resulting chunks into a database using the database manager.
 
         Notes:
             - The documents are prepared for efficient retrieval and question-answering tasks.
-            - The database is created or overwritten with the specified name.
+            - The database is created or overwritten with the specified name, but only if some
+              content file is new, changed or removed since the last update (or the settings of
+              the database changed); otherwise the existing database is kept.
+            - With `ingestion_streaming` the documents flow through loading, splitting, embedding
+              and indexing in bounded batches, with the stages running concurrently, instead of
+              being held in memory all at once.
         """
         try:
             documentLoader = Universal_documents_loader(
                 path=self.CONTEXT_PATH,
                 recursive_mode=self.DL_RECURSIVE_MODE,
-                process_images=self.DL_EXTRACT_IMAGES
+                process_images=self.DL_EXTRACT_IMAGES,
+                workers=self.DL_WORKERS,
+                file_timeout=self.DL_FILE_TIMEOUT,
+                cache_directory=self.DL_CACHE_PATH,
+                pdf_backend=self.DL_PDF_BACKEND,
+                ocr_policy=self.DL_OCR_POLICY,
+                ocr_min_chars=self.DL_OCR_MIN_CHARS,
+                ocr_min_image_pixels=self.DL_OCR_MIN_IMAGE_PIXELS,
+                ocr_workers=self.DL_OCR_WORKERS,
+                ocr_cache_path=self.DL_OCR_CACHE_PATH,
+                url_workers=self.DL_URL_WORKERS,
+                url_timeout=self.DL_URL_TIMEOUT,
+                url_max_per_host=self.DL_URL_MAX_PER_HOST,
+                url_cache_directory=self.DL_URL_CACHE_PATH,
+                pdf_shard_pages=self.DL_PDF_SHARD_PAGES,
+                manifest_path=self._get_manifest_path(),
+            )
+
+            changes = documentLoader.scan_changes(settings=self._get_update_settings())
+            database_path = Path(self.DATABASE_PATH) / self.DATABASE_NAME
+            database_exists = database_path.exists() and any(database_path.iterdir())
+            if not changes.has_changes() and database_exists:
+                self.logger.info(f"Sin cambios en {self.CONTEXT_PATH}: "
+                                 f"se conserva la base de datos {self.DATABASE_NAME}")
+                return
+            self._clear_database(database_path)
+
+            text_splitter = SplitterFactory.create_splitter(
+                splitter_type=self.SPLITTER_TYPE,
+                embedding_model_name=self.EMBEDDING_MODEL,
+                embeddings=self.database_manager.embedding_model,
+                chunk_tokens=self.SPLITTER_CHUNK_TOKENS,
+                chunk_overlap_tokens=self.SPLITTER_OVERLAP_TOKENS,
+                breakpoint_percentile=self.SPLITTER_BREAKPOINT_PERCENTILE,
+                pool_embeddings=self.SPLITTER_POOL_EMBEDDINGS
             )
+            # The semantic splitter already has the (pooled) embedding of every chunk
+            precomputed_vectors = None
+            if isinstance(text_splitter, SemanticSplitter) and self.SPLITTER_POOL_EMBEDDINGS:
+                precomputed_vectors = text_splitter.chunk_vectors
+
+            if self.INGESTION_STREAMING:
+                self._launch_streaming(documentLoader, text_splitter, precomputed_vectors)
+                documentLoader.save_manifest()
+                return
 
             docs = documentLoader.load_documents()
 
-            text_splitter = TextSplitter()
             chunks_docs = []
 
             for doc in docs:
-                chunks_docs.append(text_splitter.split(doc))
+                chunks_docs.append(text_splitter.split_compact(doc))
 
-            self.database_manager.create(documents=chunks_docs, database_name=self.DATABASE_NAME)
+            if self._reports_truncation(text_splitter):
+                pages = [page for doc in docs for page in doc]
+                self._log_truncation_report(text_splitter, text_splitter.truncation_report(pages))
+
+            self.database_manager.create(documents=chunks_docs, database_name=self.DATABASE_NAME,
+                                         precomputed_vectors=precomputed_vectors)
+            documentLoader.save_manifest()
 
         except Exception as e:
             self.logger.error(f"Error al preparar y almacenar los documentos: {e}", exc_info=True)
             raise
+
+
+
+    def _launch_streaming(self, documentLoader: Universal_documents_loader, text_splitter: Splitter,
+                          precomputed_vectors: dict = None):
+        """Runs the load -> split -> embed -> index pipeline over the context path."""
+        report = Counter()
+        reports_truncation = self._reports_truncation(text_splitter)
+
+        def split(pages, num_doc):
+            if reports_truncation:
+                report.update(text_splitter.truncation_report(pages))
+            chunks = text_splitter.split_compact(pages)
+            return self.database_manager.preprocess_chunks(chunks, num_doc)
+
+        manager = self.database_manager
+        pipeline = IngestionPipeline(
+            documents=documentLoader.iter_documents(),
+            split=split,
+            embeddings=manager.get_ingestion_embeddings(precomputed_vectors=precomputed_vectors),
+        )
+        manager.create_from_embedded_batches(batches=pipeline.run(),
+                                             database_name=self.DATABASE_NAME)
+
+        if reports_truncation:
+            self._log_truncation_report(text_splitter, report)
+
+
+    def _reports_truncation(self, text_splitter: Splitter) -> bool:
+        """
+        The truncation report re-splits and tokenizes every page with the character splitter,
+        so it only runs when `splitter_truncation_report` asks for it.
+        """
+        return self.SPLITTER_TRUNCATION_REPORT and isinstance(text_splitter, TokenSplitter)
+
+    def _log_truncation_report(self, token_splitter: TokenSplitter, report: dict) -> None:
+        """Logs how many chunks the previous character splitter would have lost to truncation."""
+        if report["chunks"]:
+            self.logger.info(
+                f"Con el splitter de caracteres (1500/500) se truncarían "
+                f"{report['truncated_chunks']} de {report['chunks']} chunks "
+                f"({report['discarded_tokens']} de {report['tokens']} tokens descartados, "
+                f"límite {token_splitter.max_seq_length}); chunks actuales de "
+                f"{token_splitter.chunk_tokens} tokens")
+
+
+    def _get_manifest_path(self) -> str:
+        return str(Path(self.DATABASE_PATH) / "manifests" / f"{self.DATABASE_NAME.strip('/')}.json")
+
+    def _get_update_settings(self) -> dict:
+        """Settings that change the database contents: if any differs, everything is rebuilt."""
+        return {
+            "embedding_model": self.EMBEDDING_MODEL,
+            "embedding_backend": self.EMBEDDING_BACKEND,
+            "database_type": self.DATABASE_TYPE,
+            "extract_images": self.DL_EXTRACT_IMAGES,
+            "pdf_backend": self.DL_PDF_BACKEND,
+            "ocr_policy": self.DL_OCR_POLICY,
+            "splitter_type": self.SPLITTER_TYPE,
+            "splitter_chunk_tokens": self.SPLITTER_CHUNK_TOKENS,
+            "splitter_overlap_tokens": self.SPLITTER_OVERLAP_TOKENS,
+            "splitter_breakpoint_percentile": self.SPLITTER_BREAKPOINT_PERCENTILE,
+            "splitter_pool_embeddings": self.SPLITTER_POOL_EMBEDDINGS,
+        }
+
+    def _clear_database(self, database_path: Path) -> None:
+        """Removes the previous contents of the database folder before rebuilding it."""
+        database_path.mkdir(parents=True, exist_ok=True)
+        for item in database_path.iterdir():
+            if item.is_file():
+                item.unlink()
+            elif item.is_dir():
+                shutil.rmtree(item)
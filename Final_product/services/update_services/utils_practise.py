@@ -4,13 +4,20 @@ from langchain.prompts import PromptTemplate
 
 class UtilsPractise:
 
-    def build_tree_json(self, path:str):
+    # Bump when the summary prompt changes, so the cached summaries are regenerated
+    SUMMARY_PROMPT_VERSION = 1
+    # Same for the folder summary prompt
+    FOLDER_SUMMARY_PROMPT_VERSION = 2
+
+    def build_tree_json(self, path:str, allowed_formats:list[str] = None):
         """
         Recursively builds a JSON-like dictionary representing the directory structure
         starting from the given path.
 
         Parameters:
             path (str): The root directory path to scan.
+            allowed_formats (list[str]): If given, files with other extensions are left out of
+                the tree.
 
         Returns:
             dict: A nested dictionary representing the folder and file structure.
@@ -33,12 +40,41 @@ class UtilsPractise:
 
         for entry in entries:
             if entry.is_dir():
-                tree[entry.name] = self.build_tree_json(entry)
-            else:
+                tree[entry.name] = self.build_tree_json(entry, allowed_formats)
+            elif allowed_formats is None or entry.suffix.lower() in allowed_formats:
                 tree[entry.name] = None
         return tree
 
 
+    def flatten_tree(self, tree: dict, path: str = "") -> dict[str, str]:
+        """
+        Flattens the summary tree into {"carpeta/subcarpeta/fichero": resumen}, the same paths
+        used by the file-selection prompt. Files without a summary are left out.
+        """
+        flat = {}
+        for key, value in tree.items():
+            new_path = f"{path}/{key}" if path else key
+            if isinstance(value, dict):
+                flat.update(self.flatten_tree(value, new_path))
+            elif isinstance(value, str):
+                flat[new_path] = value
+        return flat
+
+
+    def get_folders(self, tree: dict, path: str = "") -> dict[str, dict]:
+        """
+        Returns every folder of the summary tree as {"carpeta/subcarpeta": subárbol}, parents
+        before their subfolders. The root of the tree is not included.
+        """
+        folders = {}
+        for key, value in tree.items():
+            if isinstance(value, dict):
+                new_path = f"{path}/{key}" if path else key
+                folders[new_path] = value
+                folders.update(self.get_folders(value, new_path))
+        return folders
+
+
     def get_parts_after_keyword(self, path: str, keyword='practica') -> tuple:
         """this is a split but compatible with all OSs and get left elements from kw"""
         parts = Path(path).parts
@@ -104,6 +140,7 @@ class UtilsPractise:
     def get_summary_prompt_from_document(self, doc: Document) -> str:
         """
         Crea un prompt para pedir un resumen basado en un objeto Document de LangChain.
+        Si se modifica la plantilla, incrementa `SUMMARY_PROMPT_VERSION`.
 
         :param doc: Objeto Document con el contenido a resumir.
         :return: Cadena con el prompt completo listo para enviar al modelo.
@@ -147,6 +184,43 @@ class UtilsPractise:
 
         return template.format(document=doc)
 
+    def get_folder_summary_prompt(self, folder: str, children: dict[str, str]) -> str:
+        """
+        Crea un prompt para resumir una carpeta a partir de los resúmenes de su contenido.
+        Si se modifica la plantilla, incrementa `FOLDER_SUMMARY_PROMPT_VERSION`.
+
+        :param folder: Ruta de la carpeta dentro de la práctica.
+        :param children: Resúmenes de sus ficheros y subcarpetas (las subcarpetas acaban en "/").
+        :return: Cadena con el prompt completo listo para enviar al modelo.
+        """
+        children_text = "\n\n".join(f"{name}:\n{summary.strip()}"
+                                      for name, summary in children.items())
+        template = PromptTemplate(
+            template="""
+            Actúa como un experto en comprensión de materiales docentes. A continuación tienes los
+            resúmenes de los ficheros y subcarpetas de la carpeta "{folder}" de una práctica.
+
+            Escribe un resumen breve de la carpeta (máximo 120 palabras) que permita decidir si
+            contiene información útil para una pregunta de un estudiante:
+            - Temas y conceptos que trata.
+            - Ejercicios, enunciados o soluciones que contiene.
+            - Lenguajes de programación y técnicas que aparecen.
+
+            🔒 No inventes contenido que no aparezca en los resúmenes.
+
+            ---
+
+            📁 Contenido de la carpeta:
+
+            ```
+            {children}
+            ```
+            """,
+            input_variables=["folder", "children"],
+        )
+
+        return template.format(folder=folder, children=children_text)
+
     def get_dummy_promt(self):
         return PromptTemplate(
             template="""
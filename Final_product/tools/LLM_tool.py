@@ -20,6 +20,7 @@ class LLMTool():
         :param max_tokens: Maximum number of tokens to generate.
         :param top_p: Controls nucleus sampling (0-1, lower = more focused responses).
         """
+        self.model_name = model_name
         self.model_type = model_type
         self.temperature = temperature
         self.max_tokens = max_tokens
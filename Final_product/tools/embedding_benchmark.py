@@ -0,0 +1,51 @@
+from langchain_core.embeddings import Embeddings
+import numpy as np
+import time
+
+
+class EmbeddingBenchmark():
+    """
+    Compares an embedding backend against a reference one on the same texts.
+
+    - Parity: cosine similarity between the vectors of both backends for every text.
+    - Throughput: texts per second of each backend (best of several repetitions).
+    """
+
+    def __init__(self, reference: Embeddings, candidate: Embeddings):
+        self.reference = reference
+        self.candidate = candidate
+
+    def parity(self, texts: list[str]) -> dict:
+        """
+        :return: dict with mean and minimum cosine similarity between both backends.
+        """
+        reference = np.asarray(self.reference.embed_documents(texts), dtype=np.float32)
+        candidate = np.asarray(self.candidate.embed_documents(texts), dtype=np.float32)
+        cosine = (reference * candidate).sum(axis=1) / np.clip(
+            np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1), 1e-12, None)
+        return {"mean_cosine": float(cosine.mean()), "min_cosine": float(cosine.min())}
+
+    def throughput(self, texts: list[str], repetitions: int = 3) -> dict:
+        """
+        :return: dict with texts/s of the reference, the candidate and the speedup.
+        """
+        reference = self._texts_per_second(self.reference, texts, repetitions)
+        candidate = self._texts_per_second(self.candidate, texts, repetitions)
+        return {
+            "reference_texts_s": reference,
+            "candidate_texts_s": candidate,
+            "speedup": candidate / reference if reference else 0.0
+        }
+
+    def run(self, texts: list[str], repetitions: int = 3) -> dict:
+        return {**self.parity(texts), **self.throughput(texts, repetitions)}
+
+    def _texts_per_second(self, model: Embeddings, texts: list[str], repetitions: int) -> float:
+        model.embed_documents(texts[:8])  # warm-up
+        best = None
+        for _ in range(repetitions):
+            start_time = time.perf_counter()
+            model.embed_documents(texts)
+            elapsed = time.perf_counter() - start_time
+            best = elapsed if best is None else min(best, elapsed)
+        return len(texts) / best if best else 0.0
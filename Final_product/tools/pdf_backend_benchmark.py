@@ -0,0 +1,88 @@
+from infrastructure.documentLoaders.universal_documents_loader import Universal_documents_loader
+from pathlib import Path
+import difflib
+import time
+
+
+class PdfBackendBenchmark():
+    """
+    Compares the PDF extraction backends of `Universal_documents_loader` on a sample corpus.
+
+    Like `load_documents_with_timer`, every file is extracted and timed, once per backend
+    (best of several repetitions, without the extraction cache). For each backend it reports:
+    - Speed: pages per second and speedup against the reference backend.
+    - Text equality: mean `difflib` similarity of every page with the reference text
+      and percentage of pages with exactly the same text (ignoring whitespace).
+    """
+
+    def __init__(self,
+                 path: str,
+                 backends: list[str] = None,
+                 reference: str = "pypdf",
+                 recursive_mode: bool = False):
+        self.path = path
+        self.backends = backends or Universal_documents_loader.PDF_BACKENDS
+        self.reference = reference
+        self.recursive_mode = recursive_mode
+
+    def run(self, repetitions: int = 3) -> dict:
+        """
+        :return: dict backend -> {"pages", "pages_s", "speedup", "mean_similarity", "equal_pages"}.
+        """
+        reference_pages, reference_time = self._extract(self.reference, repetitions)
+        results = {}
+        for backend in self.backends:
+            if backend == self.reference:
+                pages, elapsed = reference_pages, reference_time
+            else:
+                pages, elapsed = self._extract(backend, repetitions)
+            similarity, equal = self._compare(reference_pages, pages)
+            results[backend] = {
+                "pages": sum(len(doc) for doc in pages),
+                "pages_s": sum(len(doc) for doc in pages) / elapsed if elapsed else 0.0,
+                "speedup": reference_time / elapsed if elapsed else 0.0,
+                "mean_similarity": similarity,
+                "equal_pages": equal,
+            }
+        return results
+
+    def _extract(self, backend: str, repetitions: int) -> tuple[list[list[str]], float]:
+        """Returns the text of every page of every PDF and the best extraction time."""
+        loader = Universal_documents_loader(path=self.path,
+                                            process_images=False,
+                                            recursive_mode=self.recursive_mode,
+                                            pdf_backend=backend)
+        files = sorted(file for file in loader._get_all_files()
+                       if Path(file).suffix.lower() == ".pdf")
+
+        best = None
+        texts = []
+        for _ in range(repetitions):
+            start_time = time.perf_counter()
+            texts = [[page.page_content for page in loader._extract_document_info(file)]
+                     for file in files]
+            elapsed = time.perf_counter() - start_time
+            best = elapsed if best is None else min(best, elapsed)
+        return texts, best or 0.0
+
+    def _compare(self,
+                 reference: list[list[str]],
+                 candidate: list[list[str]]) -> tuple[float, float]:
+        """
+        Mean similarity and fraction of equal pages; missing or extra pages count as
+        different.
+        """
+        similarities = []
+        equal = 0
+        for reference_doc, candidate_doc in zip(reference, candidate):
+            for i in range(max(len(reference_doc), len(candidate_doc))):
+                a = self._normalize(reference_doc[i]) if i < len(reference_doc) else ""
+                b = self._normalize(candidate_doc[i]) if i < len(candidate_doc) else ""
+                equal += a == b
+                similarities.append(difflib.SequenceMatcher(None, a, b).ratio() if a != b else 1.0)
+        if not similarities:
+            return 0.0, 0.0
+        return sum(similarities) / len(similarities), equal / len(similarities)
+
+    def _normalize(self, text: str) -> str:
+        return " ".join(text.split())
@@ -0,0 +1,63 @@
+import threading
+import time
+
+
+class RateLimiter():
+    """
+    Thread-safe token bucket for the request (RPM) and token (TPM) limits of an LLM API.
+
+    Each bucket holds up to one minute of its limit and refills continuously. `acquire`
+    blocks until there is room for one request of the given number of tokens in both
+    buckets and then takes it. A limit set to None is not enforced.
+    """
+
+    def __init__(self, requests_per_minute: int = None, tokens_per_minute: int = None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Waits until a request of `tokens` tokens fits in the limits and takes it.
+
+        :return: Seconds waited.
+        """
+        if tokens and self.tokens_per_minute:
+            # A request larger than the whole bucket would never fit
+            tokens = min(tokens, self.tokens_per_minute)
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                wait = max(self._missing(self._requests, 1, self.requests_per_minute),
+                           self._missing(self._tokens, tokens, self.tokens_per_minute))
+                if wait <= 0:
+                    if self.requests_per_minute:
+                        self._requests -= 1
+                    if self.tokens_per_minute:
+                        self._tokens -= tokens
+                    return waited
+            time.sleep(wait)
+            waited += wait
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            refill = elapsed * self.requests_per_minute / 60
+            self._requests = min(self.requests_per_minute, self._requests + refill)
+        if self.tokens_per_minute:
+            refill = elapsed * self.tokens_per_minute / 60
+            self._tokens = min(self.tokens_per_minute, self._tokens + refill)
+
+    @staticmethod
+    def _missing(available: float, needed: float, per_minute: int) -> float:
+        """Seconds until `needed` units are available in a bucket refilled at `per_minute`."""
+        if not per_minute or available >= needed:
+            return 0.0
+        return (needed - available) * 60 / per_minute
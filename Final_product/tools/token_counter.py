@@ -0,0 +1,57 @@
+import tiktoken
+from transformers import AutoTokenizer
+import logging
+
+
+class TokenCounter():
+    """
+    Counts tokens with the tokenizer of the target model.
+
+    OpenAI models are measured with `tiktoken`. HuggingFace and Together models are
+    measured with the HuggingFace tokenizer of the model; if it cannot be loaded
+    (private repo, provider-only name...) it falls back to `cl100k_base`.
+    """
+
+    DEFAULT_ENCODING = "cl100k_base"
+
+    def __init__(self, model_name: str, model_type: str = "openai"):
+        self.model_name = model_name
+        self.model_type = model_type
+        self.logger = logging.getLogger(__name__)
+
+        self._encoding = None
+        self._hf_tokenizer = None
+
+        if model_type == "openai":
+            try:
+                self._encoding = tiktoken.encoding_for_model(model_name)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding(self.DEFAULT_ENCODING)
+        else:
+            try:
+                self._hf_tokenizer = AutoTokenizer.from_pretrained(model_name)
+            except Exception as e:
+                self.logger.warning(f"Tokenizer de {model_name} no disponible, "
+                                    f"se usa {self.DEFAULT_ENCODING}: {e}")
+                self._encoding = tiktoken.get_encoding(self.DEFAULT_ENCODING)
+
+    def encode(self, text: str) -> list[int]:
+        if self._hf_tokenizer is not None:
+            return self._hf_tokenizer.encode(text, add_special_tokens=False)
+        return self._encoding.encode(text)
+
+    def decode(self, tokens: list[int]) -> str:
+        if self._hf_tokenizer is not None:
+            return self._hf_tokenizer.decode(tokens)
+        return self._encoding.decode(tokens)
+
+    def count(self, text: str) -> int:
+        """Returns the number of tokens of `text` for the target model."""
+        return len(self.encode(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cuts `text` so that it does not exceed `max_tokens` tokens."""
+        tokens = self.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return self.decode(tokens[:max_tokens])